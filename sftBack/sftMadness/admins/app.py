@@ -1,34 +1,19 @@
 import json
 import os
-import psycopg2
-from datetime import datetime, date
-import boto3
-import jwt
-from botocore.exceptions import ClientError
-from psycopg2.extras import RealDictCursor
-import requests
-from jwt import algorithms
-
-def cors_response(status_code, body, content_type="application/json"):
-    headers = {
-        'Content-Type': content_type,
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-        'Access-Control-Allow-Methods': 'OPTIONS,GET,POST,PUT,DELETE',
-    }
-
-    if content_type == "application/json":
-        body = json.dumps(body, default=str)
-
-    return {
-        'statusCode': status_code,
-        'body': body,
-        'headers': headers,
-    }
+from datetime import datetime
 
+from sft_runtime.responses import cors_response, PREFLIGHT_RESPONSE
+from sft_runtime.db import release_db_connection, dict_cursor, streaming_cursor
+from sft_runtime.auth import authenticate, invalidate_cached_user
+from sft_runtime.context import build_request_context
+from sft_runtime.aws import client
+from sft_runtime.instrumentation import instrumented
+from sft_runtime.pagination import encode_cursor, decode_cursor, count_strategy, total_column, page_total
+
+@instrumented
 def lambda_handler(event, context):
     if event['httpMethod'] == 'OPTIONS':
-        return cors_response(200, "ok")
+        return PREFLIGHT_RESPONSE
     
     http_method = event['httpMethod']
     resource_path = event['resource']
@@ -40,149 +25,64 @@ def lambda_handler(event, context):
             return cors_response(401, "Unauthorized")
         
         token = auth_header.split(' ')[-1]
-        verify_token(token)
+        token_payload, auth = authenticate(token)
 
     except Exception as e:
         return cors_response(401, "Authentication failed")
         
     #routes with authentication
+    request_ctx = None
     try:
+        request_ctx = build_request_context(token_payload, auth)
+
         if resource_path == '/admins' and http_method == 'POST':
-            return createAdmin(event, context)
+            return createAdmin(event, context, request_ctx)
         elif resource_path == '/admins' and http_method == 'PUT':
-            return updateUserRole(event, context)
+            return updateUserRole(event, context, request_ctx)
         elif resource_path == '/admins/{userId}' and http_method == 'GET':
-            return getUserById(event, context)
+            return getUserById(event, context, request_ctx)
         elif resource_path == '/admins' and http_method == 'GET':
-            return getUsers(event, context)
+            return getUsers(event, context, request_ctx)
         elif resource_path == '/admins/{userId}' and http_method == 'DELETE':
-            return deleteUser(event, context)
+            return deleteUser(event, context, request_ctx)
         elif resource_path == '/admins/log' and http_method == 'POST':
-            return logAction(event, context)
+            return logAction(event, context, request_ctx)
         elif resource_path == '/admins/log/{userId}' and http_method == 'GET':
-            return getLogs(event, context)
+            return getLogs(event, context, request_ctx)
         else:
             return cors_response(404, "Not Found")
         
     except Exception as e:
         return cors_response(500, str(e))
-    
-###################
-#helper functions
-
-def json_serial(obj):
-    if isinstance(obj, (datetime, date)):
-        return obj.isoformat()
-    raise TypeError ("Type %s not serializable" % type(obj))
-
-def get_db_connection():
-    return psycopg2.connect(
-        dbname=os.environ['DB_NAME'],
-        host=os.environ['DB_HOST'],
-        user=os.environ['DB_USER'],
-        password=os.environ['DB_PASSWORD'],
-        port=os.environ['DB_PORT'],
-
-        connect_timeout=5)
-    
-#AUTH
-def is_token_invalidated(token_payload):
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            jti = token_payload.get('jti')
-            
-            if not jti:
-                raise Exception("Token missing jti claim")
-            
-            cur.execute("""
-                SELECT EXISTS(
-                    SELECT 1 
-                    FROM invalidated_tokens 
-                    WHERE jti = %s
-                )
-            """, (jti,))
-            
-            return cur.fetchone()[0]
-
-def verify_token(token):
-    # Get the JWT token from the Authorization header
-    if not token:
-        raise Exception('No token provided')
-
-    region = boto3.session.Session().region_name
-    
-    # Get the JWT kid (key ID)
-    headers = jwt.get_unverified_header(token)
-    kid = headers['kid']
-
-    # Get the public keys from Cognito
-    url = f'https://cognito-idp.{region}.amazonaws.com/{os.environ["COGNITO_USER_POOL_ID"]}/.well-known/jwks.json'
-    response = requests.get(url)
-    keys = response.json()['keys']
-
-    # Find the correct public key
-    public_key = None
-    for key in keys:
-        if key['kid'] == kid:
-            public_key = algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
-            break
-
-    if not public_key:
-        raise Exception('Public key not found')
-
-    # Verify the token
-    try:
-        payload = jwt.decode(
-            token,
-            public_key,
-            algorithms=['RS256'],
-            audience=os.environ['COGNITO_CLIENT_ID'],
-            options={"verify_exp": True}
-        )
-
-        if is_token_invalidated(payload):
-            raise Exception('Token has been invalidated')
-        
-        return payload
-    
-    except jwt.ExpiredSignatureError:
-        raise Exception('Token has expired')
-    except jwt.InvalidTokenError:
-        raise Exception('Invalid token')
+    finally:
+        if request_ctx:
+            release_db_connection(request_ctx['conn'])
 
 ####################
 #admins functions
 
-def is_admin(token_payload, conn, cur):
+def is_admin(request_ctx):
     """Helper function to verify admin status"""
-    user_email = token_payload.get('email')
-    cur.execute("SELECT role FROM users WHERE email = %s", (user_email,))
-    user = cur.fetchone()
-    return user and user['role'] == 'admin'
+    # role was resolved together with the revocation check in lambda_handler
+    return request_ctx['role'] == 'admin'
 
 #creates admin user
-def createAdmin(event, context):
-    conn = None
+def createAdmin(event, context, request_ctx):
+    conn = request_ctx['conn']
     user_pool_id = os.environ['COGNITO_USER_POOL_ID']
-    cognito_client = boto3.client('cognito-idp')
+    cognito_client = client('cognito-idp')
 
     try:
-        # Verify admin authorization
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-
         # Parse request body
         try:
             body = json.loads(event.get('body', {}))
         except json.JSONDecodeError as e:
             return cors_response(400, f"Invalid JSON: {str(e)}")
 
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = dict_cursor(conn)
 
         # Verify requester is admin
-        if not is_admin(token_payload, conn, cur):
+        if not is_admin(request_ctx):
             return cors_response(403, "Only administrators can create admin accounts")
 
         # Extract user information
@@ -233,11 +133,9 @@ def createAdmin(event, context):
             cur.execute(insert_query, (email, password, company_name, phone_number, cognito_user_id))
             new_admin = cur.fetchone()
 
-            cur.execute("SELECT id FROM users WHERE cognito_id = %s", (token_payload.get('sub'),))
-            admin_user = cur.fetchone()
-            if not admin_user:
+            admin_db_id = request_ctx['user_id']
+            if not admin_db_id:
                 return cors_response(404, "Admin user not found")
-            admin_db_id = admin_user['id']
             
             # Log admin creation
             log_query = """
@@ -263,34 +161,23 @@ def createAdmin(event, context):
             return cors_response(400, f"Error creating admin: {str(e)}")
 
     except Exception as e:
-        if conn:
-            conn.rollback()
+        conn.rollback()
         return cors_response(500, f"Error: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 #updates user role to admin or updates user role to customer
-def updateUserRole(event, context):
-    print("in update user role function")
-    conn = None
+def updateUserRole(event, context, request_ctx):
+    conn = request_ctx['conn']
     try:
-        # Verify admin authorization
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-
         # Parse request body
         try:
             body = json.loads(event.get('body', {}))
         except json.JSONDecodeError as e:
             return cors_response(400, f"Invalid JSON: {str(e)}")
 
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = dict_cursor(conn)
 
         # Verify requester is admin
-        if not is_admin(token_payload, conn, cur):
+        if not is_admin(request_ctx):
             return cors_response(403, "Only administrators can create admin accounts")
 
         target_user_id = body.get('userId')
@@ -313,11 +200,9 @@ def updateUserRole(event, context):
         if not updated_user:
             return cors_response(404, "User not found")
             
-        cur.execute("SELECT id FROM users WHERE cognito_id = %s", (token_payload.get('sub'),))
-        admin_user = cur.fetchone()
-        if not admin_user:
+        admin_db_id = request_ctx['user_id']
+        if not admin_db_id:
             return cors_response(404, "Admin user not found")
-        admin_db_id = admin_user['id']
 
         # Log the action
         cur.execute("""
@@ -331,102 +216,136 @@ def updateUserRole(event, context):
         ))
             
         conn.commit()
+        invalidate_cached_user(target_user_id)
         return cors_response(200, {
             "message": f"User successfully updated to {new_role}",
             "user": updated_user
         })
     
     except Exception as e:
-        if conn:
-            conn.rollback()
+        conn.rollback()
         return cors_response(500, f"Error: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
-def getUserById(event, context):
-    conn = None
+# getUserById sections - each is its own LATERAL subquery reading at most limit + 1 rows off the
+# user's rows, so a heavy user costs the same as a light one. ?include=events,logs picks the
+# sections (all by default), ?<section>Limit= / ?<section>Cursor= page each one on its own
+# section -> (response key, table, sort columns, cursor value types), newest first
+USER_SECTIONS = {
+    'events': ('events', 'events', ('id',), (int,)),
+    'contacts': ('contacts', 'schoolContact', ('id',), (int,)),
+    'files': ('files', 'files', ('id',), (int,)),
+    'logs': ('conversation_logs', 'conversationLogs', ('timestamp', 'id'), (datetime.fromisoformat, int)),
+}
+SECTION_DEFAULT_LIMIT = 20
+SECTION_MAX_LIMIT = 100
+
+def getUserById(event, context, request_ctx):
+    conn = request_ctx['conn']
     try:
-        # Verify admin authorization
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-
         user_id = event['pathParameters'].get('userId')
         if not user_id:
             return cors_response(400, "User ID is required")
 
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        query_params = event.get('queryStringParameters', {}) or {}
+        try:
+            include = query_params.get('include')
+            include = [name.strip() for name in include.split(',') if name.strip()] if include is not None else list(USER_SECTIONS)
+            unknown = [name for name in include if name not in USER_SECTIONS]
+            if unknown:
+                raise ValueError(f"unknown section {', '.join(unknown)} (sections: {', '.join(USER_SECTIONS)})")
+            default_limit = int(query_params.get('limit', SECTION_DEFAULT_LIMIT))
+            limits, cursors = {}, {}
+            for name in include:
+                limits[name] = min(int(query_params.get(f'{name}Limit', default_limit)), SECTION_MAX_LIMIT)
+                if limits[name] < 1:
+                    raise ValueError("limit must be positive")
+                cursor = query_params.get(f'{name}Cursor')
+                cursors[name] = decode_cursor(cursor, USER_SECTIONS[name][3]) if cursor else None
+        except ValueError as e:
+            return cors_response(400, f"Invalid parameters: {str(e)}")
+
+        cur = dict_cursor(conn)
 
         # Verify requester is admin
-        if not is_admin(token_payload, conn, cur):
+        if not is_admin(request_ctx):
             return cors_response(403, "Admin access required")
 
-        # Get user with associated data
-        query = """
-            SELECT 
-                u.*,
-                json_agg(DISTINCT e.*) FILTER (WHERE e.id IS NOT NULL) as events,
-                json_agg(DISTINCT c.*) FILTER (WHERE c.id IS NOT NULL) as contacts,
-                json_agg(DISTINCT f.*) FILTER (WHERE f.id IS NOT NULL) as files,
-                (SELECT json_agg(cl.*) 
-                 FROM conversationLogs cl 
-                 WHERE cl.userId = u.id) as conversation_logs
-            FROM users u
-            LEFT JOIN events e ON u.id = e.userId
-            LEFT JOIN schoolContact c ON u.id = c.userId
-            LEFT JOIN files f ON u.id = f.userId
-            WHERE u.id = %s
-            GROUP BY u.id
-        """
-        cur.execute(query, (user_id,))
+        # Get user with the requested sections - one statement, one subquery per section
+        columns = ["u.*"]
+        joins = []
+        params = []
+        for name in include:
+            key, table, sort, _ = USER_SECTIONS[name]
+            where = "s.userId = u.id"
+            if cursors[name]:
+                where += f" AND ({', '.join('s.' + c for c in sort)}) < ({', '.join(['%s'] * len(sort))})"
+                params.extend(cursors[name])
+            columns.append(f"{name}_page.items AS {key}")
+            joins.append(f"""
+            LEFT JOIN LATERAL (
+                SELECT json_agg(page ORDER BY {', '.join(f'page.{c} DESC' for c in sort)}) AS items
+                FROM (
+                    SELECT s.* FROM {table} s
+                    WHERE {where}
+                    ORDER BY {', '.join(f's.{c} DESC' for c in sort)}
+                    LIMIT %s
+                ) page
+            ) {name}_page ON true""")
+            # one extra row tells whether the section has a next page
+            params.append(limits[name] + 1)
+
+        query = "SELECT " + ", ".join(columns) + " FROM users u" + "".join(joins) + " WHERE u.id = %s"
+        params.append(user_id)
+        cur.execute(query, params)
         user = cur.fetchone()
 
         if not user:
             return cors_response(404, "User not found")
 
-        return cors_response(200, {"user": user})
+        sections = {}
+        for name in include:
+            key, _, sort, _ = USER_SECTIONS[name]
+            rows = user[key] or []
+            has_more = len(rows) > limits[name]
+            user[key] = rows[:limits[name]]
+            sections[name] = {
+                "limit": limits[name],
+                "hasMore": has_more,
+                "nextCursor": encode_cursor(*(user[key][-1][c] for c in sort)) if has_more else None
+            }
+
+        return cors_response(200, {"user": user, "sections": sections})
 
     except Exception as e:
         return cors_response(500, f"Error: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
-def getUsers(event, context):
-    conn = None
+def getUsers(event, context, request_ctx):
+    conn = request_ctx['conn']
     try:
-        # Verify admin authorization
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-
         # Get query parameters
         query_params = event.get('queryStringParameters', {}) or {}
         role = query_params.get('role')
         search = query_params.get('search')
         limit = int(query_params.get('limit', '50'))
         offset = int(query_params.get('offset', '0'))
+        # ?count= - exact by default, the users table stays small enough to count with the page
+        strategy = count_strategy(query_params, 'exact')
+        if limit < 1 or offset < 0:
+            raise ValueError("limit must be positive and offset not negative")
 
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = dict_cursor(conn)
 
         # Verify requester is admin
-        if not is_admin(token_payload, conn, cur):
+        if not is_admin(request_ctx):
             return cors_response(403, "Admin access required")
 
-        # Build query
+        # Build query - event_count / contact_count / file_count are columns on users, kept
+        # current by triggers (migrations/0002_user_counters.sql), so the page is read straight off
+        # idx_users_joindate. With count=exact the total comes back with the rows
         query = """
-            SELECT 
-                u.*,
-                COUNT(DISTINCT e.id) as event_count,
-                COUNT(DISTINCT c.id) as contact_count,
-                COUNT(DISTINCT f.id) as file_count
+            SELECT u.*
+        """ + total_column(strategy) + """
             FROM users u
-            LEFT JOIN events e ON u.id = e.userId
-            LEFT JOIN schoolContact c ON u.id = c.userId
-            LEFT JOIN files f ON u.id = f.userId
         """
         where_clauses = []
         params = []
@@ -440,63 +359,57 @@ def getUsers(event, context):
             search_pattern = f"%{search}%"
             params.extend([search_pattern, search_pattern])
 
+        # estimated / past-the-end totals count the filtered users table
+        count_query = "SELECT u.id FROM users u"
+        count_params = list(params)
         if where_clauses:
             query += " WHERE " + " AND ".join(where_clauses)
+            count_query += " WHERE " + " AND ".join(where_clauses)
 
+        # one extra row tells whether there is a next page
         query += """
-            GROUP BY u.id
             ORDER BY u.joinDate DESC
             LIMIT %s OFFSET %s
         """
-        params.extend([limit, offset])
-
-        # Get total count
-        count_query = "SELECT COUNT(*) FROM users"
-        count_params = []
-        if where_clauses:
-            count_query += " WHERE " + " AND ".join(where_clauses)
-            count_params = params[:-2]  # Exclude limit and offset
-
-        cur.execute(count_query, count_params)
-        total_count = cur.fetchone()['count']
+        params.extend([limit + 1, offset])
 
         # Get users
         cur.execute(query, params)
         users = cur.fetchall()
+        total_count = page_total(cur, strategy, users, count_query, count_params)
+        has_more = len(users) > limit
+        users = users[:limit]
+
+        pagination = {
+            "offset": offset,
+            "limit": limit,
+            "hasMore": has_more
+        }
+        if total_count is not None:
+            pagination["total"] = total_count
+            pagination["totalEstimated"] = strategy == 'estimated'
 
         return cors_response(200, {
             "users": users,
-            "pagination": {
-                "total": total_count,
-                "offset": offset,
-                "limit": limit,
-                "hasMore": (offset + limit) < total_count
-            }
+            "pagination": pagination
         })
 
+    except ValueError as e:
+        return cors_response(400, f"Invalid pagination parameters: {str(e)}")
     except Exception as e:
         return cors_response(500, f"Error: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
-def deleteUser(event, context):
-    conn = None
+def deleteUser(event, context, request_ctx):
+    conn = request_ctx['conn']
     try:
-        # Verify admin authorization
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-
         user_id = event['pathParameters'].get('userId')
         if not user_id:
             return cors_response(400, "User ID is required")
 
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = dict_cursor(conn)
 
         # Verify requester is admin
-        if not is_admin(token_payload, conn, cur):
+        if not is_admin(request_ctx):
             return cors_response(403, "Admin access required")
 
         # Get user email for Cognito deletion
@@ -506,11 +419,9 @@ def deleteUser(event, context):
         if not user:
             return cors_response(404, "User not found")
         
-        cur.execute("SELECT id FROM users WHERE cognito_id = %s", (token_payload.get('sub'),))
-        admin_user = cur.fetchone()
-        if not admin_user:
+        admin_db_id = request_ctx['user_id']
+        if not admin_db_id:
             return cors_response(404, "Admin user not found")
-        admin_db_id = admin_user['id']
 
         # Log deletion
         log_query = """
@@ -525,7 +436,7 @@ def deleteUser(event, context):
         
         # Delete from Cognito
         try:
-            cognito_client = boto3.client('cognito-idp')
+            cognito_client = client('cognito-idp')
             cognito_client.admin_delete_user(
                 UserPoolId=os.environ['COGNITO_USER_POOL_ID'],
                 Username=user['email']
@@ -539,6 +450,7 @@ def deleteUser(event, context):
         deleted_user = cur.fetchone()
 
         conn.commit()
+        invalidate_cached_user(user_id)
 
         return cors_response(200, {
             "message": "User deleted successfully",
@@ -546,37 +458,25 @@ def deleteUser(event, context):
         })
 
     except Exception as e:
-        if conn:
-            conn.rollback()
+        conn.rollback()
         return cors_response(500, f"Error: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
-def logAction(event, context):
-    conn = None
+def logAction(event, context, request_ctx):
+    conn = request_ctx['conn']
     try:
-        # Verify admin authorization
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-
         # Parse request body
         try:
             body = json.loads(event.get('body', {}))
         except json.JSONDecodeError as e:
             return cors_response(400, f"Invalid JSON: {str(e)}")
 
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT id FROM users WHERE cognito_id = %s", (token_payload.get('sub'),))
-        admin_user = cur.fetchone()
-        if not admin_user:
+        cur = dict_cursor(conn)
+        admin_db_id = request_ctx['user_id']
+        if not admin_db_id:
             return cors_response(404, "Admin user not found")
-        admin_db_id = admin_user['id']
 
         # Verify requester is admin
-        if not is_admin(token_payload, conn, cur):
+        if not is_admin(request_ctx):
             return cors_response(403, "Admin access required")
 
         # Extract log information
@@ -601,43 +501,55 @@ def logAction(event, context):
         return cors_response(201, {"log": new_log})
 
     except Exception as e:
-        if conn:
-            conn.rollback()
+        conn.rollback()
         return cors_response(500, f"Error: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 #returns logs performed onto target user/id
-def getLogs(event, context):
-    conn = None
+# NDJSON export (?format=ndjson) - one log per line, read through a server-side cursor so the
+# handler never holds the whole table. Lambda responses are capped at 6 MB, so an export stops
+# at EXPORT_MAX_BYTES or the row limit and returns X-Next-Cursor to continue from
+EXPORT_DEFAULT_ROWS = 10000
+EXPORT_MAX_ROWS = 50000
+EXPORT_MAX_BYTES = 5 * 1024 * 1024
+
+def getLogs(event, context, request_ctx):
+    conn = request_ctx['conn']
     try:
-        # Verify admin authorization
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-
         # Get path and query parameters
         user_id = event['pathParameters'].get('userId')
         query_params = event.get('queryStringParameters', {}) or {}
         action_type = query_params.get('actionType')
         start_date = query_params.get('startDate')
         end_date = query_params.get('endDate')
-        limit = int(query_params.get('limit', '50'))
+        export = query_params.get('format') == 'ndjson'
+        default_limit = EXPORT_DEFAULT_ROWS if export else 50
+        limit = int(query_params.get('limit', default_limit))
         offset = int(query_params.get('offset', '0'))
+        # cursor - nextCursor of the previous page (or X-Next-Cursor of an export), replaces offset
+        cursor = query_params.get('cursor')
+        after = decode_cursor(cursor, (datetime.fromisoformat, int)) if cursor else None
+        # ?count= - offset pages default to exact (adminLogs.js shows "of total" and builds the page
+        # numbers from it, the count comes back with the page rows), cursor pages to none; exports
+        # never count
+        strategy = 'none' if export else count_strategy(query_params, 'none' if after else 'exact')
+
+        if limit < 1 or offset < 0:
+            raise ValueError("limit must be positive and offset not negative")
+        if export:
+            limit = min(limit, EXPORT_MAX_ROWS)
 
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = dict_cursor(conn)
 
         # Verify requester is admin
-        if not is_admin(token_payload, conn, cur):
+        if not is_admin(request_ctx):
             return cors_response(403, "Admin access required")
 
-        # Build query
+        # Build query - with count=exact on an offset page the total comes back with the rows
         query = """
             SELECT l.*, 
                    admin.email as admin_email,
                    target.email as target_email
+        """ + (total_column(strategy) if not after else "") + """
             FROM admin_logs l
             JOIN users admin ON l.adminId = admin.id
             LEFT JOIN users target ON l.targetId = target.id
@@ -661,41 +573,61 @@ def getLogs(event, context):
             where_clauses.append("l.timestamp <= %s")
             params.append(end_date)
 
+        # the count takes the filters only, not the cursor
+        count_clauses = list(where_clauses)
+        count_params = list(params)
+
+        # Keyset pagination - rows after the cursor's (timestamp, id), read off the
+        # (timestamp, id) / (targetId, timestamp, id) indexes instead of skipping offset rows
+        if after:
+            where_clauses.append("(l.timestamp, l.id) < (%s, %s)")
+            params.extend(after)
+
         # Add WHERE clause if we have any conditions
         if where_clauses:
             query += " WHERE " + " AND ".join(where_clauses)
 
-        # Add sorting
-        query += " ORDER BY l.timestamp DESC"
+        # Add sorting - id breaks timestamp ties so every row has one place in the order
+        query += " ORDER BY l.timestamp DESC, l.id DESC"
 
-        # Add pagination
-        query += " LIMIT %s OFFSET %s"
-        params.extend([limit, offset])
+        if export:
+            return exportLogs(conn, query, params, limit)
 
-        # Get total count
-        count_query = "SELECT COUNT(*) FROM admin_logs l"
-        
-        if where_clauses:
-            count_query += " WHERE " + " AND ".join(where_clauses)
-        
-        # Execute count query with params (excluding LIMIT and OFFSET)
-        cur.execute(count_query, params[:-2] if params else [])
-        total_count = cur.fetchone()['count']
+        # Add pagination - one extra row tells whether there is a next page
+        query += " LIMIT %s"
+        params.append(limit + 1)
+        if not after:
+            query += " OFFSET %s"
+            params.append(offset)
 
         # Get logs
         cur.execute(query, params)
         logs = cur.fetchall()
+        count_query = "SELECT l.id FROM admin_logs l"
+        if count_clauses:
+            count_query += " WHERE " + " AND ".join(count_clauses)
+        total_count = page_total(cur, strategy, logs, count_query, count_params)
+        has_more = len(logs) > limit
+        logs = logs[:limit]
+
+        pagination = {
+            "limit": limit,
+            "hasMore": has_more,
+            "nextCursor": encode_cursor(logs[-1]['timestamp'], logs[-1]['id']) if has_more else None
+        }
+        if not after:
+            pagination["offset"] = offset
+
+        if total_count is not None:
+            pagination["total"] = total_count
+            pagination["totalEstimated"] = strategy == 'estimated'
+            pagination["totalPages"] = (total_count + limit - 1) // limit
+            if not after:
+                pagination["currentPage"] = offset // limit + 1
 
         return cors_response(200, {
             "logs": logs,
-            "pagination": {
-                "total": total_count,
-                "offset": offset,
-                "limit": limit,
-                "hasMore": (offset + limit) < total_count,
-                "currentPage": offset // limit + 1,
-                "totalPages": (total_count + limit - 1) // limit
-            },
+            "pagination": pagination,
             "filters": {
                 "userId": user_id,
                 "actionType": action_type,
@@ -708,6 +640,28 @@ def getLogs(event, context):
         return cors_response(400, f"Invalid pagination parameters: {str(e)}")
     except Exception as e:
         return cors_response(500, f"Error retrieving logs: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
+
+def exportLogs(conn, query, params, limit):
+    # one more row than the limit is fetched, to know whether to hand out a cursor
+    export_cur = streaming_cursor(conn, 'admin_logs_export')
+    export_cur.execute(query + " LIMIT %s", params + [limit + 1])
+
+    lines = []
+    size = 0
+    last = None
+    next_cursor = None
+    for row in export_cur:
+        line = json.dumps(row, default=str)
+        if len(lines) == limit or (lines and size + len(line) + 1 > EXPORT_MAX_BYTES):
+            next_cursor = encode_cursor(last['timestamp'], last['id'])
+            break
+        lines.append(line)
+        size += len(line) + 1
+        last = row
+    export_cur.close()
+
+    response = cors_response(200, "\n".join(lines) + ("\n" if lines else ""), content_type="application/x-ndjson")
+    if next_cursor:
+        response['headers']['X-Next-Cursor'] = next_cursor
+        response['headers']['Access-Control-Expose-Headers'] = 'X-Next-Cursor'
+    return response
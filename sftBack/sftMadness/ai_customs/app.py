@@ -1,34 +1,15 @@
 import json
-import os
-import psycopg2
-from datetime import datetime, date
-import boto3
-import jwt
-from botocore.exceptions import ClientError
-from psycopg2.extras import RealDictCursor
-import requests
-from jwt import algorithms
-
-def cors_response(status_code, body, content_type="application/json"):
-    headers = {
-        'Content-Type': content_type,
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-        'Access-Control-Allow-Methods': 'OPTIONS,GET,POST,PUT,DELETE',
-    }
-
-    if content_type == "application/json":
-        body = json.dumps(body, default=str)
-
-    return {
-        'statusCode': status_code,
-        'body': body,
-        'headers': headers,
-    }
 
+from sft_runtime.responses import cors_response, PREFLIGHT_RESPONSE
+from sft_runtime.db import release_db_connection, dict_cursor
+from sft_runtime.auth import authenticate
+from sft_runtime.context import build_request_context
+from sft_runtime.instrumentation import instrumented
+
+@instrumented
 def lambda_handler(event, context):
     if event['httpMethod'] == 'OPTIONS':
-        return cors_response(200, "ok")
+        return PREFLIGHT_RESPONSE
     
     http_method = event['httpMethod']
     resource_path = event['resource']
@@ -40,116 +21,38 @@ def lambda_handler(event, context):
             return cors_response(401, "Unauthorized")
         
         token = auth_header.split(' ')[-1]
-        verify_token(token)
+        token_payload, auth = authenticate(token)
 
     except Exception as e:
         return cors_response(401, "Authentication failed")
         
     #routes with authentication
+    request_ctx = None
     try:
+        request_ctx = build_request_context(token_payload, auth)
+
         if resource_path == '/customs' and http_method == 'POST':
-            return setCustoms(event, context)
+            return setCustoms(event, context, request_ctx)
         elif resource_path == '/customs' and http_method == 'GET':
-            return getCustoms(event, context)
+            return getCustoms(event, context, request_ctx)
         elif resource_path == '/customs' and http_method == 'PUT':
-            return updateCustoms(event, context)
+            return updateCustoms(event, context, request_ctx)
         elif resource_path == '/customs' and http_method == 'DELETE':
-            return deleteCustoms(event, context)
+            return deleteCustoms(event, context, request_ctx)
         else:
             return cors_response(404, "Not Found")
         
     except Exception as e:
         return cors_response(500, str(e))
-    
-###################
-#helper functions
-
-def json_serial(obj):
-    if isinstance(obj, (datetime, date)):
-        return obj.isoformat()
-    raise TypeError ("Type %s not serializable" % type(obj))
-
-def get_db_connection():
-    return psycopg2.connect(
-        dbname=os.environ['DB_NAME'],
-        host=os.environ['DB_HOST'],
-        user=os.environ['DB_USER'],
-        password=os.environ['DB_PASSWORD'],
-        port=os.environ['DB_PORT'],
-
-        connect_timeout=5)
-    
-#AUTH
-def is_token_invalidated(token_payload):
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            jti = token_payload.get('jti')
-            
-            if not jti:
-                raise Exception("Token missing jti claim")
-            
-            cur.execute("""
-                SELECT EXISTS(
-                    SELECT 1 
-                    FROM invalidated_tokens 
-                    WHERE jti = %s
-                )
-            """, (jti,))
-            
-            return cur.fetchone()[0]
-
-
-def verify_token(token):
-    # Get the JWT token from the Authorization header
-    if not token:
-        raise Exception('No token provided')
-
-    region = boto3.session.Session().region_name
-    
-    # Get the JWT kid (key ID)
-    headers = jwt.get_unverified_header(token)
-    kid = headers['kid']
-
-    # Get the public keys from Cognito
-    url = f'https://cognito-idp.{region}.amazonaws.com/{os.environ["COGNITO_USER_POOL_ID"]}/.well-known/jwks.json'
-    response = requests.get(url)
-    keys = response.json()['keys']
-
-    # Find the correct public key
-    public_key = None
-    for key in keys:
-        if key['kid'] == kid:
-            public_key = algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
-            break
-
-    if not public_key:
-        raise Exception('Public key not found')
-
-    # Verify the token
-    try:
-        payload = jwt.decode(
-            token,
-            public_key,
-            algorithms=['RS256'],
-            audience=os.environ['COGNITO_CLIENT_ID'],
-            options={"verify_exp": True}
-        )
-
-        if is_token_invalidated(payload):
-            raise Exception('Token has been invalidated')
-        
-        return payload
-    
-    except jwt.ExpiredSignatureError:
-        raise Exception('Token has expired')
-    except jwt.InvalidTokenError:
-        raise Exception('Invalid token')
+    finally:
+        if request_ctx:
+            release_db_connection(request_ctx['conn'])
 
 ####################
 #customs functions
 
-def setCustoms(event, context):
-    conn = None
+def setCustoms(event, context, request_ctx):
+    conn = request_ctx['conn']
     try:
         # Parse request body
         try:
@@ -157,19 +60,12 @@ def setCustoms(event, context):
         except json.JSONDecodeError as e:
             return cors_response(400, f"Invalid JSON: {str(e)}")
 
-        # Get requester's ID from token for authorization
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-        cognito_user_id = token_payload.get('sub')
-
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT id FROM users WHERE cognito_id = %s", (cognito_user_id,))
-        db_user = cur.fetchone()
-        if not db_user:
+        # Get user ID resolved from the token in lambda_handler
+        user_id = request_ctx['user_id']
+        if not user_id:
             return cors_response(404, "User not found")
-        user_id = db_user['id']
+
+        cur = dict_cursor(conn)
 
         # Extract customs information
         model_name = body.get('modelName')
@@ -233,30 +129,19 @@ def setCustoms(event, context):
         return cors_response(201, {"customs": new_customs})
 
     except Exception as e:
-        if conn:
-            conn.rollback()
+        conn.rollback()
         return cors_response(500, f"Error setting customs: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
-def getCustoms(event, context):
-    conn = None
+def getCustoms(event, context, request_ctx):
+    conn = request_ctx['conn']
     try:
-        # Get requester's ID from token for authorization
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-        cognito_user_id = token_payload.get('sub')
-
         # Anyone can view customs, no authorization needed
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT id FROM users WHERE cognito_id = %s", (cognito_user_id,))
-        db_user = cur.fetchone()
-        if not db_user:
+        # Get user ID resolved from the token in lambda_handler
+        user_id = request_ctx['user_id']
+        if not user_id:
             return cors_response(404, "User not found")
-        user_id = db_user['id']
+
+        cur = dict_cursor(conn)
 
         # Get customs with user information
         query = """
@@ -275,12 +160,9 @@ def getCustoms(event, context):
 
     except Exception as e:
         return cors_response(500, f"Error retrieving customs: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
-def updateCustoms(event, context):
-    conn = None
+def updateCustoms(event, context, request_ctx):
+    conn = request_ctx['conn']
     try:
         # Parse request body
         try:
@@ -288,19 +170,12 @@ def updateCustoms(event, context):
         except json.JSONDecodeError as e:
             return cors_response(400, f"Invalid JSON: {str(e)}")
 
-        # Get requester's ID from token for authorization
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-        cognito_user_id = token_payload.get('sub')
-
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT id FROM users WHERE cognito_id = %s", (cognito_user_id,))
-        db_user = cur.fetchone()
-        if not db_user:
+        # Get user ID resolved from the token in lambda_handler
+        user_id = request_ctx['user_id']
+        if not user_id:
             return cors_response(404, "User not found")
-        user_id = db_user['id']
+
+        cur = dict_cursor(conn)
 
         # Extract updateable fields
         updateable_fields = {
@@ -363,29 +238,18 @@ def updateCustoms(event, context):
         return cors_response(200, {"customs": updated_customs})
 
     except Exception as e:
-        if conn:
-            conn.rollback()
+        conn.rollback()
         return cors_response(500, f"Error updating customs: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
-def deleteCustoms(event, context):
-    conn = None
+def deleteCustoms(event, context, request_ctx):
+    conn = request_ctx['conn']
     try:
-        # Get requester's ID from token for authorization
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-        cognito_user_id = token_payload.get('sub')
-
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT id FROM users WHERE cognito_id = %s", (cognito_user_id,))
-        db_user = cur.fetchone()
-        if not db_user:
+        # Get user ID resolved from the token in lambda_handler
+        user_id = request_ctx['user_id']
+        if not user_id:
             return cors_response(404, "User not found")
-        user_id = db_user['id']
+
+        cur = dict_cursor(conn)
 
         # Delete customs
         delete_query = """
@@ -407,9 +271,5 @@ def deleteCustoms(event, context):
         })
 
     except Exception as e:
-        if conn:
-            conn.rollback()
+        conn.rollback()
         return cors_response(500, f"Error deleting customs: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""Database and token setup for the benchmark.
+
+    connect_kwargs         - the DB_* settings the handlers connect with
+    create_schema / seed   - local postgres with migrations/*.sql and generated rows
+    install_jwks / mint_token - a locally generated RSA key stands in for the Cognito
+                             user pool, tokens are signed with it and its public key is put
+                             straight into the sft_runtime.auth JWKS cache
+"""
+import os
+import time
+import uuid
+import importlib.util
+
+from sft_runtime.pagination import encode_cursor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATIONS = os.path.join(os.path.dirname(BENCH_DIR), 'migrations', 'app.py')
+KID = 'bench-key'
+
+ADMIN = {'email': 'bench-admin@example.com', 'cognito_id': 'bench-admin-sub', 'role': 'admin'}
+USER = {'email': 'bench-user@example.com', 'cognito_id': 'bench-user-sub', 'role': 'user'}
+
+# rows generated per run - the defaults give the list routes a realistic amount of data per user
+SEED_SIZES = {
+    'users': 200,
+    'contacts': 20,
+    'events_per_contact': 5,
+    'logs_per_contact': 25,
+    'files': 10,
+    'analytics': 1000,
+    'admin_logs': 200,
+    # every other user gets one contact with this many events and logs, and one file - without
+    # them the bench user owns every row and the planner scans whole tables (--check-plans)
+    'rows_per_other_user': 5,
+}
+
+TABLES = [
+    'admin_logs', 'analytics', 'customs', 'scrapedFiles', 'files', 'conversationLogs', 'events',
+    'schoolContact', 'password_reset_codes', 'invalidated_tokens', 'email_conversations', 'users',
+]
+
+def connect_kwargs():
+    return {
+        'dbname': os.environ['DB_NAME'],
+        'host': os.environ['DB_HOST'],
+        'user': os.environ['DB_USER'],
+        'password': os.environ['DB_PASSWORD'],
+        'port': os.environ['DB_PORT'],
+    }
+
+############################################
+# schema and seed data
+def create_schema(conn):
+    # the same migrations the deploy applies - loaded by path, the runner is another app.py
+    spec = importlib.util.spec_from_file_location('bench_migrations', MIGRATIONS)
+    migrations = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migrations)
+    return migrations.migrate(conn)
+
+def seed(conn, sizes=None):
+    sizes = dict(SEED_SIZES, **(sizes or {}))
+    with conn.cursor() as cur:
+        cur.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+
+        ids = {}
+        for key, person in (('admin_id', ADMIN), ('user_id', USER)):
+            cur.execute("""
+                INSERT INTO users (email, password, role, companyName, phoneNumber, cognito_id)
+                VALUES (%s, 'bench', %s, 'Bench Co', '555-0100', %s)
+                RETURNING id
+            """, (person['email'], person['role'], person['cognito_id']))
+            ids[key] = cur.fetchone()[0]
+
+        cur.execute("""
+            INSERT INTO users (email, password, role, companyName, phoneNumber, cognito_id, joinDate)
+            SELECT 'user' || n || '@example.com', 'bench', 'user', 'Company ' || n, '555-' || n,
+                   'bench-sub-' || n, CURRENT_TIMESTAMP - n * INTERVAL '1 hour'
+            FROM generate_series(1, %s) AS n
+        """, (sizes['users'],))
+
+        cur.execute("""
+            INSERT INTO schoolContact (userId, email, phoneNumber)
+            SELECT %s, 'contact' || n || '@school.edu', '555-2' || n
+            FROM generate_series(1, %s) AS n
+            RETURNING id
+        """, (ids['user_id'], sizes['contacts']))
+        contact_ids = [row[0] for row in cur.fetchall()]
+        ids['contact_id'] = contact_ids[0]
+
+        cur.execute("""
+            INSERT INTO events (contactId, userId, subject, type, attendees, scheduledDate, status)
+            SELECT c.id, %s, 'Meeting ' || n, 'meeting', 'bench', CURRENT_TIMESTAMP + n * INTERVAL '1 day',
+                   CASE WHEN n %% 2 = 0 THEN 'pending' ELSE 'completed' END
+            FROM schoolContact c, generate_series(1, %s) AS n
+            WHERE c.userId = %s
+        """, (ids['user_id'], sizes['events_per_contact'], ids['user_id']))
+
+        cur.execute("""
+            INSERT INTO conversationLogs (userId, contactId, interactionType, subject, content, timestamp)
+            SELECT %s, c.id, CASE WHEN n %% 3 = 0 THEN 'call' ELSE 'email' END, 'Subject ' || n,
+                   repeat('benchmark conversation content ', 20), CURRENT_TIMESTAMP - n * INTERVAL '1 hour'
+            FROM schoolContact c, generate_series(1, %s) AS n
+            WHERE c.userId = %s
+        """, (ids['user_id'], sizes['logs_per_contact'], ids['user_id']))
+        # the row half way down the user's log pages, for the deep page scenarios
+        ids['log_middle'] = sizes['contacts'] * sizes['logs_per_contact'] // 2
+        cur.execute("""
+            SELECT timestamp, id FROM conversationLogs WHERE userId = %s
+            ORDER BY timestamp DESC, id DESC OFFSET %s LIMIT 1
+        """, (ids['user_id'], ids['log_middle'] - 1))
+        ids['log_cursor'] = encode_cursor(*cur.fetchone())
+
+        cur.execute("""
+            INSERT INTO files (userId, filename, filepath, filetype)
+            SELECT %s, 'file' || n || '.txt', 'bench/file' || n || '.txt', 'text/plain'
+            FROM generate_series(1, %s) AS n
+            RETURNING id
+        """, (ids['user_id'], sizes['files']))
+        ids['file_id'] = cur.fetchone()[0]
+
+        cur.execute("""
+            INSERT INTO scrapedFiles (userId, model, filename, filepath, filetype)
+            SELECT %s, 'bench-model', 'scraped' || n || '.txt', 'bench/scraped' || n || '.txt', 'text/plain'
+            FROM generate_series(1, %s) AS n
+            RETURNING id
+        """, (ids['user_id'], sizes['files']))
+        ids['scraped_file_id'] = cur.fetchone()[0]
+
+        cur.execute("""
+            INSERT INTO analytics (userId, metricName, metricValue, timestamp)
+            SELECT %s, 'responseTime', random() * 1000, CURRENT_TIMESTAMP - n * INTERVAL '10 minutes'
+            FROM generate_series(1, %s) AS n
+            RETURNING id
+        """, (ids['user_id'], sizes['analytics']))
+        ids['metric_id'] = cur.fetchone()[0]
+
+        cur.execute("""
+            INSERT INTO customs (userId, modelName, introduction, friendliness, formality, verbosity, humor, technicalLevel)
+            VALUES (%s, 'bench-model', 'hello', 50, 50, 50, 50, 50)
+        """, (ids['user_id'],))
+
+        cur.execute("""
+            INSERT INTO admin_logs (adminId, actionType, targetId, details, timestamp)
+            SELECT %s, 'update_role', %s, 'benchmark log ' || n, CURRENT_TIMESTAMP - n * INTERVAL '1 minute'
+            FROM generate_series(1, %s) AS n
+        """, (ids['admin_id'], ids['user_id'], sizes['admin_logs']))
+        ids['admin_log_middle'] = sizes['admin_logs'] // 2
+        cur.execute("""
+            SELECT timestamp, id FROM admin_logs ORDER BY timestamp DESC, id DESC OFFSET %s LIMIT 1
+        """, (ids['admin_log_middle'] - 1,))
+        ids['admin_log_cursor'] = encode_cursor(*cur.fetchone())
+
+        cur.execute("""
+            INSERT INTO schoolContact (userId, email, phoneNumber)
+            SELECT id, 'contact-of-' || id || '@school.edu', '555-3' || id
+            FROM users WHERE id NOT IN (%s, %s)
+        """, (ids['admin_id'], ids['user_id']))
+        cur.execute("""
+            INSERT INTO events (contactId, userId, subject, type, attendees, scheduledDate, status)
+            SELECT c.id, c.userId, 'Meeting ' || n, 'meeting', 'bench', CURRENT_TIMESTAMP + n * INTERVAL '1 day', 'pending'
+            FROM schoolContact c, generate_series(1, %s) AS n
+            WHERE c.userId <> %s
+        """, (sizes['rows_per_other_user'], ids['user_id']))
+        cur.execute("""
+            INSERT INTO conversationLogs (userId, contactId, interactionType, subject, content, timestamp)
+            SELECT c.userId, c.id, 'email', 'Subject ' || n, 'other user content', CURRENT_TIMESTAMP - n * INTERVAL '1 hour'
+            FROM schoolContact c, generate_series(1, %s) AS n
+            WHERE c.userId <> %s
+        """, (sizes['rows_per_other_user'], ids['user_id']))
+        cur.execute("""
+            INSERT INTO files (userId, filename, filepath, filetype)
+            SELECT id, 'file-of-' || id || '.txt', 'bench/other/' || id || '.txt', 'text/plain'
+            FROM users WHERE id NOT IN (%s, %s)
+        """, (ids['admin_id'], ids['user_id']))
+
+    conn.commit()
+    # fresh statistics, like autovacuum keeps them on a live database - plans and count=estimated depend on them
+    with conn.cursor() as cur:
+        cur.execute("ANALYZE")
+    conn.commit()
+    return ids
+
+############################################
+# tokens
+signing = {'private_key': None}
+
+def install_jwks(auth_module):
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    signing['private_key'] = private_key
+    auth_module.jwks_cache['keys'] = {KID: private_key.public_key()}
+    auth_module.jwks_cache['fetched_at'] = time.time()
+
+def mint_token(person, issuer, lifetime=3600):
+    import jwt
+
+    now = int(time.time())
+    claims = {
+        'sub': person['cognito_id'],
+        'email': person['email'],
+        'aud': os.environ['COGNITO_CLIENT_ID'],
+        'iss': issuer,
+        'token_use': 'id',
+        'iat': now,
+        'exp': now + lifetime,
+        'jti': str(uuid.uuid4()),
+    }
+    return jwt.encode(claims, signing['private_key'], algorithm='RS256', headers={'kid': KID})
@@ -0,0 +1,213 @@
+"""Per-function vs single-router deployment (template.yaml DeploymentMode).
+
+Measures both layouts locally, the same way benchmarks/run.py does, then replays a simulated
+day of traffic against each to show how often a request lands on a cold container and what
+that does to the latency distribution:
+
+    cold      import time in a fresh interpreter - each function's app.py, or router/app.py plus
+              the handler module the route needs
+    first     first invocation in a new container (db connect, token / user cache misses)
+    warm      latency samples per scenario, through the function's handler or through the router
+    traffic   Poisson arrivals at --rpm over --minutes, routes picked uniformly (or --weight),
+              a container is reclaimed after --idle-minutes without a request. A request on a
+              reclaimed container pays cold + first (+ --init-ms for the sandbox / runtime start,
+              which can't be measured locally); a warm router pays the handler import the first
+              time it serves a route
+
+    python benchmarks/router.py
+    python benchmarks/router.py --rpm 0.5 --idle-minutes 7 --weight getUser=10 --json router.json
+
+One container per function (or one router container) and no concurrency - at low traffic that
+is what Lambda does, at high traffic both layouts stay warm and the numbers converge. The
+preflight and the scheduled cleanup are left out of the traffic; the router answers preflights
+without loading a handler and the cleanup stays its own function in both modes.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+import run
+
+# import router/app.py, then the handler module for one route
+ROUTE_COLD_SNIPPET = '''
+import importlib, json, sys, time
+start = time.perf_counter()
+router = importlib.import_module("app")
+router.load_module(%r)
+print(json.dumps({"import_ms": (time.perf_counter() - start) * 1000, "modules": len(sys.modules)}))
+'''
+
+def warm_samples(handler, function_name, scenario, fixtures_data, args):
+    # (first invocation in a fresh container, sorted warm latencies)
+    run.reset_container_state()
+    first = run.invoke(handler, scenario['event'](fixtures_data, 0), run.lambda_context(function_name, 0), False)
+    for i in range(args.warmup):
+        run.invoke(handler, scenario['event'](fixtures_data, i + 1), run.lambda_context(function_name, i + 1), False)
+    samples = []
+    for i in range(args.iterations):
+        counter = args.warmup + i + 1
+        result = run.invoke(handler, scenario['event'](fixtures_data, counter),
+                            run.lambda_context(function_name, counter), False)
+        if result['status'] != scenario['expect']:
+            raise SystemExit(f"{scenario['name']} via {function_name}: expected {scenario['expect']}, "
+                             f"got {result['status']}: {str(result['body'])[:300]}")
+        samples.append(result['ms'])
+    return first['ms'], sorted(samples)
+
+def traffic(scenarios, weights, args):
+    # arrival time (minutes) and scenario name per request
+    rng = random.Random(args.seed)
+    names = [s['name'] for s in scenarios]
+    route_weights = [weights.get(name, 1.0) for name in names]
+    now, requests = 0.0, []
+    while True:
+        now += rng.expovariate(args.rpm)
+        if now > args.minutes:
+            return requests
+        requests.append((now, rng.choices(names, route_weights)[0]))
+
+def simulate(requests, container_of, cold_cost, switch_cost, warm, args):
+    # container_of(name) -> container key; cold_cost(name) -> ms for a new container serving it;
+    # switch_cost(name, loaded) -> extra ms in a warm container, loaded is that container's set
+    rng = random.Random(args.seed + 1)
+    last_seen, loaded = {}, {}
+    latencies, cold_starts = [], 0
+    for at, name in requests:
+        key = container_of(name)
+        ms = rng.choice(warm[name])
+        if key not in last_seen or at - last_seen[key] > args.idle_minutes:
+            cold_starts += 1
+            loaded[key] = {name}
+            ms += args.init_ms + cold_cost(name)
+        else:
+            ms += switch_cost(name, loaded[key])
+            loaded[key].add(name)
+        last_seen[key] = at
+        latencies.append(ms)
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'containers': len({container_of(name) for _, name in requests}),
+        'cold_starts': cold_starts,
+        'cold_pct': round(cold_starts / len(latencies) * 100, 2) if latencies else 0.0,
+        'p50_ms': round(run.percentile(latencies, 50), 2) if latencies else None,
+        'p95_ms': round(run.percentile(latencies, 95), 2) if latencies else None,
+        'p99_ms': round(run.percentile(latencies, 99), 2) if latencies else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    run.add_common_arguments(parser)
+    parser.add_argument('--iterations', type=int, default=50, help='warm samples per scenario and layout')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--cold-repeat', type=int, default=3, help='fresh interpreters per import measurement')
+    parser.add_argument('--rpm', type=float, default=2.0, help='requests per minute across all routes')
+    parser.add_argument('--minutes', type=float, default=24 * 60, help='simulated traffic duration')
+    parser.add_argument('--idle-minutes', type=float, default=10.0,
+                        help='idle time after which lambda reclaims a container')
+    parser.add_argument('--init-ms', type=float, default=0.0,
+                        help='added to every cold start for sandbox / runtime init (VPC functions: a few hundred ms)')
+    parser.add_argument('--weight', action='append', default=[], metavar='SCENARIO=W',
+                        help='relative traffic share of a scenario (default 1 each)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='write the report to this file')
+    args = parser.parse_args()
+
+    from scenarios import SCENARIOS
+
+    functions = {f['name']: f for f in run.load_functions(args.template)}
+    if 'ApiRouter' not in functions:
+        print('ERROR: no ApiRouter function in the template')
+        return 1
+    scenarios = [s for s in SCENARIOS if s['function'] in functions and s['function'] != 'TokenCleanupFunction'
+                 and s['name'] != 'preflight']
+    weights = {}
+    for item in args.weight:
+        name, _, value = item.partition('=')
+        weights[name] = float(value)
+
+    # sft_runtime reads its settings at import, so nothing is loaded before setup
+    fixtures_data, _ = run.setup(args)
+    router_handler = run.load_handler(functions['ApiRouter'])
+    routes = router_handler.__globals__['ROUTES']
+    route_dir = {s['name']: routes[s['event'](fixtures_data, 0)['resource']][0] for s in scenarios}
+
+    # cold imports
+    cold_function, cold_router = {}, {}
+    for name in sorted({s['function'] for s in scenarios}):
+        cold_function[name] = run.measure_cold(functions[name], args.cold_repeat, args.deps)
+    router_alone = run.measure_cold(functions['ApiRouter'], args.cold_repeat, args.deps)
+    for directory in sorted(set(route_dir.values())):
+        cold_router[directory] = run.measure_cold(functions['ApiRouter'], args.cold_repeat, args.deps,
+                                                  ROUTE_COLD_SNIPPET % directory)
+    for measured in list(cold_function.values()) + list(cold_router.values()) + [router_alone]:
+        if 'error' in measured:
+            print(f"ERROR cold import: {measured['error']}")
+            return 1
+
+    # warm samples, both layouts
+    handlers = {}
+    first, warm = {'perFunction': {}, 'router': {}}, {'perFunction': {}, 'router': {}}
+    print(f"{'scenario':<24} {'function p50':>12} {'p95':>8} {'first':>8}   {'router p50':>10} {'p95':>8} {'first':>8}")
+    for scenario in scenarios:
+        function = functions[scenario['function']]
+        if function['name'] not in handlers:
+            handlers[function['name']] = run.load_handler(function)
+        name = scenario['name']
+        first['perFunction'][name], warm['perFunction'][name] = warm_samples(
+            handlers[function['name']], function['name'], scenario, fixtures_data, args)
+        first['router'][name], warm['router'][name] = warm_samples(
+            router_handler, 'ApiRouter', scenario, fixtures_data, args)
+        print(f"{name:<24} {run.percentile(warm['perFunction'][name], 50):>12.2f} "
+              f"{run.percentile(warm['perFunction'][name], 95):>8.2f} {first['perFunction'][name]:>8.1f}   "
+              f"{run.percentile(warm['router'][name], 50):>10.2f} {run.percentile(warm['router'][name], 95):>8.2f} "
+              f"{first['router'][name]:>8.1f}")
+
+    function_of = {s['name']: s['function'] for s in scenarios}
+    requests = traffic(scenarios, weights, args)
+
+    results = {
+        'perFunction': simulate(
+            requests,
+            container_of=lambda name: function_of[name],
+            cold_cost=lambda name: cold_function[function_of[name]]['import_ms'] + first['perFunction'][name],
+            switch_cost=lambda name, loaded: 0.0,
+            warm=warm['perFunction'], args=args),
+        'router': simulate(
+            requests,
+            container_of=lambda name: 'ApiRouter',
+            cold_cost=lambda name: cold_router[route_dir[name]]['import_ms'] + first['router'][name],
+            # a handler module is imported once per container, on the first request for one of its routes
+            switch_cost=lambda name, loaded: 0.0 if route_dir[name] in {route_dir[n] for n in loaded}
+            else cold_router[route_dir[name]]['import_ms'] - router_alone['import_ms'],
+            warm=warm['router'], args=args),
+    }
+
+    print(f"\ntraffic: {len(requests)} requests, {args.rpm:g}/min over {args.minutes:g} min, "
+          f"containers reclaimed after {args.idle_minutes:g} idle min, init {args.init_ms:g} ms")
+    print(f"{'layout':<12} {'containers':>10} {'cold starts':>11} {'cold %':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for layout, result in results.items():
+        print(f"{layout:<12} {result['containers']:>10} {result['cold_starts']:>11} {result['cold_pct']:>7.2f} "
+              f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'python': sys.version.split()[0],
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'settings': {k: getattr(args, k) for k in ('rpm', 'minutes', 'idle_minutes', 'init_ms', 'seed',
+                                                           'iterations')},
+                'weights': weights,
+                'cold': {'perFunction': cold_function, 'router': cold_router, 'router_alone': router_alone},
+                'first_ms': first,
+                'warm_p95_ms': {layout: {name: run.percentile(v, 95) for name, v in samples.items()}
+                                for layout, samples in warm.items()},
+                'traffic': results,
+            }, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
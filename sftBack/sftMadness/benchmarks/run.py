@@ -0,0 +1,426 @@
+"""Local benchmark for the handlers in template.yaml.
+
+Runs every scenario in benchmarks/scenarios.py in-process against a local postgres, with
+Cognito / S3 / SES replaced by the stubs in benchmarks/stubs.py and tokens signed by a
+locally generated key, and reports per route:
+
+    cold      import time of the function's app.py in a fresh interpreter (median)
+    first     the first invocation after that - db connect, JWKS / user cache misses
+    warm      p50 / p95 / p99 / mean latency over --iterations invocations
+    queries   DB queries per request (mean / max), time spent in them and the slowest statement,
+              taken from sft_runtime.instrumentation, which the benchmark switches on
+    aws       stubbed AWS calls per request
+    plans     with --check-plans, every statement a scenario runs is EXPLAINed with sequential
+              scans switched off - a Seq Scan left in the plan means no index can serve it, at
+              any table size, and the run fails
+
+    createdb sft_bench
+    python benchmarks/run.py --json bench-before.json
+    python benchmarks/run.py --baseline bench-before.json --max-regression 20
+    python benchmarks/run.py --scenario getUserById --scenario getLogs --iterations 500
+    python benchmarks/run.py --check-plans --iterations 1 --warmup 0 --no-cold
+
+Run from sftBack/sftMadness with the dependencies from requirements.txt installed for the
+local python (the vendored layer holds lambda binaries). The database is set with --db-*
+or the usual PGHOST / PGPORT / PGDATABASE / PGUSER / PGPASSWORD variables; every run
+applies migrations/*.sql and reseeds, so point it at a scratch database only.
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+import types
+import importlib.util
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+RUNTIME_LAYER = os.path.join(ROOT, 'layers', 'runtime', 'python')
+
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+sys.path.insert(0, RUNTIME_LAYER)
+sys.path.insert(0, BENCH_DIR)
+
+from importtime_report import FAKE_ENV, load_functions
+
+COLD_SNIPPET = '''
+import importlib, json, sys, time
+start = time.perf_counter()
+importlib.import_module("app")
+print(json.dumps({"import_ms": (time.perf_counter() - start) * 1000, "modules": len(sys.modules)}))
+'''
+
+def percentile(sorted_values, pct):
+    # nearest rank
+    if not sorted_values:
+        return None
+    k = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[k]
+
+def lambda_context(function_name, invocation):
+    return types.SimpleNamespace(
+        function_name=function_name,
+        function_version='$LATEST',
+        aws_request_id=f'bench-{function_name}-{invocation}',
+        memory_limit_in_mb=128,
+        invoked_function_arn=f'arn:aws:lambda:us-east-2:000000000000:function:{function_name}',
+        get_remaining_time_in_millis=lambda: 30000,
+    )
+
+############################################
+# cold import, one fresh interpreter per run
+def measure_cold(function, repeat, deps, snippet=COLD_SNIPPET):
+    code_dir = os.path.join(ROOT, function['code_uri'])
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([code_dir, RUNTIME_LAYER] + ([deps] if deps else []))
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+    runs = []
+    # first run writes the .pyc files, like the deployed package already has them
+    for i in range(repeat + 1):
+        result = subprocess.run([sys.executable, '-c', snippet], cwd=code_dir, env=env,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()
+            return {'error': error[-1] if error else f'exit code {result.returncode}'}
+        if i > 0:
+            runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    return {
+        'import_ms': round(statistics.median(r['import_ms'] for r in runs), 2),
+        'modules': runs[-1]['modules'],
+    }
+
+############################################
+# in-process invocation
+def load_handler(function):
+    # every function's module is called app, so each one is loaded under its own name
+    code_dir = os.path.join(ROOT, function['code_uri'])
+    spec = importlib.util.spec_from_file_location(f"bench_{function['name']}", os.path.join(code_dir, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.path.insert(0, code_dir)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(code_dir)
+    return getattr(module, function['handler'].split('.')[-1])
+
+def reset_container_state():
+    # what a new container starts without - the next call pays for the connection and cache misses
+    from sft_runtime import auth, aws, db, instrumentation
+    db.close_db_connection()
+    auth.token_cache.clear()
+    auth.user_cache.clear()
+    # no high water mark, so the first authenticated call does the full revocation sync
+    auth.revocation_state.update({'revoked': {}, 'high_water': None, 'synced_at': 0.0})
+    aws.clients.clear()
+    instrumentation.container_state['invocations'] = 0
+
+def invoke(handler, event, context, show_output):
+    import stubs
+    from sft_runtime.instrumentation import request_stats
+
+    stubs.reset_counts()
+    request_stats.clear()
+    sink = contextlib.nullcontext() if show_output else contextlib.redirect_stdout(io.StringIO())
+    with sink:
+        started = time.perf_counter()
+        response = handler(event, context)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    return {
+        'ms': elapsed_ms,
+        'status': (response or {}).get('statusCode'),
+        'body': (response or {}).get('body'),
+        # the instrumented wrapper resets these per call, they stay readable after it returns
+        'queries': request_stats.get('queries', 0),
+        'db_ms': request_stats.get('db_ms', 0.0),
+        'slowest': request_stats.get('slowest'),
+        'slowest_ms': request_stats.get('slowest_ms', 0.0),
+        'aws_calls': sum(stubs.aws_calls.values()),
+    }
+
+def run_scenario(scenario, handler, function_name, fixtures_data, args, first_call, plan_conn=None):
+    result = {'function': function_name, 'expect': scenario['expect']}
+
+    counter = 0
+    if first_call:
+        reset_container_state()
+        first = invoke(handler, scenario['event'](fixtures_data, counter), lambda_context(function_name, counter),
+                       args.show_output)
+        result['first_ms'] = round(first['ms'], 2)
+        counter += 1
+
+    for _ in range(args.warmup):
+        invoke(handler, scenario['event'](fixtures_data, counter), lambda_context(function_name, counter),
+               args.show_output)
+        counter += 1
+
+    samples = []
+    for _ in range(args.iterations):
+        samples.append(invoke(handler, scenario['event'](fixtures_data, counter),
+                              lambda_context(function_name, counter), args.show_output))
+        counter += 1
+
+    latencies = sorted(s['ms'] for s in samples)
+    failures = [s for s in samples if s['status'] != scenario['expect']]
+    result.update({
+        'iterations': len(samples),
+        'errors': len(failures),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(statistics.mean(latencies), 3),
+        'max_ms': round(latencies[-1], 3),
+        'queries_mean': round(statistics.mean(s['queries'] for s in samples), 2),
+        'queries_max': max(s['queries'] for s in samples),
+        'db_ms_mean': round(statistics.mean(s['db_ms'] for s in samples), 3),
+        'aws_calls_mean': round(statistics.mean(s['aws_calls'] for s in samples), 2),
+    })
+    slowest = max(samples, key=lambda s: s['slowest_ms'])
+    result['slowest_statement'] = {'ms': round(slowest['slowest_ms'], 3), 'sql': slowest['slowest']}
+    if failures:
+        result['first_error'] = {'status': failures[0]['status'], 'body': str(failures[0]['body'])[:300]}
+
+    if plan_conn is not None:
+        statements = capture_statements(handler, scenario['event'](fixtures_data, counter),
+                                        lambda_context(function_name, counter))
+        result['seq_scans'] = check_plans(plan_conn, statements)
+    return result
+
+############################################
+# plan check - with enable_seqscan off the planner only picks a sequential scan when no index can
+# serve the statement, so the small seed still shows what will scan a big table in production
+PLANNED_STATEMENT = re.compile(r'^\s*(SELECT|WITH|UPDATE|DELETE|INSERT)\b', re.IGNORECASE)
+# named (server-side) cursors run as DECLARE ... CURSOR FOR <query>
+DECLARE_CURSOR = re.compile(r'^\s*DECLARE\s.+?\sCURSOR\s.*?\bFOR\s', re.IGNORECASE | re.DOTALL)
+
+def capture_statements(handler, event, context):
+    # one invocation, returns every statement it executed with the parameters bound
+    from sft_runtime.instrumentation import statement_capture
+    statement_capture['statements'] = []
+    try:
+        invoke(handler, event, context, False)
+        return statement_capture['statements']
+    finally:
+        statement_capture['statements'] = None
+
+def seq_scans(plan):
+    # every Seq Scan node in an EXPLAIN (FORMAT JSON) plan, sub plans included. An index scan with
+    # no Index Cond that filters rows reads the whole table too, only in index order - that's what
+    # the planner falls back to when seq scans are off and an index only matches the ORDER BY
+    found = []
+    node = plan.get('Node Type')
+    if node == 'Seq Scan' or (node in ('Index Scan', 'Index Only Scan') and plan.get('Filter')
+                              and not plan.get('Index Cond')):
+        found.append({'table': plan.get('Relation Name'), 'node': node, 'filter': plan.get('Filter')})
+    for child in plan.get('Plans', []):
+        found.extend(seq_scans(child))
+    return found
+
+def check_plans(conn, statements):
+    found = []
+    for statement in statements:
+        if isinstance(statement, bytes):
+            statement = statement.decode('utf-8', 'replace')
+        statement = DECLARE_CURSOR.sub('', statement)
+        if not PLANNED_STATEMENT.match(statement):
+            continue
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL enable_seqscan = off")
+                cur.execute("EXPLAIN (FORMAT JSON) " + statement)
+                plan = cur.fetchone()[0]
+        finally:
+            # EXPLAIN without ANALYZE runs nothing, the rollback only ends the SET LOCAL
+            conn.rollback()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        for scan in seq_scans(plan[0]['Plan']):
+            scan['sql'] = ' '.join(statement.split())[:200]
+            if scan not in found:
+                found.append(scan)
+    return found
+
+############################################
+def setup(args):
+    os.environ.update(FAKE_ENV)
+    # has to be set before sft_runtime is imported, it is read once at import
+    os.environ['SFT_INSTRUMENTATION'] = '1'
+    os.environ.update({
+        'DB_HOST': args.db_host,
+        'DB_PORT': str(args.db_port),
+        'DB_NAME': args.db_name,
+        'DB_USER': args.db_user,
+        'DB_PASSWORD': args.db_password,
+    })
+    if args.deps:
+        sys.path.append(args.deps)
+
+    import psycopg2
+    import fixtures
+    import stubs
+    from sft_runtime import auth, aws
+
+    conn = psycopg2.connect(connect_timeout=5, **fixtures.connect_kwargs())
+    try:
+        fixtures.create_schema(conn)
+        # more users already means more of their rows, the per user count stays as it is
+        sizes = {k: v if k == 'rows_per_other_user' else v * args.scale for k, v in fixtures.SEED_SIZES.items()}
+        ids = fixtures.seed(conn, sizes)
+    finally:
+        conn.close()
+
+    # every boto3 client the handlers create is a stub
+    aws.state['session'] = stubs.StubSession(fixtures.USER['email'], fixtures.USER['cognito_id'])
+    fixtures.install_jwks(auth)
+
+    issuer = auth.cognito_issuer()
+    data = dict(ids)
+    data.update({
+        'user': fixtures.USER,
+        'admin': fixtures.ADMIN,
+        'user_token': fixtures.mint_token(fixtures.USER, issuer),
+        'admin_token': fixtures.mint_token(fixtures.ADMIN, issuer),
+        'fresh_token': lambda: fixtures.mint_token(fixtures.USER, issuer),
+    })
+    return data, sizes
+
+def compare(result, before, max_regression):
+    # returns (text, regressed)
+    if not before or 'p95_ms' not in before or 'p95_ms' not in result:
+        return '', False
+    p95_delta = (result['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0.0
+    query_delta = result['queries_mean'] - before['queries_mean']
+    text = f"   (p95 {p95_delta:+.0f}%, queries {query_delta:+.1f})"
+    regressed = query_delta > 0 or (max_regression is not None and p95_delta > max_regression)
+    return text, regressed
+
+def add_common_arguments(parser):
+    # template, database and dependency options - shared with benchmarks/router.py
+    parser.add_argument('--template', default=os.path.join(ROOT, 'template.yaml'))
+    parser.add_argument('--db-host', default=os.environ.get('PGHOST', 'localhost'))
+    parser.add_argument('--db-port', type=int, default=int(os.environ.get('PGPORT', '5432')))
+    parser.add_argument('--db-name', default=os.environ.get('PGDATABASE', 'sft_bench'))
+    parser.add_argument('--db-user', default=os.environ.get('PGUSER', 'postgres'))
+    parser.add_argument('--db-password', default=os.environ.get('PGPASSWORD', 'postgres'))
+    parser.add_argument('--deps', help='extra site-packages dir with the requirements for this python')
+    parser.add_argument('--scale', type=int, default=1, help='multiply the seeded row counts')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_arguments(parser)
+    parser.add_argument('--iterations', type=int, default=200, help='timed invocations per scenario')
+    parser.add_argument('--warmup', type=int, default=10, help='untimed invocations before that')
+    parser.add_argument('--cold-repeat', type=int, default=5, help='fresh interpreters per function for the import time')
+    parser.add_argument('--no-cold', dest='cold', action='store_false')
+    parser.add_argument('--scenario', action='append', help='only these scenarios')
+    parser.add_argument('--show-output', action='store_true', help="don't swallow what the handlers print")
+    parser.add_argument('--check-plans', action='store_true',
+                        help='fail when a statement a scenario runs needs a sequential scan')
+    parser.add_argument('--json', help='write the report to this file')
+    parser.add_argument('--baseline', help='compare against a previous --json report')
+    parser.add_argument('--max-regression', type=float,
+                        help='with --baseline: exit 1 when a p95 grew by more than this many percent '
+                             '(more queries per request always fail)')
+    args = parser.parse_args()
+
+    from scenarios import SCENARIOS
+
+    scenarios = SCENARIOS
+    if args.scenario:
+        scenarios = [s for s in SCENARIOS if s['name'] in args.scenario]
+    functions = {f['name']: f for f in load_functions(args.template)}
+    missing = sorted({s['function'] for s in scenarios} - set(functions))
+    if missing:
+        print(f"ERROR: scenarios reference functions not in the template: {', '.join(missing)}")
+        return 1
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    fixtures_data, sizes = setup(args)
+
+    plan_conn = None
+    if args.check_plans:
+        import psycopg2
+        import fixtures
+        plan_conn = psycopg2.connect(connect_timeout=5, **fixtures.connect_kwargs())
+
+    cold = {}
+    if args.cold:
+        for name in sorted({s['function'] for s in scenarios}):
+            cold[name] = measure_cold(functions[name], args.cold_repeat, args.deps)
+            line = f"cold  {name:<22} "
+            if 'error' in cold[name]:
+                line += f"ERROR {cold[name]['error']}"
+            else:
+                line += f"{cold[name]['import_ms']:>8.1f} ms  {cold[name]['modules']:>4} modules"
+                before = baseline.get('cold', {}).get(name)
+                if before and 'import_ms' in before:
+                    line += f"   ({cold[name]['import_ms'] - before['import_ms']:+.1f} ms)"
+            print(line)
+
+    results = {}
+    handlers = {}
+    regressions = []
+    print(f"\n{'scenario':<24} {'p50':>8} {'p95':>8} {'p99':>8} {'first':>8}  {'queries':>7} {'db ms':>7} {'aws':>4} {'err':>4}")
+    for scenario in scenarios:
+        function = functions[scenario['function']]
+        first_call = function['name'] not in handlers
+        if first_call:
+            handlers[function['name']] = load_handler(function)
+
+        result = run_scenario(scenario, handlers[function['name']], function['name'], fixtures_data, args, first_call,
+                              plan_conn)
+        results[scenario['name']] = result
+
+        first = f"{result['first_ms']:>8.1f}" if 'first_ms' in result else f"{'':>8}"
+        line = (f"{scenario['name']:<24} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                f"{first}  {result['queries_mean']:>7.1f} {result['db_ms_mean']:>7.2f} {result['aws_calls_mean']:>4.1f} "
+                f"{result['errors']:>4}")
+        text, regressed = compare(result, baseline.get('scenarios', {}).get(scenario['name']),
+                                  args.max_regression)
+        print(line + text)
+        if regressed:
+            regressions.append(scenario['name'])
+        if 'first_error' in result:
+            print(f"    expected {scenario['expect']}, got {result['first_error']['status']}: {result['first_error']['body']}")
+        for scan in result.get('seq_scans', []):
+            print(f"    {scan['node']} on {scan['table']}{' filter ' + scan['filter'] if scan['filter'] else ''}: {scan['sql']}")
+
+    if plan_conn is not None:
+        plan_conn.close()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'python': sys.version.split()[0],
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'iterations': args.iterations,
+                'warmup': args.warmup,
+                'seed_sizes': sizes,
+                'cold': cold,
+                'scenarios': results,
+            }, f, indent=2)
+
+    if any(r['errors'] for r in results.values()):
+        return 1
+    scanned = [name for name, r in results.items() if r.get('seq_scans')]
+    if scanned:
+        print(f"\nsequential scans: {', '.join(scanned)}")
+        return 1
+    if args.baseline and args.max_regression is not None and regressions:
+        print(f"\nregressed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
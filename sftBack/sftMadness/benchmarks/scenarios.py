@@ -0,0 +1,132 @@
+"""Benchmark scenarios - one per route worth tracking.
+
+Each scenario names the function (logical id in template.yaml) and builds an API Gateway
+proxy event from the seeded fixtures. 'event' gets (fixtures, iteration) so write routes can
+vary their input; 'expect' is the status code a correct run returns - anything else is
+counted as an error in the report.
+"""
+import json
+
+def api_event(method, resource, path_parameters=None, query=None, body=None, token=None):
+    path = resource
+    for key, value in (path_parameters or {}).items():
+        path = path.replace('{' + key + '}', str(value))
+    headers = {
+        'Accept': 'application/json',
+        'Content-Type': 'application/json',
+        'Host': 'bench.execute-api.us-east-2.amazonaws.com',
+        'Origin': 'http://localhost:3000',
+        'User-Agent': 'sft-benchmark',
+        'X-Forwarded-For': '127.0.0.1',
+        'X-Forwarded-Proto': 'https',
+    }
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    return {
+        'resource': resource,
+        'path': path,
+        'httpMethod': method,
+        'headers': headers,
+        'multiValueHeaders': {k: [v] for k, v in headers.items()},
+        'queryStringParameters': {k: str(v) for k, v in query.items()} if query else None,
+        'pathParameters': {k: str(v) for k, v in path_parameters.items()} if path_parameters else None,
+        'stageVariables': None,
+        'requestContext': {
+            'resourcePath': resource,
+            'httpMethod': method,
+            'path': f'/Prod{path}',
+            'stage': 'Prod',
+            'identity': {'sourceIp': '127.0.0.1', 'userAgent': 'sft-benchmark'},
+        },
+        'body': json.dumps(body) if body is not None else None,
+        'isBase64Encoded': False,
+    }
+
+SCENARIOS = [
+    # preflight - should never touch auth or the database
+    {'name': 'preflight', 'function': 'users', 'expect': 200,
+     'event': lambda f, i: api_event('OPTIONS', '/users/{userId}', {'userId': f['user_id']})},
+
+    {'name': 'login', 'function': 'logIn', 'expect': 200,
+     'event': lambda f, i: api_event('POST', '/login', body={'email': f['user']['email'], 'password': 'bench'})},
+    # every logout revokes its token, so each iteration signs a new one
+    {'name': 'logout', 'function': 'logOut', 'expect': 200,
+     'event': lambda f, i: api_event('POST', '/logout', token=f['fresh_token']())},
+    {'name': 'cleanup', 'function': 'TokenCleanupFunction', 'expect': 200,
+     'event': lambda f, i: {'source': 'aws.events', 'detail-type': 'Scheduled Event', 'detail': {}}},
+
+    {'name': 'getUser', 'function': 'users', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/users/{userId}', {'userId': f['user_id']}, token=f['user_token'])},
+    {'name': 'getUserByCognitoId', 'function': 'usersByCognito', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/users/cognito/{cognitoId}', {'cognitoId': f['user']['cognito_id']},
+                                     token=f['user_token'])},
+
+    {'name': 'getAllUsers', 'function': 'admins', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/admins', query={'limit': 50, 'offset': 0}, token=f['admin_token'])},
+    {'name': 'getUserById', 'function': 'admins', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/admins/{userId}', {'userId': f['user_id']}, token=f['admin_token'])},
+    # one section, half way down the user's conversation logs
+    {'name': 'getUserByIdLogsPage', 'function': 'admins', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/admins/{userId}', {'userId': f['user_id']},
+                                     query={'include': 'logs', 'logsLimit': 50, 'logsCursor': f['log_cursor']},
+                                     token=f['admin_token'])},
+    # the seeded admin logs all target the bench user
+    {'name': 'getLogs', 'function': 'admins', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/admins/log/{userId}', {'userId': f['user_id']},
+                                     query={'limit': 50, 'offset': 0}, token=f['admin_token'])},
+    {'name': 'getLogsDeepOffset', 'function': 'admins', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/admins/log/{userId}', {'userId': f['user_id']},
+                                     query={'limit': 50, 'offset': f['admin_log_middle']}, token=f['admin_token'])},
+    {'name': 'getLogsDeepCursor', 'function': 'admins', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/admins/log/{userId}', {'userId': f['user_id']},
+                                     query={'limit': 50, 'cursor': f['admin_log_cursor']}, token=f['admin_token'])},
+    {'name': 'exportLogs', 'function': 'admins', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/admins/log/{userId}', {'userId': f['user_id']},
+                                     query={'format': 'ndjson', 'limit': 1000}, token=f['admin_token'])},
+
+    {'name': 'getCustoms', 'function': 'AICustoms', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/customs', token=f['user_token'])},
+
+    {'name': 'getFile', 'function': 'files', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/files/{fileId}', {'fileId': f['file_id']}, token=f['user_token'])},
+    {'name': 'getScrapedFile', 'function': 'scrapedFiles', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/scrapedFiles/{fileId}', {'fileId': f['scraped_file_id']},
+                                     token=f['user_token'])},
+
+    {'name': 'getContact', 'function': 'schoolContact', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/contact/{contactId}', {'contactId': f['contact_id']},
+                                     token=f['user_token'])},
+    {'name': 'createContact', 'function': 'schoolContact', 'expect': 201,
+     'event': lambda f, i: api_event('POST', '/contact', body={'email': f'bench{i}@school.edu', 'phoneNumber': '555-0199'},
+                                     token=f['user_token'])},
+
+    {'name': 'getEvents', 'function': 'events', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/sftEvents', query={'status': 'pending'}, token=f['user_token'])},
+
+    {'name': 'getConversationLogs', 'function': 'conversationLogs', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/conversation_logs/{userId}', {'userId': f['user_id']},
+                                     query={'limit': 50, 'offset': 0}, token=f['user_token'])},
+    # the middle of the seeded logs - an offset page and the cursor page that starts at the same row
+    {'name': 'getConversationLogsDeepOffset', 'function': 'conversationLogs', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/conversation_logs/{userId}', {'userId': f['user_id']},
+                                     query={'limit': 50, 'offset': f['log_middle']}, token=f['user_token'])},
+    {'name': 'getConversationLogsDeepCursor', 'function': 'conversationLogs', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/conversation_logs/{userId}', {'userId': f['user_id']},
+                                     query={'limit': 50, 'cursor': f['log_cursor']}, token=f['user_token'])},
+    {'name': 'createConversationLog', 'function': 'conversationLogs', 'expect': 201,
+     'event': lambda f, i: api_event('POST', '/conversation_logs',
+                                     body={'contactId': f['contact_id'], 'interactionType': 'email',
+                                           'subject': f'bench {i}', 'content': 'benchmark'},
+                                     token=f['user_token'])},
+
+    {'name': 'getMetric', 'function': 'analytics', 'expect': 200,
+     'event': lambda f, i: api_event('GET', '/analytics/{metricId}', {'metricId': f['metric_id']},
+                                     token=f['user_token'])},
+    {'name': 'createMetric', 'function': 'analytics', 'expect': 201,
+     'event': lambda f, i: api_event('POST', '/analytics', body={'metricName': 'responseTime', 'metricValue': i % 1000},
+                                     token=f['user_token'])},
+
+    {'name': 'passVerificationEmail', 'function': 'email', 'expect': 200,
+     'event': lambda f, i: api_event('POST', '/passVerificationEmail', body={'email': f['user']['email']},
+                                     token=f['user_token'])},
+]
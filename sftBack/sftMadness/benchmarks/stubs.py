@@ -0,0 +1,129 @@
+"""In-process stand-ins for the AWS services the handlers call.
+
+The benchmark puts a StubSession into sft_runtime.aws.state['session'], so every
+client('cognito-idp' / 's3' / 'ses') the handlers create is one of these. Responses
+have the shape the handlers read and nothing more - the point is to take AWS latency
+out of the numbers, not to emulate the services. Each call fires the same before-call /
+after-call events a botocore client does, so sft_runtime.instrumentation times and counts
+them like real SDK calls; aws_calls counts them per service as well.
+"""
+import io
+import time
+import types
+
+aws_calls = {}
+
+# optional fixed delay per call (seconds), to approximate a real round trip
+LATENCY = {'cognito-idp': 0.0, 's3': 0.0, 'ses': 0.0}
+
+def cognito_responses(email='bench@example.com', sub='bench-sub'):
+    return {
+        'initiate_auth': {
+            'AuthenticationResult': {
+                'AccessToken': 'bench-access-token',
+                'IdToken': 'bench-id-token',
+                'RefreshToken': 'bench-refresh-token',
+                'ExpiresIn': 3600,
+            }
+        },
+        'get_user': {
+            'Username': sub,
+            'UserAttributes': [{'Name': 'sub', 'Value': sub}, {'Name': 'email', 'Value': email}],
+        },
+        'admin_get_user': {
+            'Username': sub,
+            'UserAttributes': [{'Name': 'sub', 'Value': sub}, {'Name': 'email', 'Value': email}],
+        },
+        'admin_create_user': {
+            'User': {'Username': sub, 'Attributes': [{'Name': 'sub', 'Value': sub}]},
+        },
+    }
+
+def s3_responses():
+    return {
+        'put_object': {'ETag': '"bench"', 'ResponseMetadata': {'HTTPStatusCode': 200}},
+        'get_object': lambda **kwargs: {
+            'Body': io.BytesIO(b'benchmark file contents\n' * 64),
+            'ContentType': 'text/plain',
+            'ResponseMetadata': {'HTTPStatusCode': 200},
+        },
+        'generate_presigned_url': lambda **kwargs: f"https://bench.s3.local/{kwargs.get('Params', {}).get('Key', '')}",
+    }
+
+def ses_responses():
+    return {
+        'send_email': {'MessageId': 'bench-message'},
+        'send_raw_email': {'MessageId': 'bench-message'},
+    }
+
+class StubExceptions:
+    # client.exceptions.<Name> - one exception class per name, created on first access
+    def __init__(self):
+        self.classes = {}
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if name not in self.classes:
+            self.classes[name] = type(name, (Exception,), {})
+        return self.classes[name]
+
+class StubEvents:
+    # the part of botocore's event emitter the instrumentation hooks use
+    def __init__(self):
+        self.handlers = {'before-call': [], 'after-call': []}
+
+    def register(self, event_name, handler):
+        self.handlers[event_name.split('.')[0]].append(handler)
+
+    def register_first(self, event_name, handler):
+        self.handlers[event_name.split('.')[0]].insert(0, handler)
+
+    def emit(self, event_name, **kwargs):
+        for handler in self.handlers[event_name]:
+            handler(**kwargs)
+
+def operation_model(service_name, operation):
+    # initiate_auth -> InitiateAuth, like botocore's operation names
+    name = ''.join(part.capitalize() for part in operation.split('_'))
+    return types.SimpleNamespace(name=name, service_model=types.SimpleNamespace(service_name=service_name))
+
+class StubClient:
+    def __init__(self, service_name, responses):
+        self.service_name = service_name
+        self.responses = responses
+        self.exceptions = StubExceptions()
+        self.meta = types.SimpleNamespace(events=StubEvents(), region_name='us-east-2')
+
+    def __getattr__(self, operation):
+        if operation.startswith('__'):
+            raise AttributeError(operation)
+
+        def call(*args, **kwargs):
+            aws_calls[self.service_name] = aws_calls.get(self.service_name, 0) + 1
+            model = operation_model(self.service_name, operation)
+            context = {}
+            self.meta.events.emit('before-call', model=model, params=kwargs, context=context)
+            if LATENCY.get(self.service_name):
+                time.sleep(LATENCY[self.service_name])
+            response = self.responses.get(operation, {})
+            response = response(**kwargs) if callable(response) else response
+            self.meta.events.emit('after-call', model=model, parsed=response, context=context)
+            return response
+        return call
+
+class StubSession:
+    region_name = 'us-east-2'
+
+    def __init__(self, email='bench@example.com', sub='bench-sub'):
+        self.responses = {
+            'cognito-idp': cognito_responses(email, sub),
+            's3': s3_responses(),
+            'ses': ses_responses(),
+        }
+
+    def client(self, service_name, **kwargs):
+        return StubClient(service_name, self.responses.get(service_name, {}))
+
+def reset_counts():
+    aws_calls.clear()
@@ -0,0 +1,134 @@
+"""Micro-benchmark of token verification before and after the parsed-key cache.
+
+Verifies the same locally signed ID token --iterations times per mode and reports wall time
+(p50 / p95 / p99 / mean) and CPU time per call:
+
+    parse_jwk   the old handler path - find the kid in the JWK set, json.dumps the key and build
+                it with RSAAlgorithm.from_jwk, then jwt.decode. The JWKS download every request
+                also made is left out, this is CPU only
+    cached_key  auth.verify_token - the RSA key object comes from the kid-indexed JWKS cache, so
+                only jwt.decode is left
+
+and, with --token-cache, the verified-token cache on top of that:
+
+    token_miss  auth.get_verified_claims with the cache emptied before each call (a new token)
+    token_hit   auth.get_verified_claims on a warm cache - no signature check at all
+
+    python benchmarks/verify_token.py
+    python benchmarks/verify_token.py --iterations 20000 --token-cache --json verify-token.json
+
+Needs only pyjwt and cryptography from requirements.txt (or --deps), no database. The key is
+the locally generated one from benchmarks/fixtures.py, so no call ever leaves the process.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+import run
+
+def measure(call, iterations, before=None):
+    # (sorted wall times, mean CPU time per call), both in ms
+    samples = []
+    cpu = 0.0
+    for _ in range(iterations):
+        if before:
+            before()
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+        cpu += time.process_time() - cpu_started
+    return sorted(samples), cpu * 1000 / iterations
+
+def report(samples, cpu_ms):
+    return {
+        'p50': round(run.percentile(samples, 50), 4),
+        'p95': round(run.percentile(samples, 95), 4),
+        'p99': round(run.percentile(samples, 99), 4),
+        'mean': round(statistics.fmean(samples), 4),
+        'cpu': round(cpu_ms, 4),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Token verification with and without the parsed-key cache")
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument('--token-cache', action='store_true', help='also measure the verified-token cache')
+    parser.add_argument('--deps', help='directory with the requirements installed (added to sys.path)')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    os.environ.update(run.FAKE_ENV)
+    if args.deps:
+        sys.path.append(args.deps)
+
+    import jwt
+    from jwt import algorithms
+    import fixtures
+    from sft_runtime import auth
+
+    fixtures.install_jwks(auth)
+    token = fixtures.mint_token(fixtures.USER, auth.cognito_issuer())
+    expected = auth.verify_token(token)
+
+    # the key set as Cognito serves it
+    jwk = json.loads(algorithms.RSAAlgorithm.to_jwk(fixtures.signing['private_key'].public_key()))
+    jwk.update({'kid': fixtures.KID, 'alg': 'RS256', 'use': 'sig'})
+    keys = [jwk]
+
+    def parse_jwk():
+        kid = jwt.get_unverified_header(token)['kid']
+        public_key = None
+        for key in keys:
+            if key['kid'] == kid:
+                public_key = algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
+                break
+        return jwt.decode(token, public_key, algorithms=['RS256'], audience=os.environ['COGNITO_CLIENT_ID'],
+                          issuer=auth.cognito_issuer(), options={"verify_exp": True})
+
+    modes = [
+        ('parse_jwk', parse_jwk, None),
+        ('cached_key', lambda: auth.verify_token(token), None),
+    ]
+    if args.token_cache:
+        modes += [
+            ('token_miss', lambda: auth.get_verified_claims(token), auth.token_cache.clear),
+            ('token_hit', lambda: auth.get_verified_claims(token), None),
+        ]
+
+    results = {}
+    for name, call, before in modes:
+        auth.token_cache.clear()
+        # the JWKS cache stats line every 100 key lookups would flood the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            measure(call, args.warmup, before)
+            if call() != expected:
+                raise SystemExit(f"{name}: claims differ from verify_token")
+            results[name] = report(*measure(call, args.iterations, before))
+
+    print(f"{args.iterations} verifications of one token, ms per call\n")
+    print(f"{'mode':<12} {'p50':>8} {'p95':>8} {'p99':>8} {'mean':>8} {'cpu':>8}")
+    for name, stats in results.items():
+        print(f"{name:<12} {stats['p50']:>8.4f} {stats['p95']:>8.4f} {stats['p99']:>8.4f} "
+              f"{stats['mean']:>8.4f} {stats['cpu']:>8.4f}")
+
+    saved = results['parse_jwk']['cpu'] - results['cached_key']['cpu']
+    print(f"\ncaching the parsed key saves {saved:.4f} ms CPU per verify "
+          f"({saved / results['parse_jwk']['cpu']:.0%} of the old path)")
+    if 'token_hit' in results:
+        speedup = results['cached_key']['mean'] / results['token_hit']['mean']
+        print(f"a verified-token cache hit is {speedup:.0f}x faster than verify_token")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'iterations': args.iterations, 'results': results, 'cpu_saved_ms': round(saved, 4)},
+                      f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,18 +1,11 @@
-import os
-import psycopg2
+from sft_runtime.db import get_db_connection
+from sft_runtime.instrumentation import instrumented
+from sft_runtime import log
 
-def get_db_connection():
-    return psycopg2.connect(
-        dbname=os.environ['DB_NAME'],
-        host=os.environ['DB_HOST'],
-        user=os.environ['DB_USER'],
-        password=os.environ['DB_PASSWORD'],
-        port=os.environ['DB_PORT'],
-
-        connect_timeout=5)
 
 # helper handler to cleanup invalidated tokens in the database
 # this is a scheduled event that runs every 6 hours in the background - no need to call this manually
+@instrumented
 def cleanup_handler(event, context):
     try:
         with get_db_connection() as conn:
@@ -24,14 +17,14 @@ def cleanup_handler(event, context):
                 cur.execute("SELECT COUNT(*) FROM invalidated_tokens")
                 remaining_count = cur.fetchone()[0]
                 
-                print(f"Cleanup completed successfully. {remaining_count} tokens remaining.")
+                log.info("Cleanup completed", tokens_remaining=remaining_count)
                 
         return {
             'statusCode': 200,
             'body': 'Cleanup successful'
         }
     except Exception as e:
-        print(f"Error during cleanup: {str(e)}")
+        log.exception("Error during cleanup", error=str(e))
         return {
             'statusCode': 500,
             'body': f'Cleanup failed: {str(e)}'
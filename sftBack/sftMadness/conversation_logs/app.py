@@ -1,34 +1,17 @@
 import json
-import os
-import psycopg2
-from datetime import datetime, date
-import boto3
-import jwt
-from botocore.exceptions import ClientError
-from psycopg2.extras import RealDictCursor
-import requests
-from jwt import algorithms
+from datetime import datetime
 
-def cors_response(status_code, body, content_type="application/json"):
-    headers = {
-        'Content-Type': content_type,
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-        'Access-Control-Allow-Methods': 'OPTIONS,GET,POST,PUT,DELETE',
-    }
-
-    if content_type == "application/json":
-        body = json.dumps(body, default=str)
-
-    return {
-        'statusCode': status_code,
-        'body': body,
-        'headers': headers,
-    }
+from sft_runtime.responses import cors_response, PREFLIGHT_RESPONSE
+from sft_runtime.db import release_db_connection, dict_cursor
+from sft_runtime.auth import authenticate
+from sft_runtime.context import build_request_context
+from sft_runtime.instrumentation import instrumented
+from sft_runtime.pagination import encode_cursor, decode_cursor, count_strategy, total_column, page_total
 
+@instrumented
 def lambda_handler(event, context):
     if event['httpMethod'] == 'OPTIONS':
-        return cors_response(200, "ok")
+        return PREFLIGHT_RESPONSE
     
     http_method = event['httpMethod']
     resource_path = event['resource']
@@ -40,111 +23,34 @@ def lambda_handler(event, context):
             return cors_response(401, "Unauthorized")
         
         token = auth_header.split(' ')[-1]
-        verify_token(token)
+        token_payload, auth = authenticate(token)
 
     except Exception as e:
         return cors_response(401, "Authentication failed")
         
     #routes with authentication
+    request_ctx = None
     try:
+        request_ctx = build_request_context(token_payload, auth)
+
         if resource_path == '/conversation_logs' and http_method == 'POST':
-            return logConversation(event, context)
+            return logConversation(event, context, request_ctx)
         elif resource_path == '/conversation_logs/{userId}' and http_method == 'GET':
-            return getConversationLogs(event, context)
+            return getConversationLogs(event, context, request_ctx)
         else:
             return cors_response(404, "Not Found")
         
     except Exception as e:
         return cors_response(500, str(e))
-    
-###################
-#helper functions
-
-def json_serial(obj):
-    if isinstance(obj, (datetime, date)):
-        return obj.isoformat()
-    raise TypeError ("Type %s not serializable" % type(obj))
-
-def get_db_connection():
-    return psycopg2.connect(
-        dbname=os.environ['DB_NAME'],
-        host=os.environ['DB_HOST'],
-        user=os.environ['DB_USER'],
-        password=os.environ['DB_PASSWORD'],
-        port=os.environ['DB_PORT'],
-
-        connect_timeout=5)
-    
-#AUTH
-def is_token_invalidated(token_payload):
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            jti = token_payload.get('jti')
-            
-            if not jti:
-                raise Exception("Token missing jti claim")
-            
-            cur.execute("""
-                SELECT EXISTS(
-                    SELECT 1 
-                    FROM invalidated_tokens 
-                    WHERE jti = %s
-                )
-            """, (jti,))
-            
-            return cur.fetchone()[0]
-        
-def verify_token(token):
-    # Get the JWT token from the Authorization header
-    if not token:
-        raise Exception('No token provided')
-
-    region = boto3.session.Session().region_name
-    
-    # Get the JWT kid (key ID)
-    headers = jwt.get_unverified_header(token)
-    kid = headers['kid']
-
-    # Get the public keys from Cognito
-    url = f'https://cognito-idp.{region}.amazonaws.com/{os.environ["COGNITO_USER_POOL_ID"]}/.well-known/jwks.json'
-    response = requests.get(url)
-    keys = response.json()['keys']
-
-    # Find the correct public key
-    public_key = None
-    for key in keys:
-        if key['kid'] == kid:
-            public_key = algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
-            break
-
-    if not public_key:
-        raise Exception('Public key not found')
-
-    # Verify the token
-    try:
-        payload = jwt.decode(
-            token,
-            public_key,
-            algorithms=['RS256'],
-            audience=os.environ['COGNITO_CLIENT_ID'],
-            options={"verify_exp": True}
-        )
-
-        if is_token_invalidated(payload):
-            raise Exception('Token has been invalidated')
-        
-        return payload
-    
-    except jwt.ExpiredSignatureError:
-        raise Exception('Token has expired')
-    except jwt.InvalidTokenError:
-        raise Exception('Invalid token')
+    finally:
+        if request_ctx:
+            release_db_connection(request_ctx['conn'])
 
 ####################
 #conversation_logs functions
 
-def logConversation(event, context):
-    conn = None
+def logConversation(event, context, request_ctx):
+    conn = request_ctx['conn']
     try:
         # Parse request body
         try:
@@ -152,19 +58,12 @@ def logConversation(event, context):
         except json.JSONDecodeError as e:
             return cors_response(400, f"Invalid JSON: {str(e)}")
 
-        # Get user ID from token
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-        cognito_user_id = token_payload.get('sub')
-
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT id FROM users WHERE cognito_id = %s", (cognito_user_id,))
-        db_user = cur.fetchone()
-        if not db_user:
+        # Get user ID resolved from the token in lambda_handler
+        user_id = request_ctx['user_id']
+        if not user_id:
             return cors_response(404, "User not found")
-        user_id = db_user['id']
+
+        cur = dict_cursor(conn)
 
         # Extract conversation log information
         contact_id = body.get('contactId')
@@ -205,15 +104,11 @@ def logConversation(event, context):
         })
 
     except Exception as e:
-        if conn:
-            conn.rollback()
+        conn.rollback()
         return cors_response(500, f"Error logging conversation: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
-def getConversationLogs(event, context):
-    conn = None
+def getConversationLogs(event, context, request_ctx):
+    conn = request_ctx['conn']
     try:
         # Get path and query parameters
         user_id = event['pathParameters'].get('userId')
@@ -227,100 +122,102 @@ def getConversationLogs(event, context):
         end_date = query_params.get('endDate')
         limit = query_params.get('limit', '50')  # Default to 50 logs
         offset = query_params.get('offset', '0')  # Default to first page
+        # cursor - nextCursor of the previous page; takes the place of offset
+        cursor = query_params.get('cursor')
 
-        # Get requester's user ID from token
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-        cognito_user_id = token_payload.get('sub')
-
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT id FROM users WHERE cognito_id = %s", (cognito_user_id,))
-        db_user = cur.fetchone()
-        if not db_user:
+        try:
+            limit = int(limit)
+            offset = int(offset)
+            if limit < 1 or offset < 0:
+                raise ValueError("limit must be positive and offset not negative")
+            after = decode_cursor(cursor, (datetime.fromisoformat, int)) if cursor else None
+            # ?count= - exact by default for offset pages (the logs page shows "x-y of total"),
+            # none for cursor pages, counting every matching row is what keyset paging avoids
+            strategy = count_strategy(query_params, 'none' if after else 'exact')
+        except ValueError as e:
+            return cors_response(400, f"Invalid pagination parameters: {str(e)}")
+
+        # Get requester's user ID resolved from the token in lambda_handler
+        requester_db_id = request_ctx['user_id']
+        if not requester_db_id:
             return cors_response(404, "User not found")
-        requester_db_id = str(db_user['id'])
+
+        cur = dict_cursor(conn)
 
         # Verify requester has permission to view these logs
         if str(requester_db_id) != str(user_id):
             return cors_response(403, "Unauthorized to view these conversation logs")
 
-        # Build query with filters
-        query = """
-            SELECT 
-                cl.*,
-                json_build_object(
-                    'id', sc.id,
-                    'email', sc.email,
-                    'phoneNumber', sc.phoneNumber
-                ) as contact
+        # Filters shared by the page and the count
+        source = """
             FROM conversationLogs cl
             JOIN schoolContact sc ON cl.contactId = sc.id
             WHERE cl.userId = %s
         """
-        params = [user_id]
+        filter_params = [user_id]
 
         if contact_id:
-            query += " AND cl.contactId = %s"
-            params.append(contact_id)
+            source += " AND cl.contactId = %s"
+            filter_params.append(contact_id)
         if interaction_type:
-            query += " AND cl.interactionType = %s"
-            params.append(interaction_type)
+            source += " AND cl.interactionType = %s"
+            filter_params.append(interaction_type)
         if start_date:
-            query += " AND cl.timestamp >= %s"
-            params.append(start_date)
+            source += " AND cl.timestamp >= %s"
+            filter_params.append(start_date)
         if end_date:
-            query += " AND cl.timestamp <= %s"
-            params.append(end_date)
-
-        # Add sorting
-        query += " ORDER BY cl.timestamp DESC"
+            source += " AND cl.timestamp <= %s"
+            filter_params.append(end_date)
 
-        # Add pagination
-        query += " LIMIT %s OFFSET %s"
-        params.extend([limit, offset])
+        # Build query with filters - on offset pages an exact total comes back with the rows
+        query = """
+            SELECT 
+                cl.*,
+                json_build_object(
+                    'id', sc.id,
+                    'email', sc.email,
+                    'phoneNumber', sc.phoneNumber
+                ) as contact
+        """ + (total_column(strategy) if not after else "") + source
+        params = list(filter_params)
 
-        # Get total count for pagination
-        count_query = """
-            SELECT COUNT(*) 
-            FROM conversationLogs 
-            WHERE userId = %s
-        """
-        count_params = [user_id]
+        # Keyset pagination - rows after the cursor's (timestamp, id), read straight off the
+        # (userId, timestamp, id) index instead of skipping offset rows
+        if after:
+            query += " AND (cl.timestamp, cl.id) < (%s, %s)"
+            params.extend(after)
 
-        if contact_id:
-            count_query += " AND contactId = %s"
-            count_params.append(contact_id)
-        if interaction_type:
-            count_query += " AND interactionType = %s"
-            count_params.append(interaction_type)
-        if start_date:
-            count_query += " AND timestamp >= %s"
-            count_params.append(start_date)
-        if end_date:
-            count_query += " AND timestamp <= %s"
-            count_params.append(end_date)
+        # Add sorting - id breaks timestamp ties so every row has one place in the order
+        query += " ORDER BY cl.timestamp DESC, cl.id DESC"
 
-        # Execute queries
-        cur.execute(count_query, count_params)
-        total_count = cur.fetchone()['count']
+        # Add pagination - one extra row tells whether there is a next page
+        query += " LIMIT %s"
+        params.append(limit + 1)
+        if not after:
+            query += " OFFSET %s"
+            params.append(offset)
 
         cur.execute(query, params)
         logs = cur.fetchall()
+        total_count = page_total(cur, strategy, logs, "SELECT cl.id" + source, filter_params)
+        has_more = len(logs) > limit
+        logs = logs[:limit]
+
+        pagination = {
+            "limit": limit,
+            "hasMore": has_more,
+            "nextCursor": encode_cursor(logs[-1]['timestamp'], logs[-1]['id']) if has_more else None
+        }
+        if not after:
+            pagination["offset"] = offset
+        if total_count is not None:
+            pagination["total"] = total_count
+            pagination["totalEstimated"] = strategy == 'estimated'
 
         return cors_response(200, {
             "logs": logs,
-            "pagination": {
-                "total": total_count,
-                "offset": int(offset),
-                "limit": int(limit),
-                "hasMore": (int(offset) + int(limit)) < total_count
-            }
+            "pagination": pagination
         })
 
     except Exception as e:
         return cors_response(500, f"Error retrieving conversation logs: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
@@ -1,133 +1,29 @@
 import json
-import boto3
-from botocore.exceptions import ClientError
 import os
 from datetime import datetime
 import email
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-import logging
-import psycopg2
-import jwt
-from jwt import algorithms
-import requests
 import string
 import secrets
 import random
 from datetime import datetime, timedelta
-from psycopg2.extras import RealDictCursor
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+from sft_runtime.responses import cors_response, PREFLIGHT_RESPONSE
+from sft_runtime.db import get_db_connection, release_db_connection, dict_cursor
+from sft_runtime.auth import authenticate
+from sft_runtime.aws import client, client_error
+from sft_runtime.instrumentation import instrumented
+from sft_runtime import log
 
-def cors_response(status_code, body, content_type="application/json"):
-    headers = {
-        'Content-Type': content_type,
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-        'Access-Control-Allow-Methods': 'OPTIONS,GET,POST,PUT,DELETE',
-    }
-
-    if content_type == "application/json":
-        body = json.dumps(body, default=str)
-
-    return {
-        'statusCode': status_code,
-        'body': body,
-        'headers': headers,
-    }
-
-# AUTH
-def is_token_invalidated(token_payload):
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            jti = token_payload.get('jti')
-            
-            if not jti:
-                raise Exception("Token missing jti claim")
-            
-            cur.execute("""
-                SELECT EXISTS(
-                    SELECT 1 
-                    FROM invalidated_tokens 
-                    WHERE jti = %s
-                )
-            """, (jti,))
-            
-            return cur.fetchone()[0]
-
-def verify_token(token):
-    try:
-        if not token:
-            raise Exception('No token provided')
-
-        region = boto3.session.Session().region_name
-
-        try:
-            headers = jwt.get_unverified_header(token)
-            kid = headers['kid']
-        except Exception as e:
-            print(f"Error getting token header: {str(e)}")
-            raise Exception(f'Invalid token header: {str(e)}')
-
-        try:
-            url = f'https://cognito-idp.{region}.amazonaws.com/{os.environ["COGNITO_USER_POOL_ID"]}/.well-known/jwks.json'
-            response = requests.get(url)
-            response.raise_for_status()
-            keys = response.json()['keys']
-        except Exception as e:
-            print(f"Error fetching keys: {str(e)}")
-            raise Exception(f'Error fetching public keys: {str(e)}')
-
-        public_key = None
-        for key in keys:
-            if key['kid'] == kid:
-                try:
-                    public_key = algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
-                    break
-                except Exception as e:
-                    raise Exception(f'Error parsing public key: {str(e)}')
-
-        if not public_key:
-            raise Exception('Public key not found')
-
-        try:
-            payload = jwt.decode(
-                token,
-                public_key,
-                algorithms=['RS256'],
-                options={
-                    'verify_signature': True,
-                    'verify_exp': True,
-                    'verify_aud': True,
-                    'verify_iss': True
-                },
-                audience=os.environ['COGNITO_CLIENT_ID'],
-                issuer=f'https://cognito-idp.us-east-2.amazonaws.com/{os.environ["COGNITO_USER_POOL_ID"]}'
-            )
-            
-            # Check if token has been invalidated
-            if is_token_invalidated(payload):
-                raise Exception('Token has been invalidated')
-                
-            return payload
-            
-        except jwt.ExpiredSignatureError:
-            raise Exception('Token has expired')
-        except jwt.InvalidTokenError:
-            raise Exception('Invalid token')
-        except Exception as e:
-            raise Exception(f'Token verification error: {str(e)}')
-
-    except Exception as e:
-        print(f"Token verification failed: {str(e)}")
 
 #########################################
+@instrumented
 def lambda_handler(event, context):
     if event['httpMethod'] == 'OPTIONS':
-        return cors_response(200, "ok")
+        return PREFLIGHT_RESPONSE
     
-    print(f"Event received: {json.dumps(event)}")
+    log.request(event, "lambda_handler")
     
     http_method = event['httpMethod']
     resource_path = event['resource']
@@ -135,7 +31,6 @@ def lambda_handler(event, context):
     try:
         #verify token
         auth_header = event.get('headers', {}).get('Authorization')
-        print(f"Auth header: {auth_header}")
         if not auth_header:
             return cors_response(401, "Unauthorized")
         if not auth_header.startswith('Bearer '):
@@ -144,10 +39,10 @@ def lambda_handler(event, context):
         token = auth_header.split(' ')[-1]
 
         try:
-            token_payload = verify_token(token)
-            print(f"Token verified successfully: {json.dumps(token_payload)}")
+            token_payload, auth = authenticate(token)
+            log.debug("Token verified", sub=token_payload.get('sub'), jti=token_payload.get('jti'))
         except Exception as e:
-            print(f"Token verification failed: {str(e)}")
+            log.warning("Token verification failed", error=str(e))
             return cors_response(401, f"Authentication failed: {str(e)}")
 
     except Exception as e:
@@ -165,16 +60,6 @@ def lambda_handler(event, context):
         return cors_response(500, str(e))
 
 ####################################
-def get_db_connection():
-    return psycopg2.connect(
-        dbname=os.environ['DB_NAME'],
-        host=os.environ['DB_HOST'],
-        user=os.environ['DB_USER'],
-        password=os.environ['DB_PASSWORD'],
-        port=os.environ['DB_PORT'],
-
-        connect_timeout=5)
-
 #generate random verification code
 def generate_verification_code(length=6):
     """Generate a random verification code of specified length."""
@@ -187,7 +72,7 @@ def store_verification_code(email, code):
     conn = None
     try:
         conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = dict_cursor(conn)
         
         # Get user ID from email
         cur.execute("SELECT id FROM users WHERE email = %s", (email,))
@@ -232,13 +117,13 @@ def store_verification_code(email, code):
         }
         
     except Exception as e:
-        print(f"Database error: {str(e)}")
+        log.exception("Database error", error=str(e))
         if conn:
             conn.rollback()
         raise
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 #######################################
 # Functions
@@ -267,27 +152,7 @@ def store_conversation(user_email, message_content, message_id, thread_id, direc
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cur:
-                # Create table if it doesn't exist
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS email_conversations (
-                        id SERIAL PRIMARY KEY,
-                        email VARCHAR(255) NOT NULL,
-                        timestamp TIMESTAMP NOT NULL,
-                        message_id VARCHAR(255) NOT NULL,
-                        thread_id VARCHAR(255) NOT NULL,
-                        content TEXT NOT NULL,
-                        direction VARCHAR(50) NOT NULL,
-                        metadata JSONB DEFAULT '{}'::jsonb,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # Create index for faster queries
-                cur.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_email_thread 
-                    ON email_conversations(email, thread_id)
-                """)
-                
+                # email_conversations and its (email, thread_id) index come from migrations/0001_baseline.sql
                 # Insert conversation record
                 cur.execute("""
                     INSERT INTO email_conversations 
@@ -305,7 +170,7 @@ def store_conversation(user_email, message_content, message_id, thread_id, direc
                 conn.commit()
         return True
     except Exception as e:
-        logger.error(f"Failed to store conversation: {str(e)}")
+        log.exception("Failed to store conversation", error=str(e))
         return False
 
 def get_conversation_history(user_email, thread_id):
@@ -328,7 +193,7 @@ def get_conversation_history(user_email, thread_id):
                     'timestamp': timestamp.isoformat()
                 } for content, direction, timestamp in conversations]
     except Exception as e:
-        logger.error(f"Failed to retrieve conversation history: {str(e)}")
+        log.exception("Failed to retrieve conversation history", error=str(e))
         return []
 
 async def get_ai_response(message_content, conversation_history):
@@ -347,7 +212,7 @@ def process_incoming_email(event):
     message = ses_notification['mail']
     
     # Get the email content from S3 (SES stores the email in S3)
-    s3 = boto3.client('s3')
+    s3 = client('s3')
     bucket = os.environ['EMAIL_BUCKET']
     key = message['messageId']
     
@@ -394,13 +259,13 @@ def process_incoming_email(event):
         return cors_response(200, {'message': 'Incoming email processed successfully'})
         
     except Exception as e:
-        logger.error(f"Error processing incoming email: {str(e)}")
+        log.exception("Error processing incoming email", error=str(e))
         return cors_response(500, "Error processing incoming email")
 
 #send email
 def sendEmail(recipient_email, subject, body_text, body_html, thread_id=None):
     """Send email using SES."""
-    ses = boto3.client('ses', region_name=os.environ['SES_REGION'])
+    ses = client('ses', region_name=os.environ['SES_REGION'])
     
     try:
         msg = create_email_message(
@@ -429,8 +294,8 @@ def sendEmail(recipient_email, subject, body_text, body_html, thread_id=None):
         
         return response['MessageId']
     
-    except ClientError as e:
-        logger.error(f"Error sending email: {str(e)}")
+    except client_error() as e:
+        log.exception("Error sending email", error=str(e))
         raise
 
 #send verification email
@@ -453,7 +318,7 @@ def send_password_verification_email(event, context):
         verification_code = ''.join(random.choice(string.ascii_uppercase + string.digits) for _ in range(6))
         
         conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = dict_cursor(conn)
         
         # Get user ID from email
         cur.execute("SELECT id FROM users WHERE email = %s", (email,))
@@ -541,7 +406,7 @@ def send_password_verification_email(event, context):
         """
         
         # Send the email using your existing send_email function or SES directly
-        ses_client = boto3.client('ses', region_name=os.environ['SES_REGION'])
+        ses_client = client('ses', region_name=os.environ['SES_REGION'])
         
         configuration_set = os.environ.get('SES_CONFIGURATION_SET', '')
         
@@ -584,10 +449,10 @@ def send_password_verification_email(event, context):
         })
         
     except Exception as e:
-        print(f"Error processing request: {str(e)}")
+        log.exception("Error processing request", error=str(e))
         if conn:
             conn.rollback()
         return cors_response(500, {"error": f"Internal server error: {str(e)}"})
     finally:
         if conn:
-            conn.close()
\ No newline at end of file
+            release_db_connection(conn)
\ No newline at end of file
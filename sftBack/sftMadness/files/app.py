@@ -1,38 +1,20 @@
-import json
 import os
-import psycopg2
-from datetime import datetime, date
-import boto3
 import base64
-import jwt
-from botocore.exceptions import ClientError
-from psycopg2.extras import RealDictCursor
-import requests
-from jwt import algorithms
 import uuid
 import re
 
-def cors_response(status_code, body, content_type="application/json"):
-    headers = {
-        'Content-Type': content_type,
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-        'Access-Control-Allow-Methods': 'OPTIONS,GET,POST,PUT,DELETE',
-    }
-
-    if content_type == "application/json":
-        body = json.dumps(body, default=str)
-
-    return {
-        'statusCode': status_code,
-        'body': body,
-        'headers': headers,
-    }
+from sft_runtime.responses import cors_response, PREFLIGHT_RESPONSE
+from sft_runtime.db import release_db_connection, dict_cursor
+from sft_runtime.auth import authenticate
+from sft_runtime.context import build_request_context
+from sft_runtime.aws import client, client_error
+from sft_runtime.instrumentation import instrumented
+from sft_runtime import log
 
+@instrumented
 def lambda_handler(event, context):
-    print("inside file handler")
     if event['httpMethod'] == 'OPTIONS':
-        return cors_response(200, "ok")
+        return PREFLIGHT_RESPONSE
     
     http_method = event['httpMethod']
     resource_path = event['resource']
@@ -44,127 +26,43 @@ def lambda_handler(event, context):
             return cors_response(401, "Unauthorized")
         
         token = auth_header.split(' ')[-1]
-        verify_token(token)
+        token_payload, auth = authenticate(token)
 
     except Exception as e:
         return cors_response(401, "Authentication failed")
         
     #routes with authentication
+    request_ctx = None
     try:
+        request_ctx = build_request_context(token_payload, auth)
+
         if resource_path == '/files' and http_method == 'POST':
-            return uploadFile(event, context)
+            return uploadFile(event, context, request_ctx)
         elif resource_path == '/files/{fileId}' and http_method == 'GET':
-            return getFile(event, context)
+            return getFile(event, context, request_ctx)
         elif resource_path == '/files/{fileId}' and http_method == 'DELETE':
-            return deleteFile(event, context)
+            return deleteFile(event, context, request_ctx)
         else:
             return cors_response(404, "Not Found")
         
     except Exception as e:
         return cors_response(500, str(e))
-    
-###################
-#helper functions
-
-def json_serial(obj):
-    if isinstance(obj, (datetime, date)):
-        return obj.isoformat()
-    raise TypeError ("Type %s not serializable" % type(obj))
-
-def get_db_connection():
-    return psycopg2.connect(
-        dbname=os.environ['DB_NAME'],
-        host=os.environ['DB_HOST'],
-        user=os.environ['DB_USER'],
-        password=os.environ['DB_PASSWORD'],
-        port=os.environ['DB_PORT'],
-
-        connect_timeout=5)
-    
-#AUTH
-def is_token_invalidated(token_payload):
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            jti = token_payload.get('jti')
-            
-            if not jti:
-                raise Exception("Token missing jti claim")
-            
-            cur.execute("""
-                SELECT EXISTS(
-                    SELECT 1 
-                    FROM invalidated_tokens 
-                    WHERE jti = %s
-                )
-            """, (jti,))
-            
-            return cur.fetchone()[0]
-        
-def verify_token(token):
-    # Get the JWT token from the Authorization header
-    if not token:
-        raise Exception('No token provided')
-
-    region = boto3.session.Session().region_name
-    
-    # Get the JWT kid (key ID)
-    headers = jwt.get_unverified_header(token)
-    kid = headers['kid']
-
-    # Get the public keys from Cognito
-    url = f'https://cognito-idp.{region}.amazonaws.com/{os.environ["COGNITO_USER_POOL_ID"]}/.well-known/jwks.json'
-    response = requests.get(url)
-    keys = response.json()['keys']
-
-    # Find the correct public key
-    public_key = None
-    for key in keys:
-        if key['kid'] == kid:
-            public_key = algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
-            break
-
-    if not public_key:
-        raise Exception('Public key not found')
-
-    # Verify the token
-    try:
-        payload = jwt.decode(
-            token,
-            public_key,
-            algorithms=['RS256'],
-            audience=os.environ['COGNITO_CLIENT_ID'],
-            options={"verify_exp": True}
-        )
-
-        if is_token_invalidated(payload):
-            raise Exception('Token has been invalidated')
-        
-        return payload
-    
-    except jwt.ExpiredSignatureError:
-        raise Exception('Token has expired')
-    except jwt.InvalidTokenError:
-        raise Exception('Invalid token')
+    finally:
+        if request_ctx:
+            release_db_connection(request_ctx['conn'])
 
 ####################
 #files functions
 
-def uploadFile(event, context):
-    conn = None
+def uploadFile(event, context, request_ctx):
+    conn = request_ctx['conn']
     try:
-        # Get user ID from token
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-        cognito_user_id = token_payload.get('sub')
-
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT id FROM users WHERE cognito_id = %s", (cognito_user_id,))
-        db_user = cur.fetchone()
-        if not db_user:
+        # Get user ID resolved from the token in lambda_handler
+        user_id = request_ctx['user_id']
+        if not user_id:
             return cors_response(404, "User not found")
-        user_id = db_user['id']
+
+        cur = dict_cursor(conn)
 
         try:
             # Get content type from front and check for responding boundary
@@ -177,7 +75,7 @@ def uploadFile(event, context):
                         content_type = event['headers'][header_key]
                         break
 
-            print(f"Detected Content-Type: {content_type}")
+            log.debug("Detected Content-Type", content_type=content_type)
 
             if 'multipart/form-data' not in content_type.lower():
                 return cors_response(400, "Content-Type must be multipart/form-data")
@@ -217,12 +115,12 @@ def uploadFile(event, context):
                 boundary_matches = re.findall(r'--+[\w-]+', body[:1000])
                 if boundary_matches:
                     boundary = boundary_matches[0][2:]  #remove leading --
-                    print(f"Auto-detected boundary from body: {boundary}")
+                    log.debug("Auto-detected boundary from body", boundary=boundary)
                     
             if not boundary:
                 return cors_response(400, "Cannot detect boundary in the multipart request")
                 
-            print(f"Using boundary: {boundary}")
+            log.debug("Using boundary", boundary=boundary)
 
             #decode body if necessary
             body = event.get('body', '')
@@ -240,7 +138,7 @@ def uploadFile(event, context):
             filename = None
             filetype = None
 
-            print(f"Found {len(parts)} parts in the multipart request")
+            log.debug("Multipart request", parts=len(parts))
             
             #iterate over parts and extract file content, filename and filetype
             for i, part in enumerate(parts):
@@ -248,7 +146,7 @@ def uploadFile(event, context):
                 if not part or part == '--': 
                     continue
                     
-                print(f"Processing part {i}: length={len(part)}")
+                log.debug("Processing part", part=i, length=len(part))
                 
                 #check for content-disposition header to identify form fields
                 if 'Content-Disposition:' not in part and 'content-disposition:' not in part:
@@ -260,7 +158,7 @@ def uploadFile(event, context):
                 elif '\n\n' in part:
                     headers, content = part.split('\n\n', 1)
                 else:
-                    print(f"Couldn't find header/content delimiter in part {i}")
+                    log.debug("No header/content delimiter in part", part=i)
                     continue
                 
                 #convert headers to lowercase for case-insensitive matching
@@ -278,15 +176,15 @@ def uploadFile(event, context):
                     if isinstance(file_content, str):
                         file_content = file_content.encode('utf-8')
                         
-                    print(f"Found file content of length: {len(file_content) if file_content else 0}")
+                    log.debug("Found file content", length=len(file_content) if file_content else 0)
                 elif 'name="filename"' in headers_lower or "name='filename'" in headers_lower:
                     #extract filename, remove any trailing boundaries
                     filename = content.split('--')[0].strip()
-                    print(f"Found filename: {filename}")
+                    log.debug("Found filename", filename=filename)
                 elif 'name="filetype"' in headers_lower or "name='filetype'" in headers_lower:
                     #extract filetype, remove any trailing boundaries
                     filetype = content.split('--')[0].strip()
-                    print(f"Found filetype: {filetype}")
+                    log.debug("Found filetype", filetype=filetype)
 
             #validate required fields
             if not file_content:
@@ -299,16 +197,14 @@ def uploadFile(event, context):
                 return cors_response(400, "Filetype parameter is required")
 
         except Exception as e:
-            import traceback
-            traceback_str = traceback.format_exc()
-            print(f"Error parsing multipart data: {str(e)}\n{traceback_str}")
+            log.exception("Error parsing multipart data", error=str(e))
             return cors_response(400, f"Error processing file upload: {str(e)}")
 
         #generate unique filename
         unique_filename = f"{uuid.uuid4()}-{filename}"
         
         #initialize S3 client
-        s3_client = boto3.client('s3')
+        s3_client = client('s3')
         bucket_name = os.environ['S3_BUCKET_NAME']
 
         try:
@@ -338,39 +234,28 @@ def uploadFile(event, context):
                 "s3Response": s3_response
             })
 
-        except ClientError as e:
+        except client_error() as e:
             return cors_response(500, f"Error uploading to S3: {str(e)}")
 
     except Exception as e:
-        if conn:
-            conn.rollback()
+        conn.rollback()
         return cors_response(500, f"Error uploading file: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
-            
+
 # NEEDS TO BE FIXED ################################################################
-def getFile(event, context):
-    conn = None
+def getFile(event, context, request_ctx):
+    conn = request_ctx['conn']
     try:
         # Get file ID from path parameters
         file_id = event['pathParameters'].get('fileId')
         if not file_id:
             return cors_response(400, "File ID is required")
 
-        # Get user ID from token
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-        cognito_user_id = token_payload.get('sub')
-
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT id FROM users WHERE cognito_id = %s", (cognito_user_id,))
-        db_user = cur.fetchone()
-        if not db_user:
+        # Get user ID resolved from the token in lambda_handler
+        user_id = request_ctx['user_id']
+        if not user_id:
             return cors_response(404, "User not found")
-        user_id = db_user['id']
+
+        cur = dict_cursor(conn)
 
         # Get file metadata from database
         cur.execute(
@@ -383,7 +268,7 @@ def getFile(event, context):
             return cors_response(404, "File not found or unauthorized access")
 
         # Initialize S3 client
-        s3_client = boto3.client('s3')
+        s3_client = client('s3')
         bucket_name = os.environ['S3_BUCKET_NAME']
 
         try:
@@ -402,36 +287,26 @@ def getFile(event, context):
                 "downloadUrl": presigned_url
             })
 
-        except ClientError as e:
+        except client_error() as e:
             return cors_response(500, f"Error generating download URL: {str(e)}")
 
     except Exception as e:
         return cors_response(500, f"Error retrieving file: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
-def deleteFile(event, context):
-    conn = None
+def deleteFile(event, context, request_ctx):
+    conn = request_ctx['conn']
     try:
         # Get file ID from path parameters
         file_id = event['pathParameters'].get('fileId')
         if not file_id:
             return cors_response(400, "File ID is required")
 
-        # Get user ID from token
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-        cognito_user_id = token_payload.get('sub')
-
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT id FROM users WHERE cognito_id = %s", (cognito_user_id,))
-        db_user = cur.fetchone()
-        if not db_user:
+        # Get user ID resolved from the token in lambda_handler
+        user_id = request_ctx['user_id']
+        if not user_id:
             return cors_response(404, "User not found")
-        user_id = db_user['id']
+
+        cur = dict_cursor(conn)
 
         # Get file metadata and verify ownership
         cur.execute(
@@ -444,7 +319,7 @@ def deleteFile(event, context):
             return cors_response(404, "File not found or unauthorized access")
 
         # Initialize S3 client
-        s3_client = boto3.client('s3')
+        s3_client = client('s3')
         bucket_name = os.environ['S3_BUCKET_NAME']
 
         try:
@@ -471,13 +346,9 @@ def deleteFile(event, context):
                 "fileId": file_id
             })
 
-        except ClientError as e:
+        except client_error() as e:
             return cors_response(500, f"Error deleting from S3: {str(e)}")
 
     except Exception as e:
-        if conn:
-            conn.rollback()
+        conn.rollback()
         return cors_response(500, f"Error deleting file: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
@@ -0,0 +1,15 @@
+# shared runtime for the sftMadness handlers, shipped as the RuntimeLayer (/opt/python)
+# everything here keeps its state at module level, so one copy of each cache / connection
+# lives per container and survives across warm invocations
+#
+#   responses - cors_response and json helpers
+#   db        - persistent postgres connection
+#   auth      - JWKS cache, token verification, revocation set and user cache
+#   context   - per-request context handed to route functions
+#   http      - pooled requests session for outbound HTTPS calls
+#   aws       - boto3 session and clients, created once per container on first use
+#   instrumentation - opt-in (SFT_INSTRUMENTATION=1) per-request query / phase / AWS call timings
+#   log       - leveled, sampled json logging with token / password redaction
+#   pagination - opaque keyset cursors (encode_cursor / decode_cursor)
+#
+# keep this file free of imports - handlers import only the modules they need
@@ -0,0 +1,268 @@
+import os
+import time
+from collections import OrderedDict
+
+from sft_runtime.aws import region
+from sft_runtime.db import get_db_connection, release_db_connection
+from sft_runtime.instrumentation import timed
+from sft_runtime import log
+
+# jwt (which loads cryptography), hashlib and the http session (requests) are imported where they
+# are used, so preflights and other requests that never verify a token don't pay for them
+
+def cognito_issuer():
+    return f'https://cognito-idp.{region()}.amazonaws.com/{os.environ["COGNITO_USER_POOL_ID"]}'
+
+# JWKS cache - kept at module level so warm invocations verify tokens without calling Cognito
+# keys are stored already parsed into RSA public key objects, indexed by kid
+JWKS_CACHE_TTL = int(os.environ.get('JWKS_CACHE_TTL', '3600'))
+JWKS_MIN_REFRESH_INTERVAL = int(os.environ.get('JWKS_MIN_REFRESH_INTERVAL', '30'))
+jwks_cache = {'keys': {}, 'fetched_at': 0.0}
+jwks_cache_stats = {'hits': 0, 'misses': 0, 'refreshes': 0}
+
+def fetch_jwks():
+    from jwt import algorithms
+    from sft_runtime import http
+
+    url = f'{cognito_issuer()}/.well-known/jwks.json'
+    with timed('jwks'):
+        response = http.get(url)
+        response.raise_for_status()
+        jwks_cache['keys'] = {
+            key['kid']: algorithms.RSAAlgorithm.from_jwk(key)
+            for key in response.json()['keys']
+            if key.get('kty') == 'RSA'
+        }
+    jwks_cache['fetched_at'] = time.time()
+    jwks_cache_stats['refreshes'] += 1
+
+def log_jwks_cache_stats():
+    lookups = jwks_cache_stats['hits'] + jwks_cache_stats['misses']
+    log.info(
+        'JWKS cache stats',
+        jwks_cache=jwks_cache_stats,
+        keys=len(jwks_cache['keys']),
+        hit_rate=round(jwks_cache_stats['hits'] / lookups, 3) if lookups else None,
+    )
+
+def get_public_key(kid):
+    # only reached when the token itself isn't cached, report every 100 key lookups like the user cache
+    lookups = jwks_cache_stats['hits'] + jwks_cache_stats['misses']
+    if lookups and lookups % 100 == 0:
+        log_jwks_cache_stats()
+
+    age = time.time() - jwks_cache['fetched_at']
+    if age < JWKS_CACHE_TTL and kid in jwks_cache['keys']:
+        jwks_cache_stats['hits'] += 1
+        return jwks_cache['keys'][kid]
+
+    jwks_cache_stats['misses'] += 1
+
+    # refetch when the cache expired or an unknown kid shows up (key rotation),
+    # rate limited so tokens with bogus kids can't force a fetch on every request
+    if age >= JWKS_CACHE_TTL or age >= JWKS_MIN_REFRESH_INTERVAL:
+        try:
+            fetch_jwks()
+        except Exception:
+            # keep serving the last known keys if Cognito is unreachable
+            if kid not in jwks_cache['keys']:
+                raise
+
+    return jwks_cache['keys'].get(kid)
+
+def verify_token(token):
+    import jwt
+
+    if not token:
+        raise Exception('No token provided')
+
+    # Get the JWT kid (key ID)
+    try:
+        headers = jwt.get_unverified_header(token)
+        kid = headers['kid']
+    except Exception as e:
+        raise Exception(f'Invalid token header: {str(e)}')
+
+    # Find the correct public key in the cached Cognito key set
+    public_key = get_public_key(kid)
+
+    if not public_key:
+        raise Exception('Public key not found')
+
+    # Verify the token
+    try:
+        with timed('jwt'):
+            return jwt.decode(
+                token,
+                public_key,
+                algorithms=['RS256'],
+                audience=os.environ['COGNITO_CLIENT_ID'],
+                issuer=cognito_issuer(),
+                options={"verify_exp": True}
+            )
+    except jwt.ExpiredSignatureError:
+        raise Exception('Token has expired')
+    except jwt.InvalidTokenError:
+        raise Exception('Invalid token')
+
+# Verified-token cache - clients reuse the same ID token for up to an hour, so each container keeps
+# the decoded claims (keyed by a SHA-256 of the token) until the token's exp and skips signature checks
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', '256'))
+token_cache = OrderedDict()
+
+def token_digest(token):
+    import hashlib
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def get_verified_claims(token):
+    digest = token_digest(token)
+    claims = token_cache.get(digest)
+    if claims and claims.get('exp', 0) > time.time():
+        token_cache.move_to_end(digest)
+        return claims
+
+    token_cache.pop(digest, None)
+    claims = verify_token(token)
+    token_cache[digest] = claims
+    if len(token_cache) > TOKEN_CACHE_SIZE:
+        token_cache.popitem(last=False)
+    return claims
+
+def forget_token(token):
+    # drop a token from this container's cache (logout)
+    token_cache.pop(token_digest(token), None)
+
+# Revoked-token set - revocations only come from logout, so instead of querying invalidated_tokens
+# on every request each container keeps the revoked jtis in memory (jti -> token expiry) and pulls
+# only rows newer than the last invalidated_at it has seen
+REVOCATION_MAX_STALENESS = int(os.environ.get('REVOCATION_MAX_STALENESS', '30'))
+revocation_state = {'revoked': {}, 'high_water': None, 'synced_at': 0.0}
+
+def sync_revocations(conn):
+    with conn.cursor() as cur:
+        if revocation_state['high_water'] is None:
+            # first sync on this container: load everything that is still unexpired
+            cur.execute("""
+                SELECT jti, EXTRACT(EPOCH FROM expires_at)::float, invalidated_at
+                FROM invalidated_tokens
+                WHERE expires_at > CURRENT_TIMESTAMP
+            """)
+        else:
+            # re-read a few seconds behind the high-water mark so rows committed out of order are not missed
+            cur.execute("""
+                SELECT jti, EXTRACT(EPOCH FROM expires_at)::float, invalidated_at
+                FROM invalidated_tokens
+                WHERE invalidated_at > %s - INTERVAL '5 seconds'
+            """, (revocation_state['high_water'],))
+        rows = cur.fetchall()
+
+    now = time.time()
+    revoked = revocation_state['revoked']
+    for jti, expires_at, invalidated_at in rows:
+        revoked[jti] = expires_at
+        if revocation_state['high_water'] is None or invalidated_at > revocation_state['high_water']:
+            revocation_state['high_water'] = invalidated_at
+
+    # expired tokens fail verification anyway, no need to remember them
+    for jti in [jti for jti, expires_at in revoked.items() if expires_at < now]:
+        del revoked[jti]
+
+    revocation_state['synced_at'] = now
+
+def is_token_revoked(jti, conn):
+    # a revoked token is accepted for at most REVOCATION_MAX_STALENESS seconds after logout
+    if time.time() - revocation_state['synced_at'] >= REVOCATION_MAX_STALENESS:
+        sync_revocations(conn)
+    return jti in revocation_state['revoked']
+
+def record_revoked(jti, exp):
+    # logout records the revocation here right away instead of waiting for the next sync
+    revocation_state['revoked'][jti] = exp
+
+# Cognito sub -> users row (id, role) cache. Entries live USER_CACHE_TTL seconds; admins and users
+# drop entries in their own container when a user is deleted or their role changes, other
+# containers pick the change up once the TTL runs out
+USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', '60'))
+USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', '1024'))
+user_cache = OrderedDict()
+user_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+def log_user_cache_stats():
+    lookups = user_cache_stats['hits'] + user_cache_stats['misses']
+    log.info(
+        'User cache stats',
+        user_cache=user_cache_stats,
+        size=len(user_cache),
+        hit_rate=round(user_cache_stats['hits'] / lookups, 3) if lookups else None,
+    )
+
+def lookup_user(cognito_id, conn):
+    # report the hit rate every 100 lookups so it shows up in the function logs
+    lookups = user_cache_stats['hits'] + user_cache_stats['misses']
+    if lookups and lookups % 100 == 0:
+        log_user_cache_stats()
+
+    entry = user_cache.get(cognito_id)
+    if entry and time.time() - entry['cached_at'] < USER_CACHE_TTL:
+        user_cache.move_to_end(cognito_id)
+        user_cache_stats['hits'] += 1
+        return entry['user']
+
+    user_cache_stats['misses'] += 1
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, role FROM users WHERE cognito_id = %s", (cognito_id,))
+        db_user = cur.fetchone()
+
+    if not db_user:
+        # unknown subs are not cached so a user is found as soon as they are registered
+        user_cache.pop(cognito_id, None)
+        return None
+
+    user = {'user_id': db_user[0], 'role': db_user[1]}
+    user_cache[cognito_id] = {'user': user, 'cached_at': time.time()}
+    user_cache.move_to_end(cognito_id)
+    if len(user_cache) > USER_CACHE_SIZE:
+        user_cache.popitem(last=False)
+        user_cache_stats['evictions'] += 1
+    return user
+
+def invalidate_cached_user(user_id):
+    # called after a user is deleted or their role changes
+    for cognito_id, entry in list(user_cache.items()):
+        if str(entry['user']['user_id']) == str(user_id):
+            del user_cache[cognito_id]
+            user_cache_stats['invalidations'] += 1
+
+#AUTH
+def resolve_auth(token_payload):
+    jti = token_payload.get('jti')
+    if not jti:
+        raise Exception("Token missing jti claim")
+
+    conn = get_db_connection()
+    try:
+        revoked = is_token_revoked(jti, conn)
+        user = lookup_user(token_payload.get('sub'), conn)
+    finally:
+        # end the transaction the revocation sync / user lookup opened, whatever happens next -
+        # handlers return early (401 on a revoked token or a failed lookup, 400 / 404 before
+        # they build a request context) without reaching their release_db_connection. A no-op
+        # when both were answered from the caches
+        release_db_connection(conn)
+
+    return {
+        'revoked': revoked,
+        'user_id': user['user_id'] if user else None,
+        'role': user['role'] if user else None,
+    }
+
+def authenticate(token):
+    # verified claims plus the caller's revocation status, user id and role
+    with timed('auth'):
+        token_payload = get_verified_claims(token)
+        auth = resolve_auth(token_payload)
+    if auth['revoked']:
+        raise Exception('Token has been invalidated')
+
+    return token_payload, auth
@@ -0,0 +1,32 @@
+import os
+
+from sft_runtime.instrumentation import instrument_client
+
+# boto3 clients - creating one loads the botocore service model and endpoint data, so each client
+# is built once per container on first use and reused by every later invocation. boto3 itself is
+# imported lazily too, so requests that never call AWS (preflights, most routes) don't load it
+state = {'session': None}
+clients = {}
+
+def get_session():
+    if state['session'] is None:
+        import boto3
+        state['session'] = boto3.session.Session()
+    return state['session']
+
+def region():
+    # lambda always sets AWS_REGION, no need to load boto3 just to read it
+    return os.environ.get('AWS_REGION') or get_session().region_name
+
+def client(service_name, **kwargs):
+    key = (service_name, tuple(sorted(kwargs.items())))
+    if key not in clients:
+        clients[key] = instrument_client(get_session().client(service_name, **kwargs))
+    return clients[key]
+
+def client_error():
+    # botocore's ClientError without importing botocore when a handler loads - an except clause
+    # expression is only evaluated while an exception is being handled, so
+    # 'except client_error() as e:' costs nothing on the success path
+    from botocore.exceptions import ClientError
+    return ClientError
@@ -0,0 +1,12 @@
+from sft_runtime.db import get_db_connection
+
+#REQUEST CONTEXT
+# built once per request in lambda_handler: verified claims, the user id and role resolved
+# with the revocation check, and the open connection
+def build_request_context(token_payload, auth):
+    return {
+        'claims': token_payload,
+        'user_id': auth['user_id'],
+        'role': auth['role'],
+        'conn': get_db_connection(),
+    }
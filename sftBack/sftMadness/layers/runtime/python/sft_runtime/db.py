@@ -0,0 +1,86 @@
+import os
+import time
+
+# psycopg2 is imported inside the functions below rather than at module level, so loading a
+# handler (or answering a preflight) doesn't pull in libpq; after the first use the import is
+# just a sys.modules lookup
+
+# Persistent connection - kept at module level and reused across warm invocations,
+# so the TCP + auth handshake only happens on cold start
+DB_HEALTHCHECK_INTERVAL = int(os.environ.get('DB_HEALTHCHECK_INTERVAL', '30'))
+db_state = {'conn': None, 'last_used': 0.0}
+
+def connect_db():
+    import psycopg2
+    from sft_runtime.instrumentation import connection_factory
+    return psycopg2.connect(
+        dbname=os.environ['DB_NAME'],
+        host=os.environ['DB_HOST'],
+        user=os.environ['DB_USER'],
+        password=os.environ['DB_PASSWORD'],
+        port=os.environ['DB_PORT'],
+        # keepalives let a dead socket fail fast instead of hanging the next query
+        keepalives=1,
+        keepalives_idle=30,
+        keepalives_interval=10,
+        keepalives_count=3,
+        connect_timeout=5,
+        # timed cursors when SFT_INSTRUMENTATION is on, psycopg2's default connection otherwise
+        connection_factory=connection_factory())
+
+def close_db_connection():
+    conn = db_state['conn']
+    db_state['conn'] = None
+    if conn is not None and not conn.closed:
+        import psycopg2
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+def get_db_connection():
+    conn = db_state['conn']
+
+    # only ping a connection that sat idle - the container may have been frozen long enough
+    # for RDS or the NAT to drop it
+    if conn is not None and not conn.closed and time.time() - db_state['last_used'] > DB_HEALTHCHECK_INTERVAL:
+        import psycopg2
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+        except psycopg2.Error:
+            close_db_connection()
+
+    if db_state['conn'] is None or db_state['conn'].closed:
+        db_state['conn'] = connect_db()
+
+    db_state['last_used'] = time.time()
+    return db_state['conn']
+
+def release_db_connection(conn):
+    # called at the end of a request instead of close(): roll back anything left open so the next
+    # request starts from a clean session, and drop the connection if it is broken
+    if conn is None or conn.closed:
+        close_db_connection()
+        return
+
+    import psycopg2
+    try:
+        conn.rollback()
+    except psycopg2.Error:
+        close_db_connection()
+
+def dict_cursor(conn):
+    # cursor returning rows as dicts (column name -> value)
+    from psycopg2.extras import RealDictCursor
+    return conn.cursor(cursor_factory=RealDictCursor)
+
+def streaming_cursor(conn, name, itersize=1000):
+    # server-side (named) cursor returning dicts - iterating it fetches itersize rows per round
+    # trip instead of loading the whole result into memory. Lives until the transaction ends,
+    # which release_db_connection does at the end of the request
+    from psycopg2.extras import RealDictCursor
+    cur = conn.cursor(name=name, cursor_factory=RealDictCursor)
+    cur.itersize = itersize
+    return cur
@@ -0,0 +1,38 @@
+import os
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Outbound HTTP session - shared per container so warm invocations reuse the pooled keep-alive
+# connection (no new TLS handshake), with short timeouts so a slow endpoint fails fast instead
+# of running into the 60s function timeout
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', '2'))
+HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', '3'))
+HTTP_RETRIES = int(os.environ.get('HTTP_RETRIES', '2'))
+
+def build_session():
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=0.2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        # only idempotent requests are retried
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False,
+    )
+    # a container handles one request at a time, a couple of pooled connections per host is plenty
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+session = build_session()
+
+def get(url, **kwargs):
+    kwargs.setdefault('timeout', (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+    return session.get(url, **kwargs)
+
+def post(url, **kwargs):
+    kwargs.setdefault('timeout', (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+    return session.post(url, **kwargs)
@@ -0,0 +1,224 @@
+import os
+import time
+import json
+from contextlib import contextmanager, nullcontext
+
+# Opt-in request instrumentation - set SFT_INSTRUMENTATION=1 on a function to get one JSON log line
+# per invocation with the number of queries, time spent in postgres, the slowest statement, JWKS
+# fetch / JWT decode time and every AWS SDK call. With it and SFT_SERVER_TIMING off (the default)
+# none of the hooks are installed and the handlers run exactly as before
+def flag(name):
+    return os.environ.get(name, '').lower() in ('1', 'true', 'yes')
+
+LOG_STATS = flag('SFT_INSTRUMENTATION')
+# SFT_SERVER_TIMING=1 adds a Server-Timing header (auth, db, cognito / s3 / ses, serialize, total and
+# a cold / warm marker) to every API response, so browsers and monitors see where the time went
+SERVER_TIMING = flag('SFT_SERVER_TIMING')
+ENABLED = LOG_STATS or SERVER_TIMING
+SLOW_STATEMENT_CHARS = 200
+
+# Server-Timing metric names for the AWS services the handlers call
+SERVICE_METRICS = {'cognito-idp': 'cognito', 's3': 's3', 'ses': 'ses'}
+
+# per-invocation numbers, reset by start_request
+request_stats = {}
+container_state = {'invocations': 0}
+
+def start_request(event):
+    request_stats.clear()
+    request_stats.update({
+        'started': time.perf_counter(),
+        'route': route_of(event),
+        'cold': container_state['invocations'] == 0,
+        'queries': 0,
+        'db_ms': 0.0,
+        'slowest_ms': 0.0,
+        'slowest': None,
+        'phases': {},
+        'aws': {},
+    })
+    container_state['invocations'] += 1
+
+def route_of(event):
+    if not isinstance(event, dict):
+        return None
+    if 'httpMethod' in event:
+        return f"{event['httpMethod']} {event.get('resource')}"
+    # scheduled / other event sources
+    return event.get('detail-type') or event.get('source')
+
+def add_phase(name, elapsed_ms):
+    if request_stats:
+        request_stats['phases'][name] = request_stats['phases'].get(name, 0.0) + elapsed_ms
+
+@contextmanager
+def _timed(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_phase(name, (time.perf_counter() - started) * 1000)
+
+def timed(name):
+    # with timed('jwks'): ... - adds the block's duration to the named phase
+    return _timed(name) if ENABLED else nullcontext()
+
+def summary(status_code=None):
+    return {
+        'type': 'request_stats',
+        'function': os.environ.get('AWS_LAMBDA_FUNCTION_NAME'),
+        'route': request_stats.get('route'),
+        'status': status_code,
+        'cold': request_stats.get('cold'),
+        'duration_ms': round((time.perf_counter() - request_stats['started']) * 1000, 2),
+        'db': {
+            'queries': request_stats['queries'],
+            'ms': round(request_stats['db_ms'], 2),
+            'slowest_ms': round(request_stats['slowest_ms'], 2),
+            'slowest': request_stats['slowest'],
+        },
+        'phases': {k: round(v, 2) for k, v in request_stats['phases'].items()},
+        'aws': {k: {'calls': v['calls'], 'ms': round(v['ms'], 2)} for k, v in request_stats['aws'].items()},
+    }
+
+def server_timing_header(stats):
+    metrics = []
+    for name in ('auth', 'serialize'):
+        if name in stats['phases']:
+            metrics.append(f"{name};dur={stats['phases'][name]:.1f}")
+    if stats['db']['queries']:
+        metrics.append(f"db;dur={stats['db']['ms']:.1f};desc=\"queries={stats['db']['queries']}\"")
+    services = {}
+    for key, entry in stats['aws'].items():
+        service = key.split('.')[0]
+        metric = SERVICE_METRICS.get(service, service.replace('-', '_'))
+        services[metric] = services.get(metric, 0.0) + entry['ms']
+    metrics.extend(f"{metric};dur={ms:.1f}" for metric, ms in services.items())
+    metrics.append(f"total;dur={stats['duration_ms']:.1f}")
+    metrics.append('cold' if stats['cold'] else 'warm')
+    return ', '.join(metrics)
+
+def add_server_timing(response, stats):
+    # a new headers dict - responses can be shared objects (PREFLIGHT_RESPONSE)
+    headers = dict(response.get('headers') or {})
+    headers['Server-Timing'] = server_timing_header(stats)
+    # lets the browser's Resource Timing API (and fetch) see the header on cross-origin calls
+    headers['Timing-Allow-Origin'] = '*'
+    exposed = headers.get('Access-Control-Expose-Headers')
+    headers['Access-Control-Expose-Headers'] = f'{exposed}, Server-Timing' if exposed else 'Server-Timing'
+    response['headers'] = headers
+
+def instrumented(handler):
+    # wraps a lambda handler; returned unchanged when instrumentation is off
+    if not ENABLED:
+        return handler
+
+    def wrapper(event, context):
+        # preflights stay on their fast path and out of the logs, but they still use up the cold
+        # start - the request after one runs in a warm container
+        if isinstance(event, dict) and event.get('httpMethod') == 'OPTIONS':
+            container_state['invocations'] += 1
+            return handler(event, context)
+
+        start_request(event)
+        response = None
+        try:
+            response = handler(event, context)
+            return response
+        finally:
+            is_api_response = isinstance(response, dict) and 'statusCode' in response
+            stats = summary(response['statusCode'] if is_api_response else None)
+            if SERVER_TIMING and is_api_response and isinstance(event, dict) and 'httpMethod' in event:
+                add_server_timing(response, stats)
+            if LOG_STATS:
+                print(json.dumps(stats, default=str))
+
+    wrapper.__name__ = handler.__name__
+    wrapper.__doc__ = handler.__doc__
+    return wrapper
+
+############################################
+# postgres - a connection factory whose cursors time every execute
+def record_query(query, started):
+    if not request_stats:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    request_stats['queries'] += 1
+    request_stats['db_ms'] += elapsed_ms
+    if elapsed_ms >= request_stats['slowest_ms']:
+        request_stats['slowest_ms'] = elapsed_ms
+        # statement text only, never the parameters
+        if isinstance(query, bytes):
+            query = query.decode('utf-8', 'replace')
+        request_stats['slowest'] = ' '.join(str(query).split())[:SLOW_STATEMENT_CHARS]
+
+# every executed statement with its parameters bound, for the benchmark's plan check
+# (benchmarks/run.py --check-plans) - a list while it collects, None otherwise
+statement_capture = {'statements': None}
+
+def capture_statement(cursor):
+    if statement_capture['statements'] is not None and cursor.query:
+        statement_capture['statements'].append(cursor.query)
+
+cursor_classes = {}
+
+def timed_cursor(base):
+    # one subclass per cursor factory in use (plain cursor, RealDictCursor)
+    if base not in cursor_classes:
+        class TimedCursor(base):
+            def execute(self, query, vars=None):
+                started = time.perf_counter()
+                try:
+                    return super().execute(query, vars)
+                finally:
+                    record_query(query, started)
+                    capture_statement(self)
+
+            def executemany(self, query, vars_list):
+                started = time.perf_counter()
+                try:
+                    return super().executemany(query, vars_list)
+                finally:
+                    record_query(query, started)
+
+        cursor_classes[base] = TimedCursor
+    return cursor_classes[base]
+
+connection_state = {'factory': None}
+
+def connection_factory():
+    # passed to psycopg2.connect; None (psycopg2's default connection) when instrumentation is off
+    if not ENABLED:
+        return None
+    if connection_state['factory'] is None:
+        import psycopg2.extensions
+
+        class TimedConnection(psycopg2.extensions.connection):
+            def cursor(self, *args, **kwargs):
+                base = kwargs.get('cursor_factory') or self.cursor_factory or psycopg2.extensions.cursor
+                kwargs['cursor_factory'] = timed_cursor(base)
+                return super().cursor(*args, **kwargs)
+
+        connection_state['factory'] = TimedConnection
+    return connection_state['factory']
+
+############################################
+# AWS SDK - botocore before-call / after-call hooks on each client
+def before_aws_call(context=None, **kwargs):
+    if context is not None:
+        context['sft_started'] = time.perf_counter()
+
+def after_aws_call(model=None, context=None, **kwargs):
+    if not request_stats or context is None or 'sft_started' not in context:
+        return
+    key = f"{model.service_model.service_name}.{model.name}"
+    entry = request_stats['aws'].setdefault(key, {'calls': 0, 'ms': 0.0})
+    entry['calls'] += 1
+    entry['ms'] += (time.perf_counter() - context.pop('sft_started')) * 1000
+
+def instrument_client(aws_client):
+    if ENABLED:
+        # first, so the clock starts before any other handler can answer the call
+        aws_client.meta.events.register_first('before-call.*.*', before_aws_call)
+        aws_client.meta.events.register('after-call.*.*', after_aws_call)
+    return aws_client
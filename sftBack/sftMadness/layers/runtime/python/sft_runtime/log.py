@@ -0,0 +1,102 @@
+import os
+import re
+import sys
+import json
+import random
+
+# Structured logging - one JSON object per line, which CloudWatch Logs Insights can filter on
+# (filter level = "ERROR", stats count() by message). Lines below LOG_LEVEL return before anything is
+# formatted or serialized, so debug calls on hot paths cost a comparison. LOG_SAMPLE_RATE keeps that
+# fraction of DEBUG / INFO lines; warnings and errors are always written
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40}
+LOG_LEVEL = LEVELS.get(os.environ.get('LOG_LEVEL', 'INFO').upper(), LEVELS['INFO'])
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '1.0'))
+
+# anything under these keys is replaced, at any depth (headers, bodies, token payloads)
+REDACTED_KEYS = {
+    'authorization', 'cookie', 'set-cookie', 'x-amz-security-token', 'x-api-key',
+    'password', 'newpassword', 'oldpassword', 'token', 'idtoken', 'accesstoken', 'refreshtoken',
+    'id_token', 'access_token', 'refresh_token', 'verificationcode', 'code', 'secret', 'db_password',
+}
+JWT_PATTERN = re.compile(r'eyJ[\w-]+\.[\w-]+\.[\w-]+')
+BEARER_PATTERN = re.compile(r'Bearer\s+\S+')
+MAX_STRING = 2000
+
+def enabled(level):
+    return LEVELS[level] >= LOG_LEVEL
+
+def redact(value, depth=0):
+    if depth > 8:
+        return '[...]'
+    if isinstance(value, dict):
+        return {
+            k: '[REDACTED]' if str(k).lower() in REDACTED_KEYS and v is not None else redact(v, depth + 1)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(v, depth + 1) for v in value]
+    if isinstance(value, (bytes, bytearray)):
+        return f'<{len(value)} bytes>'
+    if isinstance(value, str):
+        if 'eyJ' in value:
+            value = JWT_PATTERN.sub('[REDACTED_JWT]', value)
+        if 'Bearer' in value:
+            value = BEARER_PATTERN.sub('Bearer [REDACTED]', value)
+        if len(value) > MAX_STRING:
+            value = value[:MAX_STRING] + f'...<{len(value) - MAX_STRING} more chars>'
+    return value
+
+def write(level, message, fields):
+    record = {'level': level, 'message': message}
+    if fields:
+        record.update(redact(fields))
+    sys.stdout.write(json.dumps(record, default=str) + '\n')
+
+def emit(level, message, **fields):
+    if LEVELS[level] < LOG_LEVEL:
+        return
+    if LEVELS[level] < LEVELS['WARNING'] and LOG_SAMPLE_RATE < 1.0 and random.random() >= LOG_SAMPLE_RATE:
+        return
+    write(level, message, fields)
+
+def debug(message, **fields):
+    emit('DEBUG', message, **fields)
+
+def info(message, **fields):
+    emit('INFO', message, **fields)
+
+def warning(message, **fields):
+    emit('WARNING', message, **fields)
+
+def error(message, **fields):
+    emit('ERROR', message, **fields)
+
+def exception(message, **fields):
+    # error with the current traceback
+    import traceback
+    fields['traceback'] = traceback.format_exc()
+    emit('ERROR', message, **fields)
+
+def event_summary(event):
+    # what an API Gateway event looks like at INFO - the full event (headers, body) is DEBUG only
+    if not isinstance(event, dict):
+        return {}
+    body = event.get('body')
+    identity = (event.get('requestContext') or {}).get('identity') or {}
+    return {
+        'method': event.get('httpMethod'),
+        'resource': event.get('resource'),
+        'path_parameters': event.get('pathParameters'),
+        'query': sorted((event.get('queryStringParameters') or {}).keys()),
+        'body_bytes': len(body) if isinstance(body, str) else 0,
+        'source_ip': identity.get('sourceIp'),
+    }
+
+def request(event, handler_name=None):
+    # the one line a handler writes per request: summary at INFO, the redacted event at DEBUG
+    if not enabled('INFO'):
+        return
+    if enabled('DEBUG'):
+        debug('Event received', handler=handler_name, event=event)
+    else:
+        info('Event received', handler=handler_name, **event_summary(event))
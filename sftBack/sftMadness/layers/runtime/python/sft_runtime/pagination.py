@@ -0,0 +1,71 @@
+import json
+import base64
+from datetime import date, datetime
+
+# Keyset (cursor) pagination - a cursor is the sort key of the last row on a page, e.g.
+# (timestamp, id), base64url encoded so clients pass it back without looking inside. The next
+# page is "WHERE (timestamp, id) < cursor ORDER BY timestamp DESC, id DESC LIMIT n", which an
+# index on the sort key answers by reading n rows, however deep the page is
+def encode_cursor(*values):
+    values = [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, types):
+    # types converts each value back, e.g. (datetime.fromisoformat, int)
+    # raises ValueError for anything that isn't a cursor this API handed out
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Invalid cursor")
+    try:
+        return [convert(value) for convert, value in zip(types, values)]
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+# Totals for list endpoints - ?count= picks how (each endpoint has its own default):
+#   exact      COUNT(*) OVER () on the page query, the total comes back with the rows
+#   estimated  the planner's row estimate for the filtered query (EXPLAIN, nothing is scanned)
+#   none       no total, hasMore comes from fetching limit + 1 rows
+COUNT_STRATEGIES = ('exact', 'estimated', 'none')
+
+def count_strategy(query_params, default):
+    strategy = query_params.get('count')
+    # includeTotal=true/false from before ?count= existed
+    if strategy is None and 'includeTotal' in query_params:
+        strategy = 'exact' if query_params['includeTotal'].lower() == 'true' else 'none'
+    strategy = strategy or default
+    if strategy not in COUNT_STRATEGIES:
+        raise ValueError(f"count must be one of {', '.join(COUNT_STRATEGIES)}")
+    return strategy
+
+def total_column(strategy):
+    # appended to the page query's select list - the window counts every row matching the WHERE
+    # before LIMIT / OFFSET apply, so no second COUNT(*) query is needed
+    return ", COUNT(*) OVER () AS total_count" if strategy == 'exact' else ""
+
+def page_total(cur, strategy, rows, query, params):
+    # rows - the fetched page (total_count is taken out of them)
+    # query / params - the filtered query without ORDER BY / LIMIT, for the cases the page can't answer
+    if strategy == 'none':
+        return None
+    if strategy == 'estimated':
+        return estimate_rows(cur, query, params)
+    if rows and 'total_count' in rows[0]:
+        total = rows[0]['total_count']
+        for row in rows:
+            del row['total_count']
+        return total
+    # past the last page (or a cursor page, where the WHERE only covers the rows after the cursor)
+    cur.execute(f"SELECT COUNT(*) AS count FROM ({query}) AS matching", params)
+    return cur.fetchone()['count']
+
+def estimate_rows(cur, query, params):
+    cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+    row = cur.fetchone()
+    plan = row['QUERY PLAN'] if isinstance(row, dict) else row[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
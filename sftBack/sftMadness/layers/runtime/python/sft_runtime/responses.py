@@ -0,0 +1,33 @@
+import json
+from datetime import datetime, date
+
+from sft_runtime.instrumentation import timed
+
+# cors_response function to return API Gateway response with CORS headers
+def cors_response(status_code, body, content_type="application/json"):
+    headers = {
+        'Content-Type': content_type,
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
+        'Access-Control-Allow-Methods': 'OPTIONS,GET,POST,PUT,DELETE',
+    }
+
+    if content_type == "application/json":
+        with timed('serialize'):
+            body = json.dumps(body, default=str)
+
+    return {
+        'statusCode': status_code,
+        'body': body,
+        'headers': headers,
+    }
+
+# CORS preflight - the response never changes, so it is built once when the module loads and
+# handlers return it before touching auth, the database or any AWS client
+PREFLIGHT_RESPONSE = cors_response(200, "ok")
+
+# Custom JSON serializer for datetime objects
+def json_serial(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError ("Type %s not serializable" % type(obj))
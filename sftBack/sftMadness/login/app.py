@@ -1,28 +1,14 @@
 import json
-import boto3
 import os
-from botocore.exceptions import ClientError
 
-def cors_response(status_code, body, content_type="application/json"):
-    headers = {
-        'Content-Type': content_type,
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-        'Access-Control-Allow-Methods': 'OPTIONS,GET,POST,PUT,DELETE',
-    }
-
-    if content_type == "application/json":
-        body = json.dumps(body, default=str)
-
-    return {
-        'statusCode': status_code,
-        'body': body,
-        'headers': headers,
-    }
+from sft_runtime.responses import cors_response, PREFLIGHT_RESPONSE
+from sft_runtime.aws import client, client_error
+from sft_runtime.instrumentation import instrumented
 
+@instrumented
 def login_handler(event, context):
     if event['httpMethod'] == 'OPTIONS':
-        return cors_response(200, "ok")
+        return PREFLIGHT_RESPONSE
     
     try:
         # Parse request body
@@ -38,7 +24,7 @@ def login_handler(event, context):
             return cors_response(400, "Email and password are required")
 
         # Initialize Cognito client
-        cognito_client = boto3.client('cognito-idp')
+        cognito_client = client('cognito-idp')
 
         try:
             # Attempt authentication
@@ -81,7 +67,7 @@ def login_handler(event, context):
             return cors_response(403, "User is not confirmed")
         except cognito_client.exceptions.UserNotFoundException:
             return cors_response(404, "User not found")
-        except ClientError as e:
+        except client_error() as e:
             return cors_response(500, f"Authentication error: {str(e)}")
 
     except Exception as e:
@@ -1,86 +1,14 @@
-import json
-import boto3
 import os
-import requests
-import jwt
-from jwt import algorithms
-from botocore.exceptions import ClientError
-import psycopg2
 from datetime import datetime
 
-def cors_response(status_code, body, content_type="application/json"):
-    headers = {
-        'Content-Type': content_type,
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-        'Access-Control-Allow-Methods': 'OPTIONS,GET,POST,PUT,DELETE',
-    }
-
-    if content_type == "application/json":
-        body = json.dumps(body, default=str)
-
-    return {
-        'statusCode': status_code,
-        'body': body,
-        'headers': headers,
-    }
-
-def verify_token(token, token_type="id"):
-    """Verify the JWT token and check if it's been invalidated"""
-    if not token:
-        raise Exception('No token provided')
-
-    region = boto3.session.Session().region_name
-    
-    # Get the JWT kid (key ID)
-    headers = jwt.get_unverified_header(token)
-    kid = headers['kid']
-
-    # Get the public keys from Cognito
-    url = f'https://cognito-idp.{region}.amazonaws.com/{os.environ["COGNITO_USER_POOL_ID"]}/.well-known/jwks.json'
-    response = requests.get(url)
-    keys = response.json()['keys']
-
-    # Find the correct public key
-    public_key = None
-    for key in keys:
-        if key['kid'] == kid:
-            public_key = algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
-            break
-
-    if not public_key:
-        raise Exception('Public key not found')
-
-    try:
-        # Verify the token
-        payload = jwt.decode(
-            token,
-            public_key,
-            algorithms=['RS256'],
-            audience=os.environ['COGNITO_CLIENT_ID']
-        )
-        
-        # Check if token has been invalidated
-        if is_token_invalidated(payload):
-            raise Exception('Token has been invalidated')
-            
-        return payload
-    except jwt.ExpiredSignatureError:
-        raise Exception('Token has expired')
-    except jwt.InvalidTokenError:
-        raise Exception('Invalid token')
+from sft_runtime.responses import cors_response, PREFLIGHT_RESPONSE
+from sft_runtime.db import get_db_connection
+from sft_runtime.auth import authenticate, record_revoked, forget_token
+from sft_runtime.aws import client, client_error
+from sft_runtime.instrumentation import instrumented
+from sft_runtime import log
 
 ############################################
-def get_db_connection():
-    return psycopg2.connect(
-        dbname=os.environ['DB_NAME'],
-        host=os.environ['DB_HOST'],
-        user=os.environ['DB_USER'],
-        password=os.environ['DB_PASSWORD'],
-        port=os.environ['DB_PORT'],
-
-        connect_timeout=5)
-
 def invalidate_token(token_payload, user_id, token_type="id"):
     with get_db_connection() as conn:
         with conn.cursor() as cur:
@@ -101,42 +29,16 @@ def invalidate_token(token_payload, user_id, token_type="id"):
             """, (jti, user_id, expires_at, token_type))
             conn.commit()
 
-def is_token_invalidated(token_payload):
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            jti = token_payload.get('jti')
-            
-            if not jti:
-                raise Exception("Token missing jti claim")
-            
-            cur.execute("""
-                SELECT EXISTS(
-                    SELECT 1 
-                    FROM invalidated_tokens 
-                    WHERE jti = %s
-                )
-            """, (jti,))
-            
-            return cur.fetchone()[0]
+    # revocation checks are answered from memory, so record it here right away
+    # instead of waiting for the next sync
+    record_revoked(jti, exp)
 
-def get_user_id_from_cognito_id(cognito_id):
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT id 
-                FROM users 
-                WHERE cognito_id = %s
-            """, (cognito_id,))
-            result = cur.fetchone()
-            if result:
-                return result[0]
-            return None
-        
 ############################################
 # handler
+@instrumented
 def logout_handler(event, context):
     if event['httpMethod'] == 'OPTIONS':
-        return cors_response(200, "ok")
+        return PREFLIGHT_RESPONSE
     
     try:
         # Get the access token from Authorization header
@@ -151,13 +53,14 @@ def logout_handler(event, context):
 
         try:
             # Verify ID token
-            id_token_payload = verify_token(id_token, "id")
+            id_token_payload, auth = authenticate(id_token)
             
             cognito_sub = id_token_payload.get('sub')
             if not cognito_sub:
                 return cors_response(400, "Could not get user ID from token")
 
-            user_id = get_user_id_from_cognito_id(cognito_sub)
+            # user id comes back from the same query as the revocation check
+            user_id = auth['user_id']
             if not user_id:
                 return cors_response(404, "User not found in database")
 
@@ -165,7 +68,7 @@ def logout_handler(event, context):
             if not email:
                 return cors_response(400, "Could not get email from token")
 
-            cognito_client = boto3.client('cognito-idp')
+            cognito_client = client('cognito-idp')
 
             try:
                 # Sign out globally
@@ -176,6 +79,7 @@ def logout_handler(event, context):
                 
                 # Invalidate ID token
                 invalidate_token(id_token_payload, user_id, "id")
+                forget_token(id_token)
 
                 # Log the action
                 with get_db_connection() as conn:
@@ -193,13 +97,13 @@ def logout_handler(event, context):
 
             except cognito_client.exceptions.UserNotFoundException:
                 return cors_response(404, "User not found in Cognito")
-            except ClientError as e:
+            except client_error() as e:
                 return cors_response(500, f"Logout error: {str(e)}")
 
         except Exception as e:
-            print("Token verification error:", str(e))
+            log.warning("Token verification error", error=str(e))
             return cors_response(401, f"Invalid token: {str(e)}")
 
     except Exception as e:
-        print("General error:", str(e))
+        log.exception("Logout failed", error=str(e))
         return cors_response(500, f"Internal server error: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,142 @@
+-- baseline - the tables the handlers use, as the deployed database was created by hand
+-- (reconstructed from the queries in the handlers). Everything only creates what is missing, so on
+-- that database this only records the starting point; on a new one it creates the schema.
+-- Don't edit this file, schema changes go in a new migration
+
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    email VARCHAR(255) NOT NULL UNIQUE,
+    password VARCHAR(255),
+    role VARCHAR(50) NOT NULL DEFAULT 'user',
+    companyName VARCHAR(255),
+    phoneNumber VARCHAR(50),
+    joinDate TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    cognito_id VARCHAR(255) UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS schoolContact (
+    id SERIAL PRIMARY KEY,
+    userId INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    email VARCHAR(255),
+    phoneNumber VARCHAR(50),
+    createdAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    id SERIAL PRIMARY KEY,
+    contactId INTEGER REFERENCES schoolContact(id) ON DELETE CASCADE,
+    userId INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    subject VARCHAR(255),
+    type VARCHAR(50),
+    attendees TEXT,
+    scheduledDate TIMESTAMP,
+    status VARCHAR(50) DEFAULT 'pending',
+    createdAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS conversationLogs (
+    id SERIAL PRIMARY KEY,
+    userId INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    contactId INTEGER REFERENCES schoolContact(id) ON DELETE CASCADE,
+    interactionType VARCHAR(50),
+    subject VARCHAR(255),
+    content TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS files (
+    id SERIAL PRIMARY KEY,
+    userId INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    filename VARCHAR(255),
+    filepath VARCHAR(1024),
+    filetype VARCHAR(255),
+    uploadDate TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS scrapedFiles (
+    id SERIAL PRIMARY KEY,
+    userId INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    model VARCHAR(255),
+    filename VARCHAR(255),
+    filepath VARCHAR(1024),
+    filetype VARCHAR(255),
+    uploadDate TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS customs (
+    id SERIAL PRIMARY KEY,
+    userId INTEGER NOT NULL UNIQUE REFERENCES users(id) ON DELETE CASCADE,
+    modelName VARCHAR(255),
+    modelLogo TEXT,
+    introduction TEXT,
+    friendliness INTEGER,
+    formality INTEGER,
+    accent VARCHAR(100),
+    verbosity INTEGER,
+    humor INTEGER,
+    technicalLevel INTEGER,
+    preferredGreeting TEXT,
+    signatureClosing TEXT,
+    instructions TEXT
+);
+
+CREATE TABLE IF NOT EXISTS analytics (
+    id SERIAL PRIMARY KEY,
+    userId INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    metricName VARCHAR(255) NOT NULL,
+    metricValue NUMERIC NOT NULL,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS admin_logs (
+    id SERIAL PRIMARY KEY,
+    adminId INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    actionType VARCHAR(100),
+    targetId INTEGER,
+    details TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS password_reset_codes (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    code VARCHAR(20) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS invalidated_tokens (
+    jti VARCHAR(255) PRIMARY KEY,
+    user_id INTEGER,
+    expires_at TIMESTAMP NOT NULL,
+    token_type VARCHAR(20),
+    invalidated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS email_conversations (
+    id SERIAL PRIMARY KEY,
+    email VARCHAR(255) NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    message_id VARCHAR(255) NOT NULL,
+    thread_id VARCHAR(255) NOT NULL,
+    content TEXT NOT NULL,
+    direction VARCHAR(50) NOT NULL,
+    metadata JSONB DEFAULT '{}'::jsonb,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_email_thread ON email_conversations(email, thread_id);
+
+-- called by the TokenCleanupFunction (cleanup/app.py). Only created when missing - the deployed
+-- database has its own version and the baseline must not replace it; change it in a new migration
+DO $do$
+BEGIN
+    IF to_regprocedure('cleanup_expired_tokens()') IS NULL THEN
+        CREATE FUNCTION cleanup_expired_tokens() RETURNS void AS $fn$
+        BEGIN
+            DELETE FROM invalidated_tokens WHERE expires_at < CURRENT_TIMESTAMP;
+        END;
+        $fn$ LANGUAGE plpgsql;
+    END IF;
+END;
+$do$;
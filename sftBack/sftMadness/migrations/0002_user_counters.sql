@@ -0,0 +1,106 @@
+-- per-user event / contact / file counts for the admin user list (admins getUsers)
+--
+-- the counts used to come from LEFT JOINs of users to events, schoolContact and files with
+-- COUNT(DISTINCT ...), which builds events x contacts x files rows per user before grouping. They
+-- are now columns on users, kept current by statement-level triggers on the three tables - every
+-- create / delete path (the sftEvents, school_contact and files handlers, cascades from deleting a
+-- contact or a user, manual fixes in psql) goes through them, so no handler has to remember to
+-- update a count. A statement touching n rows updates each affected user once.
+--
+-- also fine on a database that already had this applied by hand: columns / indexes are IF NOT
+-- EXISTS, triggers are replaced and the counts are recomputed. The backfill runs under a SHARE lock
+-- on the three tables, so no row is written between the triggers being created and the counts
+-- being taken.
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS event_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE users ADD COLUMN IF NOT EXISTS contact_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE users ADD COLUMN IF NOT EXISTS file_count INTEGER NOT NULL DEFAULT 0;
+
+-- TG_ARGV[0] is the users column to maintain. old_rows / new_rows are the rows the statement
+-- deleted / inserted (both for an UPDATE, where only rows moved to another user change a count)
+CREATE OR REPLACE FUNCTION maintain_user_count() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        EXECUTE format('
+            UPDATE users u SET %1$I = u.%1$I + d.n
+            FROM (SELECT userId, COUNT(*) AS n FROM new_rows GROUP BY userId) d
+            WHERE u.id = d.userId', TG_ARGV[0]);
+    ELSIF TG_OP = 'DELETE' THEN
+        EXECUTE format('
+            UPDATE users u SET %1$I = u.%1$I - d.n
+            FROM (SELECT userId, COUNT(*) AS n FROM old_rows GROUP BY userId) d
+            WHERE u.id = d.userId', TG_ARGV[0]);
+    ELSE
+        EXECUTE format('
+            UPDATE users u SET %1$I = u.%1$I + d.n
+            FROM (
+                SELECT userId, SUM(n) AS n FROM (
+                    SELECT o.userId, -1 AS n FROM old_rows o JOIN new_rows m ON m.id = o.id
+                    WHERE m.userId IS DISTINCT FROM o.userId
+                    UNION ALL
+                    SELECT m.userId, 1 AS n FROM old_rows o JOIN new_rows m ON m.id = o.id
+                    WHERE m.userId IS DISTINCT FROM o.userId
+                ) moved
+                GROUP BY userId
+            ) d
+            WHERE u.id = d.userId', TG_ARGV[0]);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- transition tables need one trigger per operation
+DROP TRIGGER IF EXISTS events_count_insert ON events;
+DROP TRIGGER IF EXISTS events_count_delete ON events;
+DROP TRIGGER IF EXISTS events_count_update ON events;
+CREATE TRIGGER events_count_insert AFTER INSERT ON events
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_user_count('event_count');
+CREATE TRIGGER events_count_delete AFTER DELETE ON events
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_user_count('event_count');
+CREATE TRIGGER events_count_update AFTER UPDATE ON events
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_user_count('event_count');
+
+DROP TRIGGER IF EXISTS schoolcontact_count_insert ON schoolContact;
+DROP TRIGGER IF EXISTS schoolcontact_count_delete ON schoolContact;
+DROP TRIGGER IF EXISTS schoolcontact_count_update ON schoolContact;
+CREATE TRIGGER schoolcontact_count_insert AFTER INSERT ON schoolContact
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_user_count('contact_count');
+CREATE TRIGGER schoolcontact_count_delete AFTER DELETE ON schoolContact
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_user_count('contact_count');
+CREATE TRIGGER schoolcontact_count_update AFTER UPDATE ON schoolContact
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_user_count('contact_count');
+
+DROP TRIGGER IF EXISTS files_count_insert ON files;
+DROP TRIGGER IF EXISTS files_count_delete ON files;
+DROP TRIGGER IF EXISTS files_count_update ON files;
+CREATE TRIGGER files_count_insert AFTER INSERT ON files
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_user_count('file_count');
+CREATE TRIGGER files_count_delete AFTER DELETE ON files
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_user_count('file_count');
+CREATE TRIGGER files_count_update AFTER UPDATE ON files
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_user_count('file_count');
+
+-- backfill
+LOCK TABLE events, schoolContact, files IN SHARE MODE;
+UPDATE users u SET
+    event_count = (SELECT COUNT(*) FROM events e WHERE e.userId = u.id),
+    contact_count = (SELECT COUNT(*) FROM schoolContact c WHERE c.userId = u.id),
+    file_count = (SELECT COUNT(*) FROM files f WHERE f.userId = u.id);
+
+-- the admin user list pages newest users first
+CREATE INDEX IF NOT EXISTS idx_users_joindate ON users(joinDate DESC);
+
+-- drift check, should return no rows:
+--   SELECT u.id, u.event_count, u.contact_count, u.file_count FROM users u
+--   WHERE u.event_count <> (SELECT COUNT(*) FROM events e WHERE e.userId = u.id)
+--      OR u.contact_count <> (SELECT COUNT(*) FROM schoolContact c WHERE c.userId = u.id)
+--      OR u.file_count <> (SELECT COUNT(*) FROM files f WHERE f.userId = u.id);
@@ -0,0 +1,64 @@
+-- indexes for the lookups every request or list page makes - 'python3 benchmarks/run.py --check-plans'
+-- fails when a benchmark scenario runs a statement none of them can serve
+--
+-- plain CREATE INDEX, it blocks writes to the table while it builds - fine at the current table
+-- sizes. On a big table build it by hand first with CREATE INDEX CONCURRENTLY under the same name,
+-- this then skips it
+
+-- auth / login lookups. On a database created from the baseline the UNIQUE / PRIMARY KEY
+-- constraints already index these columns; the hand-made one isn't guaranteed to have them, so an
+-- index is only added where none starts with the column
+DO $$
+DECLARE
+    wanted RECORD;
+BEGIN
+    FOR wanted IN
+        SELECT * FROM (VALUES
+            ('users', 'cognito_id', 'idx_users_cognito_id'),    -- every authenticated request (auth.lookup_user)
+            ('users', 'email', 'idx_users_email'),              -- login, sign up, password reset
+            ('invalidated_tokens', 'jti', 'idx_invalidated_tokens_jti')
+        ) AS t(table_name, column_name, index_name)
+    LOOP
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_index i
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+            WHERE i.indrelid = wanted.table_name::regclass AND a.attname = wanted.column_name
+        ) THEN
+            EXECUTE format('CREATE INDEX %I ON %I (%I)', wanted.index_name, wanted.table_name, wanted.column_name);
+        END IF;
+    END LOOP;
+END;
+$$;
+
+-- revocation list sync (auth.sync_revocations) and the daily cleanup
+CREATE INDEX IF NOT EXISTS idx_invalidated_tokens_invalidated_at ON invalidated_tokens(invalidated_at);
+CREATE INDEX IF NOT EXISTS idx_invalidated_tokens_expires_at ON invalidated_tokens(expires_at);
+
+-- a user's contacts (ownership checks, admin user detail)
+CREATE INDEX IF NOT EXISTS idx_schoolcontact_user_id ON schoolContact(userId, id);
+
+-- a user's events, newest scheduled first (sftEvents list) and newest first (admin user detail),
+-- and a contact's events
+CREATE INDEX IF NOT EXISTS idx_events_user_scheduled ON events(userId, scheduledDate DESC);
+CREATE INDEX IF NOT EXISTS idx_events_user_id ON events(userId, id);
+CREATE INDEX IF NOT EXISTS idx_events_contact ON events(contactId);
+
+-- conversation log pages (keyset pagination on timestamp, id) and a contact's logs
+CREATE INDEX IF NOT EXISTS idx_conversationlogs_user_timestamp ON conversationLogs(userId, timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_conversationlogs_contact ON conversationLogs(contactId);
+
+-- a user's files (admin user detail) and scraped files
+CREATE INDEX IF NOT EXISTS idx_files_user_id ON files(userId, id);
+CREATE INDEX IF NOT EXISTS idx_scrapedfiles_user_id ON scrapedFiles(userId, id);
+
+-- metric history and summaries per user / metric
+CREATE INDEX IF NOT EXISTS idx_analytics_user_metric_timestamp ON analytics(userId, metricName, timestamp DESC);
+
+-- admin log pages, all logs and per target user (keyset pagination on timestamp, id), and the
+-- cascade when an admin is deleted
+CREATE INDEX IF NOT EXISTS idx_admin_logs_timestamp ON admin_logs(timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_admin_logs_target_timestamp ON admin_logs(targetId, timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_admin_logs_admin ON admin_logs(adminId);
+
+-- reset codes per user (email / users handlers)
+CREATE INDEX IF NOT EXISTS idx_password_reset_codes_user ON password_reset_codes(user_id);
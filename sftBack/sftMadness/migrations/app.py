@@ -0,0 +1,164 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+
+# Schema migrations - the numbered .sql files next to this one own the database DDL. Each file runs
+# once, in its own transaction, and is recorded in schema_migrations with a checksum; a file that
+# changed after it was applied stops the run (write a new migration instead of editing an old one).
+#
+# two ways to run it:
+#   deploy step  MigrationsFunction in template.yaml (this file, in the VPC next to the database) -
+#                'aws lambda invoke --function-name <MigrationsFunctionName output> out.json' after
+#                sam deploy, the response lists what was applied
+#   locally      'python3 migrations/app.py' with the DB_* variables the handlers use (or --db-*),
+#                --status lists applied / pending without changing anything
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATION_FILE = re.compile(r'^(\d{4})_[\w-]+\.sql$')
+# taken for the whole run, so two deploys at once don't apply the same file twice
+ADVISORY_LOCK_ID = 4711025
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename), encoding='utf-8') as f:
+            sql = f.read()
+        migrations.append({
+            'version': int(match.group(1)),
+            'name': filename,
+            'sql': sql,
+            'checksum': hashlib.sha256(sql.encode('utf-8')).hexdigest(),
+        })
+    versions = [m['version'] for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration version in {directory}")
+    return migrations
+
+def applied_migrations(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum VARCHAR(64) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("SELECT version, name, checksum FROM schema_migrations ORDER BY version")
+    return {version: {'name': name, 'checksum': checksum} for version, name, checksum in cur.fetchall()}
+
+def pending_migrations(migrations, applied):
+    for migration in migrations:
+        done = applied.get(migration['version'])
+        if done and done['checksum'] != migration['checksum']:
+            raise RuntimeError(f"{migration['name']} was changed after it was applied - add a new migration instead")
+    return [m for m in migrations if m['version'] not in applied]
+
+def migrate(conn, migrations=None, dry_run=False):
+    # returns the names of the migrations applied (or, with dry_run, the ones that would be)
+    migrations = load_migrations() if migrations is None else migrations
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_lock(%s)", (ADVISORY_LOCK_ID,))
+        try:
+            pending = pending_migrations(migrations, applied_migrations(cur))
+            conn.commit()
+            if dry_run:
+                return [m['name'] for m in pending]
+
+            applied = []
+            for migration in pending:
+                try:
+                    # no parameters, so psycopg2 leaves % in the file alone
+                    cur.execute(migration['sql'])
+                    cur.execute(
+                        "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                        (migration['version'], migration['name'], migration['checksum'])
+                    )
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    raise RuntimeError(f"{migration['name']} failed: {str(e).strip()}") from e
+                applied.append(migration['name'])
+            return applied
+        finally:
+            # the lock belongs to the session, a rollback doesn't release it
+            conn.rollback()
+            cur.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_ID,))
+            conn.commit()
+
+def status(conn, migrations=None):
+    migrations = load_migrations() if migrations is None else migrations
+    with conn.cursor() as cur:
+        applied = applied_migrations(cur)
+    conn.commit()
+    return {
+        'applied': [applied[v]['name'] for v in sorted(applied)],
+        'pending': [m['name'] for m in pending_migrations(migrations, applied)],
+    }
+
+############################################
+# deploy step
+def lambda_handler(event, context):
+    from sft_runtime.db import connect_db
+    from sft_runtime import log
+
+    conn = connect_db()
+    try:
+        dry_run = bool((event or {}).get('dryRun'))
+        applied = migrate(conn, dry_run=dry_run)
+        log.info("Migrations complete", applied=applied, dry_run=dry_run)
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'applied': applied, 'dryRun': dry_run})
+        }
+    except Exception as e:
+        log.exception("Migrations failed", error=str(e))
+        # raised, so 'aws lambda invoke' reports a FunctionError and a deploy script can stop on it
+        raise
+    finally:
+        conn.close()
+
+############################################
+# local runs
+def main():
+    parser = argparse.ArgumentParser(description="Apply the schema migrations in migrations/")
+    parser.add_argument('--db-host', default=os.environ.get('DB_HOST', os.environ.get('PGHOST', 'localhost')))
+    parser.add_argument('--db-port', default=os.environ.get('DB_PORT', os.environ.get('PGPORT', '5432')))
+    parser.add_argument('--db-name', default=os.environ.get('DB_NAME', os.environ.get('PGDATABASE')))
+    parser.add_argument('--db-user', default=os.environ.get('DB_USER', os.environ.get('PGUSER')))
+    parser.add_argument('--db-password', default=os.environ.get('DB_PASSWORD', os.environ.get('PGPASSWORD')))
+    parser.add_argument('--status', action='store_true', help='list applied / pending migrations and exit')
+    parser.add_argument('--dry-run', action='store_true', help='list what would be applied')
+    args = parser.parse_args()
+
+    import psycopg2
+    conn = psycopg2.connect(host=args.db_host, port=args.db_port, dbname=args.db_name, user=args.db_user,
+                            password=args.db_password, connect_timeout=5)
+    try:
+        if args.status:
+            result = status(conn)
+            for name in result['applied']:
+                print(f"applied  {name}")
+            for name in result['pending']:
+                print(f"pending  {name}")
+            return 0
+        names = migrate(conn, dry_run=args.dry_run)
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        return 1
+    finally:
+        conn.close()
+
+    verb = 'would apply' if args.dry_run else 'applied'
+    for name in names:
+        print(f"{verb}  {name}")
+    if not names:
+        print("up to date")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+import os
+import importlib.util
+
+from sft_runtime.responses import cors_response, PREFLIGHT_RESPONSE
+
+# Single-function deployment (DeploymentMode=router in template.yaml) - one ApiRouter function
+# takes every API route and hands the event to the same handler the per-function layout deploys.
+# Every route then shares one container pool, so the JWKS / token / user caches and the postgres
+# connection in sft_runtime stay warm for the low-traffic routes too
+#
+# the build (Makefile build-ApiRouter) copies the handler directories next to router/, the same
+# layout as the source tree, so this runs unchanged from a checkout
+HANDLER_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# API resource -> (handler directory, handler function, methods)
+# keep in step with the Events of the functions in template.yaml; preflights never get here
+ROUTES = {
+    '/sendEmail': ('email', 'lambda_handler', ('POST',)),
+    '/passVerificationEmail': ('email', 'lambda_handler', ('POST',)),
+    '/users/cognito/{cognitoId}': ('users_by_cognito', 'lambda_handler', ('GET',)),
+    '/login': ('login', 'login_handler', ('POST',)),
+    '/logout': ('logout', 'logout_handler', ('POST',)),
+    '/users': ('users', 'lambda_handler', ('POST',)),
+    '/users/{userId}': ('users', 'lambda_handler', ('GET', 'PUT', 'DELETE')),
+    '/users/resetPassword/{userId}': ('users', 'lambda_handler', ('PUT',)),
+    '/users/byEmail': ('users', 'lambda_handler', ('POST',)),
+    '/customs': ('ai_customs', 'lambda_handler', ('POST', 'GET', 'PUT', 'DELETE')),
+    '/files': ('files', 'lambda_handler', ('POST',)),
+    '/files/{fileId}': ('files', 'lambda_handler', ('GET', 'DELETE')),
+    '/scrapedFiles': ('scrapedFiles', 'lambda_handler', ('POST',)),
+    '/scrapedFiles/{fileId}': ('scrapedFiles', 'lambda_handler', ('GET', 'DELETE')),
+    '/contact': ('school_contact', 'lambda_handler', ('POST',)),
+    '/contact/{contactId}': ('school_contact', 'lambda_handler', ('GET', 'PUT', 'DELETE')),
+    '/sftEvents': ('sftEvents', 'lambda_handler', ('POST', 'GET')),
+    '/sftEvents/{eventId}': ('sftEvents', 'lambda_handler', ('GET', 'PUT', 'DELETE')),
+    '/conversation_logs': ('conversation_logs', 'lambda_handler', ('POST',)),
+    '/conversation_logs/{userId}': ('conversation_logs', 'lambda_handler', ('GET',)),
+    '/analytics': ('analytics', 'lambda_handler', ('POST',)),
+    '/analytics/{metricId}': ('analytics', 'lambda_handler', ('GET',)),
+    '/admins': ('admins', 'lambda_handler', ('POST', 'PUT', 'GET')),
+    '/admins/{userId}': ('admins', 'lambda_handler', ('GET', 'DELETE')),
+    '/admins/log': ('admins', 'lambda_handler', ('POST',)),
+    '/admins/log/{userId}': ('admins', 'lambda_handler', ('GET',)),
+}
+
+# handler modules are imported on the first request for one of their routes, so a cold router
+# only pays for the handler it is serving. Every handler file is called app.py, each one is
+# loaded under its own module name (a plain "import email.app" would also collide with the stdlib)
+modules = {}
+
+def load_module(directory):
+    if directory not in modules:
+        spec = importlib.util.spec_from_file_location(f'routes_{directory}', os.path.join(HANDLER_ROOT, directory, 'app.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        modules[directory] = module
+    return modules[directory]
+
+def lambda_handler(event, context):
+    if event['httpMethod'] == 'OPTIONS':
+        return PREFLIGHT_RESPONSE
+
+    route = ROUTES.get(event.get('resource'))
+    if route is None:
+        return cors_response(404, "Not Found")
+
+    directory, handler_name, methods = route
+    if event['httpMethod'] not in methods:
+        return cors_response(405, "Method Not Allowed")
+
+    # the handlers carry their own @instrumented / logging, the router adds nothing per request
+    return getattr(load_module(directory), handler_name)(event, context)
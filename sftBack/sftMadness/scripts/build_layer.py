@@ -0,0 +1,243 @@
+"""Slim build of the DependenciesLayer.
+
+Installs requirements.txt into a layer directory (or copies an already installed one),
+removes what the handlers never load, byte-compiles the rest and checks the unpacked
+size against a budget. Layer size is paid on every cold start - it is downloaded and
+unpacked before the first import - so the build fails when it grows past the budget.
+
+    python scripts/build_layer.py --target build/layer/python
+    python scripts/build_layer.py --source layers/dependencies/python --target /tmp/layer/python
+    python scripts/build_layer.py --source layers/dependencies/python --report-only
+
+sam build runs it through the Makefile (DependenciesLayer has BuildMethod: makefile).
+Run from sftBack/sftMadness.
+
+What gets removed:
+  - botocore service models for services the handlers don't create clients for
+    (--keep-service adds more), and the examples-1.json doc files of the ones kept
+  - pycparser and the cffi python package - cryptography only needs the compiled
+    _cffi_backend module at runtime, pycparser is only used to parse C at build time
+  - dateutil's bundled zoneinfo tarball (botocore only uses tzutc / tzlocal)
+  - bin/ console scripts, tests, type stubs and stale __pycache__ directories
+boto3/docs and botocore/docs stay - boto3.resources and botocore.client import them.
+charset_normalizer stays too - requests.compat imports it when chardet is missing.
+
+pip installs the manylinux x86_64 / CPython 3.12 wheels whatever the build host is, so
+psycopg2-binary, cryptography and cffi get the binaries lambda can load (a plain pip
+install on macOS or arm64 would pick host wheels that fail to import there).
+
+The .pyc files are written with unchecked hashes, so the read-only /opt mount never
+stats the sources to validate them. They have to come from the runtime's python version:
+the build uses this interpreter when it is 3.12 (sam build --use-container), otherwise a
+python3.12 on PATH, and fails when there is neither (--no-compile skips it on purpose).
+"""
+import argparse
+import compileall
+import os
+import py_compile
+import shutil
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAMBDA_PYTHON = (3, 12)
+# template.yaml Architectures: x86_64
+LAMBDA_PLATFORM = 'manylinux2014_x86_64'
+
+# services the handlers call through sft_runtime.aws.client()
+KEEP_SERVICES = ['cognito-idp', 's3', 'ses']
+
+# whole top level entries that are never imported at runtime
+DROP_PACKAGES = ['pycparser', 'cffi', 'bin']
+
+# paths relative to the layer root
+DROP_PATHS = [
+    os.path.join('dateutil', 'zoneinfo', 'dateutil-zoneinfo.tar.gz'),
+    os.path.join('charset_normalizer', 'cli'),
+]
+
+DROP_DIR_NAMES = {'tests', 'test', '__pycache__'}
+DROP_FILE_SUFFIXES = ('.pyi', '.pyx', '.c', '.h')
+DROP_FILE_NAMES = {'py.typed', 'examples-1.json'}
+
+def install(requirements, target):
+    # wheels for the lambda runtime, not the build host - --only-binary because pip can't build
+    # an sdist for another platform
+    subprocess.run(
+        [sys.executable, '-m', 'pip', 'install', '--quiet', '--no-compile', '--upgrade',
+         '--platform', LAMBDA_PLATFORM, '--implementation', 'cp',
+         '--python-version', '.'.join(str(v) for v in LAMBDA_PYTHON), '--only-binary=:all:',
+         '-r', requirements, '-t', target],
+        check=True,
+    )
+
+def remove(path, removed):
+    if not os.path.lexists(path):
+        return
+    size = tree_size(path)
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+    removed.append((path, size))
+
+def tree_size(path):
+    if os.path.isfile(path) or os.path.islink(path):
+        return os.path.getsize(path)
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            file_path = os.path.join(dirpath, name)
+            if not os.path.islink(file_path):
+                total += os.path.getsize(file_path)
+    return total
+
+def prune_botocore_data(target, keep_services, removed):
+    data_dir = os.path.join(target, 'botocore', 'data')
+    if not os.path.isdir(data_dir):
+        return
+    # top level json files (endpoints, partitions, retry config) are always needed
+    for name in os.listdir(data_dir):
+        path = os.path.join(data_dir, name)
+        if os.path.isdir(path) and name not in keep_services:
+            remove(path, removed)
+
+def prune_packages(target, removed):
+    for name in DROP_PACKAGES:
+        remove(os.path.join(target, name), removed)
+        # the matching dist-info, so pip / importlib.metadata don't list a package that is gone
+        for entry in os.listdir(target):
+            if entry.endswith('.dist-info') and entry.split('-')[0].lower() == name.lower():
+                remove(os.path.join(target, entry), removed)
+    for path in DROP_PATHS:
+        remove(os.path.join(target, path), removed)
+
+def prune_files(target, removed):
+    for dirpath, dirnames, filenames in os.walk(target, topdown=True):
+        for name in list(dirnames):
+            if name in DROP_DIR_NAMES:
+                remove(os.path.join(dirpath, name), removed)
+                dirnames.remove(name)
+        for name in filenames:
+            if name in DROP_FILE_NAMES or name.endswith(DROP_FILE_SUFFIXES):
+                remove(os.path.join(dirpath, name), removed)
+
+def lambda_python():
+    # an interpreter matching the lambda runtime, None when there is none
+    if sys.version_info[:2] == LAMBDA_PYTHON:
+        return sys.executable
+    candidate = shutil.which(f'python{LAMBDA_PYTHON[0]}.{LAMBDA_PYTHON[1]}')
+    if candidate is None:
+        return None
+    # a pyenv / asdf shim is on PATH even when that version isn't the active one
+    result = subprocess.run([candidate, '-c', 'import sys; print("%d.%d" % sys.version_info[:2])'],
+                            capture_output=True, text=True)
+    if result.returncode != 0 or result.stdout.strip() != '.'.join(str(v) for v in LAMBDA_PYTHON):
+        return None
+    return candidate
+
+def byte_compile(target, python):
+    if python == sys.executable:
+        ok = compileall.compile_dir(
+            target, quiet=1, workers=0,
+            invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+        )
+    else:
+        ok = subprocess.run(
+            [python, '-m', 'compileall', '-q', '-j', '0', '--invalidation-mode', 'unchecked-hash', target],
+        ).returncode == 0
+    if not ok:
+        print("ERROR: some files failed to byte-compile")
+    return ok
+
+def dist_info_owner(target, entry):
+    # top_level.txt names the import package a distribution installs (PyJWT -> jwt)
+    top_level = os.path.join(target, entry, 'top_level.txt')
+    if os.path.isfile(top_level):
+        with open(top_level) as f:
+            names = [line.strip() for line in f if line.strip()]
+        for name in names:
+            if os.path.isdir(os.path.join(target, name)):
+                return name
+    return entry.split('-')[0]
+
+def package_sizes(target):
+    # dist-info and __pycache__ sizes are folded into the package they belong to
+    sizes = {}
+    for entry in os.listdir(target):
+        name = entry
+        if entry.endswith('.dist-info'):
+            name = dist_info_owner(target, entry)
+        elif entry.endswith('.py'):
+            name = entry[:-3]
+        elif entry.endswith('.so'):
+            name = entry.split('.')[0]
+        sizes[name] = sizes.get(name, 0) + tree_size(os.path.join(target, entry))
+    return sorted(sizes.items(), key=lambda kv: -kv[1])
+
+def mb(size):
+    return size / (1024 * 1024)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requirements', default=os.path.join(ROOT, 'requirements.txt'))
+    parser.add_argument('--source', help='copy an already installed site-packages dir instead of running pip')
+    parser.add_argument('--target', help='layer python/ directory to build into')
+    parser.add_argument('--budget-mb', type=float, default=float(os.environ.get('LAYER_BUDGET_MB', '15')),
+                        help='fail when the unpacked layer is larger than this (env LAYER_BUDGET_MB)')
+    parser.add_argument('--keep-service', action='append', default=[],
+                        help='extra botocore service model to keep, e.g. sts')
+    parser.add_argument('--no-compile', dest='compile', action='store_false')
+    parser.add_argument('--report-only', action='store_true',
+                        help='only print the size report for --source (or --target), change nothing')
+    args = parser.parse_args()
+
+    if args.report_only:
+        target = args.source or args.target
+        if not target:
+            parser.error('--report-only needs --source or --target')
+    else:
+        python = lambda_python() if args.compile else None
+        if args.compile and python is None:
+            # a layer without its .pyc files still works, but pays for compiling on every cold start
+            print(f"ERROR: the layer runs python {LAMBDA_PYTHON[0]}.{LAMBDA_PYTHON[1]} and there is no such "
+                  f"interpreter to byte-compile it - build with 'sam build --use-container', put "
+                  f"python{LAMBDA_PYTHON[0]}.{LAMBDA_PYTHON[1]} on PATH or pass --no-compile")
+            return 1
+
+        if not args.target:
+            parser.error('--target is required')
+        target = args.target
+        if args.source:
+            if os.path.abspath(args.source) == os.path.abspath(target):
+                parser.error('--source and --target must differ, the build removes files from --target')
+            if os.path.exists(target):
+                shutil.rmtree(target)
+            shutil.copytree(args.source, target, symlinks=True)
+        else:
+            os.makedirs(target, exist_ok=True)
+            install(args.requirements, target)
+
+        before = tree_size(target)
+        removed = []
+        prune_packages(target, removed)
+        prune_botocore_data(target, KEEP_SERVICES + args.keep_service, removed)
+        prune_files(target, removed)
+        if args.compile and not byte_compile(target, python):
+            return 1
+        print(f"removed {len(removed)} paths, {mb(sum(size for _, size in removed)):.1f} MB "
+              f"(layer was {mb(before):.1f} MB)")
+
+    sizes = package_sizes(target)
+    total = sum(size for _, size in sizes)
+    for name, size in sizes:
+        print(f"    {name:<28} {mb(size):>8.2f} MB")
+    print(f"{'total':<32} {mb(total):>8.2f} MB   (budget {args.budget_mb:.1f} MB)")
+
+    if mb(total) > args.budget_mb:
+        print(f"ERROR: layer is {mb(total) - args.budget_mb:.1f} MB over budget")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""Cold-start import time report for every function in template.yaml.
+
+Imports each handler module in a fresh interpreter with `python -X importtime`
+(the same thing a cold Lambda container does) and reports the total import time
+plus a per-package breakdown of where it went.
+
+    python scripts/importtime_report.py
+    python scripts/importtime_report.py --json importtime-before.json
+    python scripts/importtime_report.py --baseline importtime-before.json
+
+--baseline prints before/after deltas per function against a saved --json run.
+By default the handler is also invoked with an OPTIONS preflight after import, so
+anything the preflight path pulls in lazily is counted too (--no-preflight to skip).
+
+Run from sftBack/sftMadness. Dependencies are taken from layers/dependencies/python
+(pip3 install -r requirements.txt -t layers/dependencies/python, see README);
+pass --deps to point somewhere else.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNTIME_LAYER = os.path.join(ROOT, 'layers', 'runtime', 'python')
+DEPENDENCIES_LAYER = os.path.join(ROOT, 'layers', 'dependencies', 'python')
+
+# handlers read these at import time - the values only have to exist
+FAKE_ENV = {
+    'ENV': 'importtime',
+    'AWS_REGION': 'us-east-2',
+    'AWS_DEFAULT_REGION': 'us-east-2',
+    'DB_NAME': 'sft', 'DB_HOST': 'localhost', 'DB_USER': 'sft', 'DB_PASSWORD': 'sft', 'DB_PORT': '5432',
+    'COGNITO_USER_POOL_ID': 'us-east-2_importtime', 'COGNITO_CLIENT_ID': 'importtime',
+    'S3_BUCKET_NAME': 'importtime', 'S3_SCRAPED_BUCKET_NAME': 'importtime',
+    'SES_SENDER_EMAIL': 'importtime@example.com', 'SES_DOMAIN': 'example.com',
+    'SES_REGION': 'us-east-2', 'SES_CONFIGURATION_SET': 'importtime',
+}
+
+MARKER = '--- importtime begin ---'
+
+SNIPPET = '''
+import sys, importlib
+sys.stderr.write(%(marker)r + "\\n")
+module = importlib.import_module("app")
+if %(preflight)r:
+    getattr(module, %(handler)r)({"httpMethod": "OPTIONS", "resource": "/", "headers": {}}, None)
+'''
+
+def load_functions(template_path):
+    # small line based reader - template.yaml uses CloudFormation tags (!Ref, !Sub) that
+    # a plain yaml.safe_load rejects, and only three keys per function are needed here
+    functions = []
+    current = None
+    with open(template_path) as f:
+        for line in f:
+            resource = re.match(r'^  (\w+):\s*$', line)
+            if resource:
+                current = {'name': resource.group(1)}
+                continue
+            if current is None:
+                continue
+            if re.match(r'^\s+Type:\s*AWS::Serverless::Function\s*$', line):
+                current['is_function'] = True
+            code_uri = re.match(r'^\s+CodeUri:\s*(\S+)', line)
+            if code_uri:
+                current['code_uri'] = code_uri.group(1)
+            handler = re.match(r'^\s+Handler:\s*(\S+)', line)
+            if handler:
+                current['handler'] = handler.group(1)
+            if current.get('is_function') and 'code_uri' in current and 'handler' in current:
+                # Handler: router/app.lambda_handler - the module sits in a subdirectory of CodeUri
+                if '/' in current['handler']:
+                    subdir, current['handler'] = current['handler'].rsplit('/', 1)
+                    current['code_uri'] = os.path.normpath(os.path.join(current['code_uri'], subdir))
+                functions.append(current)
+                current = None
+    return functions
+
+def parse_importtime(stderr):
+    # lines look like: "import time:       412 |       1893 |   jwt.algorithms"
+    modules = []
+    started = False
+    for line in stderr.splitlines():
+        if line == MARKER:
+            started = True
+            continue
+        if not started:
+            continue
+        m = re.match(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)', line)
+        if m:
+            modules.append({
+                'self_us': int(m.group(1)),
+                'cumulative_us': int(m.group(2)),
+                'depth': len(m.group(3)) // 2,
+                'module': m.group(4),
+            })
+    return modules
+
+def summarize(modules):
+    total_us = sum(m['cumulative_us'] for m in modules if m['depth'] == 0)
+    packages = {}
+    for m in modules:
+        package = m['module'].split('.')[0]
+        packages[package] = packages.get(package, 0) + m['self_us']
+    return {
+        'total_ms': round(total_us / 1000, 1),
+        'modules': len(modules),
+        'packages_ms': {k: round(v / 1000, 1) for k, v in sorted(packages.items(), key=lambda kv: -kv[1])},
+    }
+
+def measure(function, deps_path, preflight):
+    code_dir = os.path.join(ROOT, function['code_uri'])
+    handler = function['handler'].split('.')[-1]
+
+    env = dict(os.environ)
+    env.update(FAKE_ENV)
+    env['PYTHONPATH'] = os.pathsep.join([code_dir, RUNTIME_LAYER, deps_path])
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+    snippet = SNIPPET % {'marker': MARKER, 'preflight': preflight, 'handler': handler}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', snippet],
+        cwd=code_dir, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()
+        return {'error': error[-1] if error else f'exit code {result.returncode}'}
+    return summarize(parse_importtime(result.stderr))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--template', default=os.path.join(ROOT, 'template.yaml'))
+    parser.add_argument('--deps', default=DEPENDENCIES_LAYER, help='directory with the installed dependencies layer')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per function, the fastest one is kept')
+    parser.add_argument('--top', type=int, default=6, help='packages listed per function')
+    parser.add_argument('--no-preflight', dest='preflight', action='store_false')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='compare against a previous --json run')
+    parser.add_argument('--function', action='append', help='only these functions (logical ids)')
+    args = parser.parse_args()
+
+    functions = load_functions(args.template)
+    if args.function:
+        functions = [f for f in functions if f['name'] in args.function]
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['functions']
+
+    results = {}
+    for function in functions:
+        # the first run also writes the .pyc files, so it is not counted
+        measure(function, args.deps, args.preflight)
+        runs = [measure(function, args.deps, args.preflight) for _ in range(max(args.repeat, 1))]
+        ok = [r for r in runs if 'error' not in r]
+        result = min(ok, key=lambda r: r['total_ms']) if ok else runs[0]
+        result['code_uri'] = function['code_uri']
+        results[function['name']] = result
+
+        if 'error' in result:
+            print(f"{function['name']:<22} ERROR {result['error']}")
+            continue
+
+        line = f"{function['name']:<22} {result['total_ms']:>8.1f} ms  {result['modules']:>4} modules"
+        before = baseline.get(function['name'])
+        if before and 'total_ms' in before:
+            delta = result['total_ms'] - before['total_ms']
+            line += f"   (before {before['total_ms']:.1f} ms, {delta:+.1f} ms)"
+        print(line)
+
+        for package, ms in list(result['packages_ms'].items())[:args.top]:
+            detail = f"    {package:<24} {ms:>8.1f} ms"
+            if before and 'packages_ms' in before:
+                detail += f"   ({ms - before['packages_ms'].get(package, 0.0):+.1f} ms)"
+            print(detail)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'preflight': args.preflight, 'functions': results}, f, indent=2)
+
+    return 1 if any('error' in r for r in results.values()) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
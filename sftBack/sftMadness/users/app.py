@@ -1,38 +1,20 @@
 import json
 import os
-import psycopg2
-from datetime import datetime, date
-import boto3
-import jwt
-from botocore.exceptions import ClientError
-from psycopg2.extras import RealDictCursor
-import requests
-from jwt import algorithms
-
-# cors_response function to return API Gateway response with CORS headers
-def cors_response(status_code, body, content_type="application/json"):
-    headers = {
-        'Content-Type': content_type,
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-        'Access-Control-Allow-Methods': 'OPTIONS,GET,POST,PUT,DELETE',
-    }
-
-    if content_type == "application/json":
-        body = json.dumps(body, default=str)
-
-    return {
-        'statusCode': status_code,
-        'body': body,
-        'headers': headers,
-    }
+
+from sft_runtime.responses import cors_response, PREFLIGHT_RESPONSE
+from sft_runtime.db import get_db_connection, release_db_connection, dict_cursor
+from sft_runtime.auth import authenticate, invalidate_cached_user
+from sft_runtime.aws import client, client_error
+from sft_runtime.instrumentation import instrumented
+from sft_runtime import log
 
 # lambda_handler function to handle incoming API Gateway requests
+@instrumented
 def lambda_handler(event, context):
     if event['httpMethod'] == 'OPTIONS':
-        return cors_response(200, "ok")
+        return PREFLIGHT_RESPONSE
     
-    print(f"Event received: {json.dumps(event)}")
+    log.request(event, "lambda_handler")
     
     http_method = event['httpMethod']
     resource_path = event['resource']
@@ -45,7 +27,6 @@ def lambda_handler(event, context):
     try:
         #verify token
         auth_header = event.get('headers', {}).get('Authorization')
-        print(f"Auth header: {auth_header}")
         if not auth_header:
             return cors_response(401, "Unauthorized")
         if not auth_header.startswith('Bearer '):
@@ -54,10 +35,10 @@ def lambda_handler(event, context):
         token = auth_header.split(' ')[-1]
 
         try:
-            token_payload = verify_token(token)
-            print(f"Token verified successfully: {json.dumps(token_payload)}")
+            token_payload, auth = authenticate(token)
+            log.debug("Token verified", sub=token_payload.get('sub'), jti=token_payload.get('jti'))
         except Exception as e:
-            print(f"Token verification failed: {str(e)}")
+            log.warning("Token verification failed", error=str(e))
             return cors_response(401, f"Authentication failed: {str(e)}")
 
     except Exception as e:
@@ -68,7 +49,7 @@ def lambda_handler(event, context):
         if resource_path == '/users/{userId}' and http_method == 'GET':
             return getUser(event, context)
         elif resource_path == '/users/{userId}' and http_method == 'PUT':
-            return updateUser(event, context)
+            return updateUser(event, context, auth)
         elif resource_path == '/users/{userId}' and http_method == 'DELETE':
             return deleteUser(event, context)
         elif resource_path == '/users/resetPassword/{userId}' and http_method == 'PUT':
@@ -81,129 +62,16 @@ def lambda_handler(event, context):
     except Exception as e:
         return cors_response(500, str(e))
     
-###################
-#helper functions
-
-# Custom JSON serializer for datetime objects
-def json_serial(obj):
-    if isinstance(obj, (datetime, date)):
-        return obj.isoformat()
-    raise TypeError ("Type %s not serializable" % type(obj))
-
-# Database connection function
-def get_db_connection():
-    return psycopg2.connect(
-        dbname=os.environ['DB_NAME'],
-        host=os.environ['DB_HOST'],
-        user=os.environ['DB_USER'],
-        password=os.environ['DB_PASSWORD'],
-        port=os.environ['DB_PORT'],
-
-        connect_timeout=5)
-    
-#AUTH
-# check if token is invalidated in db
-def is_token_invalidated(token_payload):
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            jti = token_payload.get('jti')
-            
-            if not jti:
-                raise Exception("Token missing jti claim")
-            
-            cur.execute("""
-                SELECT EXISTS(
-                    SELECT 1 
-                    FROM invalidated_tokens 
-                    WHERE jti = %s
-                )
-            """, (jti,))
-            
-            return cur.fetchone()[0]
-        
-# Verify JWT token
-def verify_token(token):
-    try:
-        # Get the JWT token from the Authorization header
-        if not token:
-            raise Exception('No token provided')
-
-        region = boto3.session.Session().region_name
-
-        # Get the JWT kid (key ID)
-        try:
-            headers = jwt.get_unverified_header(token)
-            kid = headers['kid']
-        except Exception as e:
-                print(f"Error getting token header: {str(e)}")
-                raise Exception(f'Invalid token header: {str(e)}')
-
-        # Get the public keys from Cognito
-        try:
-            url = f'https://cognito-idp.{region}.amazonaws.com/{os.environ["COGNITO_USER_POOL_ID"]}/.well-known/jwks.json'
-            response = requests.get(url)
-            response.raise_for_status()
-            keys = response.json()['keys']
-            print(f"Retrieved keys: {json.dumps(keys)}")
-        except Exception as e:
-                print(f"Error fetching keys: {str(e)}")
-                raise Exception(f'Error fetching public keys: {str(e)}')
-
-        # Find the correct public key
-        public_key = None
-        for key in keys:
-            if key['kid'] == kid:
-                try:
-                    public_key = algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
-                    break
-                except Exception as e:
-                        raise Exception(f'Error parsing public key: {str(e)}')
-
-        if not public_key:
-            raise Exception('Public key not found')
-
-        # Verify the token
-        try:
-            payload = jwt.decode(
-                token,
-                public_key,
-                algorithms=['RS256'],
-                options={
-                    'verify_signature': True,
-                    'verify_exp': True,
-                    'verify_aud': True,
-                    'verify_iss': True
-                },
-                audience=os.environ['COGNITO_CLIENT_ID'],
-                issuer=f'https://cognito-idp.us-east-2.amazonaws.com/{os.environ["COGNITO_USER_POOL_ID"]}'
-            )
-            if is_token_invalidated(payload):
-                raise Exception('Token has been invalidated')
-            
-            print(f"Token verification successful. Payload: {json.dumps(payload)}")
-            return payload
-        
-        except jwt.ExpiredSignatureError:
-            raise Exception('Token has expired')
-        except jwt.InvalidTokenError:
-            raise Exception('Invalid token')
-        except Exception as e:
-            raise Exception(f'Token verification error: {str(e)}')
-
-    except Exception as e:
-        print(f"Token verification failed: {str(e)}")  # Add logging
-        raise    
-
 ####################
 #user functions
 def registerUser(event, context):
 
     conn = None
     user_pool_id = os.environ['COGNITO_USER_POOL_ID']
-    cognito_client = boto3.client('cognito-idp')
+    cognito_client = client('cognito-idp')
 
     try:
-        print("Starting user registration...")
+        log.debug("Starting user registration")
         body = json.loads(event.get('body', {}))
     except json.JSONDecodeError:
         return cors_response(400, f"Invalid JSON: {str(e)}")
@@ -225,7 +93,7 @@ def registerUser(event, context):
     try:
         cognito_user_id = None
         if skipCognitoCreation:
-            print(f"Skip Cognito creation flag set, getting existing user")
+            log.debug("Skip Cognito creation flag set, getting existing user")
             try:
                 user_response = cognito_client.admin_get_user(
                     UserPoolId=user_pool_id,
@@ -237,9 +105,9 @@ def registerUser(event, context):
                         cognito_user_id = attribute['Value']
                         break
                             
-                print(f"Found existing Cognito user with ID: {cognito_user_id}")
+                log.debug("Found existing Cognito user", cognito_id=cognito_user_id)
             except Exception as e:
-                print(f"Error getting existing Cognito user: {str(e)}")
+                log.error("Error getting existing Cognito user", error=str(e))
                 return cors_response(404, {"error": f"User not found in Cognito: {str(e)}"})
 
         else:
@@ -269,9 +137,9 @@ def registerUser(event, context):
                         cognito_user_id = attribute['Value']
                         break
 
-                print(f"Created new Cognito user with ID: {cognito_user_id}")
+                log.info("Created Cognito user", cognito_id=cognito_user_id)
             except cognito_client.exceptions.UsernameExistsException:
-                print(f"User already exists in Cognito, getting ID")
+                log.debug("User already exists in Cognito, getting ID")
                 
                 try:
                     user_response = cognito_client.admin_get_user(
@@ -283,26 +151,25 @@ def registerUser(event, context):
                             cognito_user_id = attribute['Value']
                             break
                 
-                    print(f"Found existing Cognito user with ID: {cognito_user_id}")
+                    log.debug("Found existing Cognito user", cognito_id=cognito_user_id)
                 except Exception as e:
-                    print(f"Error getting existing user: {str(e)}")
+                    log.error("Error getting existing user", error=str(e))
                     return cors_response(500, {"error": f"Error retrieving user from Cognito: {str(e)}"})
             
         if not cognito_user_id:
             raise Exception("Could not get Cognito user ID")
         
         try:
-            print(f"Creating user in database with Cognito ID: {cognito_user_id}")
+            log.debug("Creating user in database", cognito_id=cognito_user_id)
             conn = get_db_connection()
-            cur = conn.cursor(cursor_factory=RealDictCursor)
+            cur = dict_cursor(conn)
 
-            print("Connected to database successfully")
 
             cur.execute("SELECT id FROM users WHERE email = %s", (email,))
             existing_user = cur.fetchone()
         
             if existing_user:
-                print(f"User already exists in database with ID: {existing_user['id']}")
+                log.info("User already exists in database", user_id=existing_user['id'])
                 return cors_response(400, {"error": "User already exists in database"})
 
             user_insert_query = """INSERT INTO users (email, password, role, companyName, phoneNumber, joinDate, cognito_id) 
@@ -313,7 +180,7 @@ def registerUser(event, context):
             conn.commit()
 
             user_dict = dict(new_user)
-            print(f"User created in database: {json.dumps(user_dict, default=str)}")
+            log.info("User created in database", user_id=user_dict.get('id'))
 
             return cors_response(201, {
                 "message": "User created",
@@ -321,19 +188,19 @@ def registerUser(event, context):
             })
 
         except Exception as db_error:
-            print(f"Database error: {str(db_error)}")
+            log.exception("Database error", error=str(db_error))
             if conn:
                 conn.rollback()
             return cors_response(500, {"error": f"Database error: {str(db_error)}"})
             
     except Exception as e:
-        print(f"Unhandled exception in registerUser: {str(e)}")
+        log.exception("Unhandled exception in registerUser", error=str(e))
         if conn:
             conn.rollback()
         return cors_response(500, {"error": f"Unhandled error: {str(e)}"})
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 
 def getUser(event, context):
@@ -345,13 +212,8 @@ def getUser(event, context):
             return cors_response(400, "User ID is required")
 
         conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = dict_cursor(conn)
 
-        print('DBUser:', os.environ['DB_USER'])
-        print('DBName:', os.environ['DB_NAME'])
-        print('DBHost:', os.environ['DB_HOST'])
-        print('DBPort:', os.environ['DB_PORT'])
-        print('DBPassword:', os.environ['DB_PASSWORD'])
 
         # Query to get user details
         user_query = """
@@ -370,9 +232,9 @@ def getUser(event, context):
         return cors_response(500, f"Error retrieving user: {str(e)}")
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
-def updateUser(event, context):
+def updateUser(event, context, auth):
     conn = None
     try:
         # Get user ID from path parameters
@@ -401,19 +263,10 @@ def updateUser(event, context):
             return cors_response(400, "No valid fields to update")
         
         conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = dict_cursor(conn)
 
-        # Get the token payload to check the requester's role
-        auth_header = event.get('headers', {}).get('Authorization')
-        token = auth_header.split(' ')[-1]
-        token_payload = verify_token(token)
-        
-        # Get requester's user info from database using their email
-        requester_email = token_payload.get('email')
-        cur.execute("SELECT role FROM users WHERE email = %s", (requester_email,))
-        requester = cur.fetchone()
-        
-        if not requester:
+        # Requester's role was resolved with the token in lambda_handler
+        if not auth['user_id']:
             return cors_response(404, "Requester not found")
             
         # Get the target user's current role
@@ -430,11 +283,11 @@ def updateUser(event, context):
                 return cors_response(400, "Invalid role specified")
                 
             # Only allow role updates if requester is admin
-            if requester['role'] != 'admin':
+            if auth['role'] != 'admin':
                 return cors_response(403, "Only administrators can update user roles")
                 
             # If target user is trying to update their own role, prevent it
-            if str(user_id) == str(token_payload.get('sub')):
+            if str(user_id) == str(auth['user_id']):
                 return cors_response(403, "Users cannot update their own role")
 
         # Construct UPDATE query dynamically
@@ -454,11 +307,13 @@ def updateUser(event, context):
             return cors_response(404, "User not found")
 
         conn.commit()
+        if 'role' in update_fields:
+            invalidate_cached_user(user_id)
 
         # If email was updated, update in Cognito as well
         if 'email' in update_fields:
             try:
-                cognito_client = boto3.client('cognito-idp')
+                cognito_client = client('cognito-idp')
                 cognito_client.admin_update_user_attributes(
                     UserPoolId=os.environ['COGNITO_USER_POOL_ID'],
                     Username=body.get('email'),
@@ -467,7 +322,7 @@ def updateUser(event, context):
                         {'Name': 'email_verified', 'Value': 'true'}
                     ]
                 )
-            except ClientError as e:
+            except client_error() as e:
                 # Rollback database changes if Cognito update fails
                 conn.rollback()
                 return cors_response(500, f"Error updating Cognito user: {str(e)}")
@@ -480,7 +335,7 @@ def updateUser(event, context):
         return cors_response(500, f"Error updating user: {str(e)}")
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 def deleteUser(event, context):
     conn = None
@@ -491,7 +346,7 @@ def deleteUser(event, context):
             return cors_response(400, "User ID is required")
 
         conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = dict_cursor(conn)
 
         # First, get the user's email for Cognito deletion
         cur.execute("SELECT email FROM users WHERE id = %s", (user_id,))
@@ -508,17 +363,18 @@ def deleteUser(event, context):
             return cors_response(404, "User not found")
 
         conn.commit()
+        invalidate_cached_user(user_id)
 
         # Delete from Cognito
         try:
-            cognito_client = boto3.client('cognito-idp')
+            cognito_client = client('cognito-idp')
             cognito_client.admin_delete_user(
                 UserPoolId=os.environ['COGNITO_USER_POOL_ID'],
                 Username=user['email']
             )
-        except ClientError as e:
+        except client_error() as e:
             # Note: Database deletion is already committed, so we just log the Cognito error
-            print(f"Error deleting Cognito user: {str(e)}")
+            log.error("Error deleting Cognito user", error=str(e))
 
         return cors_response(200, {"message": "User deleted successfully", "userId": user_id})
 
@@ -528,7 +384,7 @@ def deleteUser(event, context):
         return cors_response(500, f"Error deleting user: {str(e)}")
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 def resetUserPassword(event, context):
     conn = None
@@ -554,7 +410,7 @@ def resetUserPassword(event, context):
             return cors_response(400, {"error": f"Missing required fields: {', '.join(missing)}"})
         
         conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = dict_cursor(conn)
         
         # Verify the reset code
         cur.execute("""
@@ -589,7 +445,7 @@ def resetUserPassword(event, context):
         
         # Update password in Cognito
         try:
-            cognito_client = boto3.client('cognito-idp')
+            cognito_client = client('cognito-idp')
             
             # Set the new password in Cognito
             cognito_client.admin_set_user_password(
@@ -605,19 +461,19 @@ def resetUserPassword(event, context):
             conn.commit()
             return cors_response(200, {"message": "Password reset successful"})
             
-        except ClientError as e:
+        except client_error() as e:
             # Rollback database changes if Cognito update fails
             conn.rollback()
             return cors_response(500, {"error": f"Error updating Cognito password: {str(e)}"})
         
     except Exception as e:
-        print(f"Error processing request: {str(e)}")
+        log.exception("Error processing request", error=str(e))
         if conn:
             conn.rollback()
         return cors_response(500, {"error": f"Internal server error: {str(e)}"})
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 def getUserByEmail(event, context):
     conn = None
@@ -632,7 +488,7 @@ def getUserByEmail(event, context):
             return cors_response(400, {"error": "Email is required"})
         
         conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = dict_cursor(conn)
 
         cur.execute("SELECT id, email, role FROM users WHERE email = %s", (email,))
         user = cur.fetchone()
@@ -643,8 +499,8 @@ def getUserByEmail(event, context):
         return cors_response(200, {"user": user})
     
     except Exception as e:
-        print(f"Error processing request: {str(e)}")
+        log.exception("Error processing request", error=str(e))
         return cors_response(500, {"error": f"Internal server error: {str(e)}"})
     finally:
         if conn:
-            conn.close()
\ No newline at end of file
+            release_db_connection(conn)
\ No newline at end of file
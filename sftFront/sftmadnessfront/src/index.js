@@ -4,6 +4,7 @@ import './aws-config';
 import App from './App';
 import './index.css';
 import reportWebVitals from './reportWebVitals';
+import reportServerTiming from './reportServerTiming';
 import Navbar1 from './components/navbar1';
 
 
@@ -19,3 +20,7 @@ root.render(
 // to log results (for example: reportWebVitals(console.log))
 // or send to an analytics endpoint. Learn more: https://bit.ly/CRA-vitals
 reportWebVitals();
+
+// Server-Timing breakdown of API calls (auth / db / cognito / s3 / serialize), when the backend sends it -
+// pass a function to log or forward it, for example: reportServerTiming(console.log)
+reportServerTiming();
@@ -0,0 +1,41 @@
+// Server-Timing from the sftMadness API (backend SFT_SERVER_TIMING=true) - for every API call the
+// browser records, passes { url, duration, serverTiming: { auth, db, cognito, s3, serialize, total, cold } }
+// to onServerTiming, so a slow page can be traced to the backend phase that was slow
+const reportServerTiming = onServerTiming => {
+  if (!(onServerTiming instanceof Function) || typeof PerformanceObserver === 'undefined') {
+    return;
+  }
+
+  const apiEndpoint = process.env.REACT_APP_API_ENDPOINT;
+
+  const observer = new PerformanceObserver(list => {
+    list.getEntries().forEach(entry => {
+      if (apiEndpoint && !entry.name.startsWith(apiEndpoint)) {
+        return;
+      }
+      if (!entry.serverTiming || entry.serverTiming.length === 0) {
+        return;
+      }
+
+      const serverTiming = {};
+      entry.serverTiming.forEach(({ name, duration, description }) => {
+        // cold / warm come without a duration
+        serverTiming[name] = name === 'cold' || name === 'warm' ? true : duration;
+        if (description) {
+          serverTiming[`${name}Description`] = description;
+        }
+      });
+
+      onServerTiming({ url: entry.name, duration: entry.duration, serverTiming });
+    });
+  });
+
+  try {
+    observer.observe({ type: 'resource', buffered: true });
+  } catch (error) {
+    // older browsers without the type option
+    observer.observe({ entryTypes: ['resource'] });
+  }
+};
+
+export default reportServerTiming;
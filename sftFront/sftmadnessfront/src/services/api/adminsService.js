@@ -84,8 +84,10 @@ export const adminsService = {
     }
   },
 
-  //get user by Id
-  getUserById: async (userId) => {
+  //get user by Id, with its events, contacts, files and conversation logs a page at a time
+  //options.include - sections to load, e.g. ['events', 'logs'] (all by default)
+  //options.limit - rows per section, options.cursors - { logs: nextCursor } from response.sections
+  getUserById: async (userId, options = {}) => {
     try {
       const session = await fetchAuthSession();
       if (!session.tokens?.idToken) {
@@ -95,7 +97,26 @@ export const adminsService = {
       
       console.log(`Fetching user with ID: ${userId}`);
       
-      const response = await fetch(`${process.env.REACT_APP_API_ENDPOINT}/admins/${userId}`, {
+      //build query parameters
+      const queryParams = new URLSearchParams();
+      
+      if (options.include) {
+        queryParams.append('include', options.include.join(','));
+      }
+      
+      if (options.limit) {
+        queryParams.append('limit', options.limit);
+      }
+      
+      Object.entries(options.cursors || {}).forEach(([section, cursor]) => {
+        if (cursor) {
+          queryParams.append(`${section}Cursor`, cursor);
+        }
+      });
+      
+      const queryString = queryParams.toString() ? `?${queryParams.toString()}` : '';
+      
+      const response = await fetch(`${process.env.REACT_APP_API_ENDPOINT}/admins/${userId}${queryString}`, {
         method: 'GET',
         headers: {
           'Authorization': `Bearer ${token}`,
@@ -111,7 +132,8 @@ export const adminsService = {
       }
       
       const responseData = await response.json();
-      return responseData.user;
+      //sections - limit / hasMore / nextCursor for each loaded section
+      return { ...responseData.user, sections: responseData.sections };
     } catch (error) {
       console.error('Error fetching user:', error);
       throw error;
@@ -277,6 +299,16 @@ export const adminsService = {
         queryParams.append('offset', options.offset);
       }
       
+      //nextCursor from the previous page, used instead of offset
+      if (options.cursor) {
+        queryParams.append('cursor', options.cursor);
+      }
+      
+      //false skips counting every matching log (pagination.total)
+      if (options.includeTotal !== undefined) {
+        queryParams.append('includeTotal', options.includeTotal);
+      }
+      
       //url depends on whether a userId is provided
       let url;
       if (userId) {
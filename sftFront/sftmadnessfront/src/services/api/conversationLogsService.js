@@ -77,6 +77,11 @@ export const conversationLogsService = {
         queryParams.append('offset', options.offset);
       }
       
+      //nextCursor from the previous page, used instead of offset
+      if (options.cursor) {
+        queryParams.append('cursor', options.cursor);
+      }
+      
       //appends query parameters to request if they exist, otherwise empty string
       const queryString = queryParams.toString() ? `?${queryParams.toString()}` : '';
       console.log(`Fetching conversation logs for user ID: ${userId}${queryString ? ' with filters' : ''}`);